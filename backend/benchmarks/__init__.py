@@ -0,0 +1,119 @@
+"""
+Benchmarks for the task API.
+
+Run them from the backend directory as modules, for example::
+
+    python -m benchmarks.bench_search --rows 1000000
+
+Every benchmark works on its own SQLite file (``--db``, a temporary file by
+default) so the development database is never touched. ``benchmarks.data``
+builds one of a given size to reuse.
+
+``bench_micro`` and ``bench_load`` save their results with ``--output`` as
+JSON, together with the commit and environment they ran on. Compare two runs
+with ``python -m benchmarks.compare before.json after.json``.
+"""
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+SIZES = {'10k': 10_000, '100k': 100_000, '1m': 1_000_000, '10m': 10_000_000}
+
+
+def parse_rows(value):
+    """Parse a row count for ``--rows``: one of SIZES or a number."""
+    return SIZES.get(value.lower()) or int(value.replace('_', ''))
+
+
+def setup_django(db_path=None):
+    """Configure Django against a scratch database and migrate it."""
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'task_manager.settings')
+    from django.conf import settings
+
+    if db_path is None:
+        db_path = os.path.join(tempfile.mkdtemp(prefix='tasks-bench-'), 'bench.sqlite3')
+    settings.DATABASES['default']['NAME'] = db_path
+    settings.DEBUG = False
+
+    import django
+    from django.core.management import call_command
+
+    django.setup()
+    call_command('migrate', verbosity=0)
+    return db_path
+
+
+def timed(func, repeat=5):
+    """Run ``func`` ``repeat`` times and return the per-call timings in seconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def percentile(timings, fraction):
+    timings = sorted(timings)
+    return timings[min(len(timings) - 1, int(len(timings) * fraction))]
+
+
+def summarize(timings):
+    """Return the median and 99th percentile of ``timings`` in milliseconds."""
+    if not timings:
+        return {'count': 0}
+    return {
+        'count': len(timings),
+        'p50_ms': round(statistics.median(timings) * 1000, 3),
+        'p99_ms': round(percentile(timings, 0.99) * 1000, 3),
+    }
+
+
+def environment():
+    """Describe the code and machine a benchmark ran on."""
+    import django
+
+    def git(*args):
+        try:
+            return subprocess.run(
+                ['git', *args], capture_output=True, text=True, check=True
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    from django.db import connection
+    return {
+        'commit': git('rev-parse', 'HEAD'),
+        'dirty': bool(git('status', '--porcelain', '--untracked-files=no')),
+        'date': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'database': f'{connection.vendor} {connection.Database.sqlite_version}'
+        if connection.vendor == 'sqlite' else connection.vendor,
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+    }
+
+
+def save_results(path, benchmark, args, results):
+    """Write ``results`` with the arguments and environment to ``path`` as JSON."""
+    document = {
+        'benchmark': benchmark,
+        'environment': environment(),
+        'arguments': {key: value for key, value in vars(args).items() if key not in ('db', 'output')},
+        'results': results,
+    }
+    text = json.dumps(document, indent=2, default=str)
+    if path == '-':
+        print(text)
+    else:
+        with open(path, 'w') as file:
+            file.write(text + '\n')
+        print(f'Saved {path}', file=sys.stderr)
+    return document
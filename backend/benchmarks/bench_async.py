@@ -0,0 +1,138 @@
+"""
+Compare sync and native async reads under concurrent load.
+
+Three servers are simulated in-process, each answering ``--requests`` list,
+detail and summary requests with ``--concurrency`` requests in flight:
+
+* ``wsgi``: the DRF views through ``WSGIHandler`` on a thread pool, like a
+  threaded WSGI server.
+* ``asgi-sync``: the same DRF views through ``task_manager.asgi``.
+* ``asgi-async``: the ``/api/async/tasks/`` views through ``task_manager.asgi``.
+
+The response cache is disabled so every request queries the database.
+"""
+import argparse
+import asyncio
+import io
+import json
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from . import percentile, setup_django
+
+
+def report(name, timings, elapsed):
+    row = {
+        'server': name,
+        'requests': len(timings),
+        'throughput_rps': round(len(timings) / elapsed, 1),
+        'p50_ms': round(statistics.median(timings) * 1000, 3),
+        'p99_ms': round(percentile(timings, 0.99) * 1000, 3),
+    }
+    print(f"{name:12} {row['throughput_rps']:>8.1f} req/s   p50 {row['p50_ms']:>8.3f} ms   "
+          f"p99 {row['p99_ms']:>8.3f} ms")
+    return row
+
+
+def run_wsgi(paths, total, concurrency):
+    from django.core.handlers.wsgi import WSGIHandler
+
+    application = WSGIHandler()
+
+    def request(index):
+        path, _, query = paths[index % len(paths)].partition('?')
+        environ = {
+            'REQUEST_METHOD': 'GET', 'PATH_INFO': path, 'QUERY_STRING': query,
+            'SERVER_NAME': 'localhost', 'SERVER_PORT': '80', 'HTTP_HOST': 'localhost',
+            'wsgi.input': io.BytesIO(), 'wsgi.url_scheme': 'http',
+        }
+        start = time.perf_counter()
+        response = application(environ, lambda status, headers: None)
+        b''.join(response)
+        response.close()
+        return time.perf_counter() - start
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        timings = list(pool.map(request, range(total)))
+    return timings, time.perf_counter() - started
+
+
+def run_asgi(paths, total, concurrency):
+    from task_manager.asgi import application
+
+    async def request(path):
+        path, _, query = path.partition('?')
+        scope = {
+            'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1',
+            'method': 'GET', 'scheme': 'http', 'path': path, 'raw_path': path.encode(),
+            'query_string': query.encode(), 'headers': [(b'host', b'localhost')],
+            'client': ('127.0.0.1', 50000), 'server': ('localhost', 80),
+        }
+        messages = iter([{'type': 'http.request', 'body': b''}])
+
+        async def receive():
+            return next(messages, {'type': 'http.disconnect'})
+
+        async def send(message):
+            pass
+
+        start = time.perf_counter()
+        await application(scope, receive, send)
+        return time.perf_counter() - start
+
+    async def main():
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def limited(index):
+            async with semaphore:
+                return await request(paths[index % len(paths)])
+
+        started = time.perf_counter()
+        timings = await asyncio.gather(*(limited(index) for index in range(total)))
+        return timings, time.perf_counter() - started
+
+    return asyncio.run(main())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=10_000)
+    parser.add_argument('--db', help='SQLite file to reuse between runs')
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=64)
+    args = parser.parse_args()
+
+    setup_django(args.db)
+    from django.conf import settings
+
+    from tasks.models import Task
+    from .data import seed_tasks
+
+    settings.TASKS_RESPONSE_CACHE = None
+    seed_tasks(args.rows)
+    pks = [str(pk) for pk in Task.objects.values_list('pk', flat=True)[:50]]
+
+    def paths(prefix):
+        return [
+            f'{prefix}?page_size=20',
+            f'{prefix}?status=todo&ordering=-priority&page_size=20',
+            f'{prefix}?pagination=cursor&page_size=50',
+            f'{prefix}summary/',
+        ] + [f'{prefix}{pk}/' for pk in pks[:4]]
+
+    results = [
+        report('wsgi', *run_wsgi(paths('/api/tasks/'), args.requests, args.concurrency)),
+        report('asgi-sync', *run_asgi(paths('/api/tasks/'), args.requests, args.concurrency)),
+        report('asgi-async', *run_asgi(
+            paths('/api/async/tasks/'), args.requests, args.concurrency
+        )),
+    ]
+    print(json.dumps({
+        'rows': args.rows, 'concurrency': args.concurrency, 'results': results
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
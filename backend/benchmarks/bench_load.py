@@ -0,0 +1,191 @@
+"""
+HTTP load against an in-process server, reported per endpoint.
+
+The WSGI application is served by Django's threaded development server
+(HTTP/1.1 with keep-alive) on a free local port. ``--clients`` threads each
+hold one connection and send requests back to back for ``--seconds``,
+choosing endpoints by weight:
+
+* ``list``: a random page of the default list;
+* ``list_filtered``: a random status filter and ordering;
+* ``list_cursor``: the first keyset page in a random ordering;
+* ``search``: a full-text search for a common word;
+* ``detail``: a random task;
+* ``summary``: the dashboard counts;
+* ``update``: a PATCH to a random task, with probability ``--writes``.
+
+Clients and server share the process (and its GIL), so throughput is a
+baseline to compare commits with, not the capacity of a production server.
+``--no-cache`` disables the response cache.
+"""
+import argparse
+import http.client
+import json
+import random
+import threading
+import time
+from collections import defaultdict
+
+from . import parse_rows, save_results, setup_django, summarize
+from .data import WORDS
+
+STATUSES = ('todo', 'in_progress', 'done')
+ORDERINGS = ('-created_at', 'due_date', '-priority', 'updated_at', '-overdue')
+READS = [
+    ('list', 4),
+    ('list_filtered', 3),
+    ('list_cursor', 2),
+    ('search', 1),
+    ('detail', 4),
+    ('summary', 2),
+]
+
+
+def start_server():
+    """Serve the WSGI application on a thread; return the server."""
+    from django.core.servers.basehttp import ThreadedWSGIServer, WSGIRequestHandler
+    from django.core.wsgi import get_wsgi_application
+
+    class QuietHandler(WSGIRequestHandler):
+        # Headers and body are written separately; with Nagle's algorithm
+        # the body waits for the client's delayed ACK (~40 ms per request).
+        disable_nagle_algorithm = True
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadedWSGIServer(('127.0.0.1', 0), QuietHandler, ipv6=False)
+    server.set_app(get_wsgi_application())
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def make_request(name, rng, pks, pages):
+    """Return the method, path and body of a request to endpoint ``name``."""
+    if name == 'list':
+        return 'GET', f'/api/tasks/?page={rng.randint(1, pages)}', None
+    if name == 'list_filtered':
+        return 'GET', (f'/api/tasks/?status={rng.choice(STATUSES)}'
+                       f'&ordering={rng.choice(ORDERINGS)}'), None
+    if name == 'list_cursor':
+        return 'GET', f'/api/tasks/?pagination=cursor&ordering={rng.choice(ORDERINGS)}', None
+    if name == 'search':
+        return 'GET', f'/api/tasks/?search={rng.choice(WORDS[:20])}', None
+    if name == 'detail':
+        return 'GET', f'/api/tasks/{rng.choice(pks)}/', None
+    if name == 'summary':
+        return 'GET', '/api/tasks/summary/', None
+    body = json.dumps({'priority': rng.randint(1, 5)})
+    return 'PATCH', f'/api/tasks/{rng.choice(pks)}/', body
+
+
+def run_load(port, args, pks, pages):
+    names, weights = zip(*READS)
+    samples = defaultdict(list)
+    errors = defaultdict(int)
+    lock = threading.Lock()
+    warmup_until = time.perf_counter() + args.warmup
+    deadline = warmup_until + args.seconds
+
+    def client(seed):
+        rng = random.Random(seed)
+        connection = http.client.HTTPConnection('127.0.0.1', port)
+        timings, failures = defaultdict(list), defaultdict(int)
+        while True:
+            now = time.perf_counter()
+            if now >= deadline:
+                break
+            name = 'update' if rng.random() < args.writes else rng.choices(names, weights)[0]
+            method, path, body = make_request(name, rng, pks, pages)
+            headers = {'Content-Type': 'application/json'} if body else {}
+            start = time.perf_counter()
+            try:
+                connection.request(method, path, body, headers)
+                response = connection.getresponse()
+                response.read()
+                ok = response.status < 400
+            except (OSError, http.client.HTTPException):
+                connection.close()
+                connection = http.client.HTTPConnection('127.0.0.1', port)
+                ok = False
+            if start < warmup_until:
+                continue
+            if ok:
+                timings[name].append(time.perf_counter() - start)
+            else:
+                failures[name] += 1
+        connection.close()
+        with lock:
+            for name, values in timings.items():
+                samples[name] += values
+            for name, count in failures.items():
+                errors[name] += count
+
+    threads = [threading.Thread(target=client, args=(seed,)) for seed in range(args.clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    results = []
+    everything = []
+    for name in [name for name, _ in READS] + ['update']:
+        timings = samples.get(name, [])
+        if not timings and not errors.get(name):
+            continue
+        everything += timings
+        results.append({
+            'endpoint': name,
+            'throughput_rps': round(len(timings) / args.seconds, 1),
+            'errors': errors.get(name, 0),
+            **summarize(timings),
+        })
+    results.append({
+        'endpoint': 'all',
+        'throughput_rps': round(len(everything) / args.seconds, 1),
+        'errors': sum(errors.values()),
+        **summarize(everything),
+    })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=parse_rows, default='10k', help='10k, 1m, 10m or a number')
+    parser.add_argument('--db', help='SQLite file to reuse between runs')
+    parser.add_argument('--clients', type=int, default=8)
+    parser.add_argument('--seconds', type=float, default=20)
+    parser.add_argument('--warmup', type=float, default=2)
+    parser.add_argument('--writes', type=float, default=0.05, help='fraction of requests that are updates')
+    parser.add_argument('--no-cache', action='store_true', help='disable the response cache')
+    parser.add_argument('--output', default='-', help='JSON results file (default: stdout)')
+    args = parser.parse_args()
+
+    setup_django(args.db)
+    from django.conf import settings
+
+    from tasks.models import Task
+    from .data import seed_tasks
+
+    if args.no_cache:
+        settings.TASKS_RESPONSE_CACHE = None
+    rows = seed_tasks(args.rows)
+    # Generated ids are random, so the lowest ones are a sample of the table.
+    pks = [str(pk) for pk in Task.objects.order_by('pk').values_list('pk', flat=True)[:1000]]
+    pages = max(1, min(rows, 10_000) // settings.REST_FRAMEWORK.get('PAGE_SIZE', 10))
+
+    server = start_server()
+    try:
+        results = run_load(server.server_address[1], args, pks, pages)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    for row in results:
+        print(f"{row['endpoint']:14} {row['throughput_rps']:>8.1f} req/s   errors {row['errors']:>4}   "
+              f"p50 {row.get('p50_ms', 0):>8.3f} ms   p99 {row.get('p99_ms', 0):>8.3f} ms")
+    save_results(args.output, 'load', args, results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""
+Measure what the metrics middleware adds to a request.
+
+Requests go through the whole middleware stack with Django's test ``Client``,
+once with ``metrics_middleware`` removed from ``MIDDLEWARE`` and once with
+it. ``cached`` repeats a request whose response is cached (a couple of
+queries), ``uncached`` clears the response cache first.
+"""
+import argparse
+import json
+import statistics
+
+from . import setup_django, timed
+
+PATHS = [
+    '/api/tasks/',
+    '/api/tasks/?page_size=100',
+    '/api/tasks/summary/',
+]
+METRICS_MIDDLEWARE = 'tasks.metrics.metrics_middleware'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--db', help='SQLite file to reuse between runs')
+    parser.add_argument('--repeat', type=int, default=500)
+    args = parser.parse_args()
+
+    setup_django(args.db)
+    from django.conf import settings
+    from django.test import Client
+
+    from tasks.response_cache import get_response_cache
+    from .data import seed_tasks
+
+    seed_tasks(args.rows)
+    settings.ALLOWED_HOSTS = ['*']
+    response_cache = get_response_cache()
+    with_metrics = list(settings.MIDDLEWARE)
+    without_metrics = [name for name in with_metrics if name != METRICS_MIDDLEWARE]
+
+    def client(middleware):
+        # The handler loads MIDDLEWARE on the client's first request.
+        settings.MIDDLEWARE = middleware
+        client = Client()
+        client.get(PATHS[0])
+        return client
+
+    clients = {'off': client(without_metrics), 'on': client(with_metrics)}
+    settings.MIDDLEWARE = with_metrics
+
+    def run(client, path, cached):
+        def request():
+            if not cached:
+                response_cache.clear()
+            client.get(path)
+        return request
+
+    results = []
+    for path in PATHS:
+        for cached in (True, False):
+            row = {'path': path, 'cache': 'cached' if cached else 'uncached'}
+            # Interleave the two configurations so drift affects both alike.
+            timings = {'off': [], 'on': []}
+            for _ in range(args.repeat // 50):
+                for name, client in clients.items():
+                    timings[name] += timed(run(client, path, cached), repeat=50)
+            for name, values in timings.items():
+                row[f'{name}_ms'] = round(statistics.median(values) * 1000, 4)
+            row['overhead_us'] = round((row['on_ms'] - row['off_ms']) * 1000, 1)
+            results.append(row)
+            print(f"{path:30} {row['cache']:9} off {row['off_ms']:>8.3f} ms   "
+                  f"on {row['on_ms']:>8.3f} ms   overhead {row['overhead_us']:>6.1f} us")
+
+    print(json.dumps({'rows': args.rows, 'repeat': args.repeat, 'results': results}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
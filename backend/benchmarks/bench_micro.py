@@ -0,0 +1,165 @@
+"""
+Micro-benchmarks for the pieces of a task request.
+
+* ``serializer``: TaskSerializer reading one task and a page of 100, writing
+  (validating) one task, and TaskRowSerializer on the same page.
+* ``filter``: TaskFilter querysets for the list's common filters, counted and
+  cut to a first page as ``GET /api/tasks/`` does.
+* ``summary``: the summary aggregate over all tasks and over a filter.
+* ``pagination``: page-number pages near the start and the end of the table,
+  and keyset (cursor) pages at the same depths.
+* ``bulk``: validating a 1,000-item ``POST /api/tasks/bulk/`` payload and
+  inserting it with ``bulk_insert``, rolled back after every run.
+
+Each case runs in a loop long enough to time reliably; ``--repeat`` loops are
+timed and the per-call median and minimum reported.
+"""
+import argparse
+import statistics
+import time
+from urllib.parse import parse_qs, urlparse
+
+from . import parse_rows, save_results, setup_django
+
+FILTERS = [
+    {'status': 'todo'},
+    {'priority_min': '4'},
+    {'overdue': 'true'},
+    {'title_contains': 'report'},
+    {'status': 'in_progress', 'priority': '3'},
+    {'due_before': '2000-01-01T00:00:00Z'},
+]
+
+
+def measure(func, repeat, target=0.02):
+    """Time ``func`` ``repeat`` times in loops of about ``target`` seconds."""
+    func()
+    start = time.perf_counter()
+    func()
+    number = max(1, int(target / max(time.perf_counter() - start, 1e-7)))
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        timings.append((time.perf_counter() - start) / number)
+    median = statistics.median(timings)
+    return {
+        'p50_ms': round(median * 1000, 4),
+        'min_ms': round(min(timings) * 1000, 4),
+        'ops_per_s': round(1 / median, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=parse_rows, default='10k', help='10k, 1m, 10m or a number')
+    parser.add_argument('--db', help='SQLite file to reuse between runs')
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--only', help='run one group: serializer, filter, summary, pagination or bulk')
+    parser.add_argument('--output', default='-', help='JSON results file (default: stdout)')
+    args = parser.parse_args()
+
+    setup_django(args.db)
+    from django.db import transaction
+    from django.utils import timezone
+    from rest_framework.request import Request
+    from rest_framework.test import APIRequestFactory
+
+    from tasks.filters import TaskFilter
+    from tasks.models import Task
+    from tasks.pagination import Position, TaskCursorPagination, TaskPageNumberPagination
+    from tasks.serializers import TaskRowSerializer, TaskSerializer
+    from .data import seed_tasks
+
+    rows = seed_tasks(args.rows)
+    factory = APIRequestFactory(HTTP_HOST='localhost')
+    now = timezone.now()
+    tasks = Task.objects.with_overdue(now)
+
+    def request(params=None):
+        request = Request(factory.get('/api/tasks/', params or {}))
+        request.now = now
+        return request
+
+    def serializer_cases():
+        page = list(tasks[:100])
+        values = list(tasks.values(*TaskRowSerializer.fields, 'overdue')[:100])
+        payload = {'title': 'Quarterly budget review', 'description': 'Numbers', 'priority': 4,
+                   'status': 'in_progress', 'due_date': '2030-01-01T12:00:00Z'}
+        yield 'TaskSerializer read 1', lambda: TaskSerializer(page[0]).data
+        yield 'TaskSerializer read 100', lambda: TaskSerializer(page, many=True).data
+        yield 'TaskSerializer validate 1', lambda: TaskSerializer(data=payload).is_valid(raise_exception=True)
+        yield 'TaskRowSerializer read 100', lambda: TaskRowSerializer(now).many(values)
+
+    def filter_cases():
+        for params in FILTERS:
+            def run(params=params):
+                queryset = TaskFilter(params, queryset=tasks, request=request(params)).qs
+                return queryset.count(), list(queryset.values('pk')[:20])
+            yield '&'.join(f'{key}={value}' for key, value in params.items()), run
+
+    def summary_cases():
+        yield 'all tasks', lambda: Task.objects.summary(now)
+        yield 'status=todo', lambda: Task.objects.filter(status='todo').summary(now)
+
+    def pagination_cases():
+        ordered = tasks.values(*TaskRowSerializer.fields, 'overdue').order_by('-created_at')
+        last_page = max(1, (rows + 99) // 100)
+        for name, page in (('page 1', 1), ('page 10', 10), ('last page', last_page)):
+            def run(page=page):
+                return TaskPageNumberPagination().paginate_queryset(
+                    ordered, request({'page': page, 'page_size': 100})
+                )
+            yield f'page number, {name}', run
+
+        first = TaskCursorPagination()
+        first.paginate_queryset(ordered, request({'page_size': 100}))
+        deep = ordered[max(0, rows - 100)]
+        last_cursor = parse_qs(urlparse(
+            first.encode_cursor(Position(deep['created_at'], deep['id'], False))
+        ).query)['cursor'][0]
+        for name, params in (('first page', {}), ('last page', {'cursor': last_cursor})):
+            def run(params=params):
+                return TaskCursorPagination().paginate_queryset(
+                    ordered, request({**params, 'page_size': 100})
+                )
+            yield f'cursor, {name}', run
+
+    def bulk_cases():
+        items = [
+            {'title': f'Imported task {index}', 'priority': index % 5 + 1,
+             'due_date': '2030-01-01T12:00:00Z'}
+            for index in range(1000)
+        ]
+        valid, _ = TaskSerializer(data=items, many=True).validate_items()
+
+        def insert():
+            with transaction.atomic():
+                Task.objects.bulk_insert([data for _, data in valid])
+                transaction.set_rollback(True)
+        yield 'validate 1000', lambda: TaskSerializer(data=items, many=True).validate_items()
+        yield 'insert 1000', insert
+
+    groups = {
+        'serializer': serializer_cases,
+        'filter': filter_cases,
+        'summary': summary_cases,
+        'pagination': pagination_cases,
+        'bulk': bulk_cases,
+    }
+    results = []
+    for group, cases in groups.items():
+        if args.only and args.only != group:
+            continue
+        for case, func in cases():
+            row = {'group': group, 'case': case, **measure(func, args.repeat)}
+            results.append(row)
+            print(f"{group:11} {case:40} {row['p50_ms']:>10.4f} ms   "
+                  f"min {row['min_ms']:>10.4f} ms   {row['ops_per_s']:>10.1f} ops/s")
+
+    save_results(args.output, 'micro', args, results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+"""
+Payload size and encode time of the task list's response formats.
+
+A list page of ``--page-sizes`` tasks, as ``GET /api/tasks/`` builds it, is
+rendered by the default ``JSONRenderer``, ``TableJSONRenderer`` and (when
+``msgpack`` is installed) ``MessagePackRenderer``. Each rendering is then
+compressed with gzip and (when ``brotli`` is installed) brotli, as
+``compression_middleware`` would. ``p50_ms`` is the time to produce the
+bytes sent: rendering plus compression.
+"""
+import argparse
+
+from . import parse_rows, save_results, setup_django
+from .bench_micro import measure
+
+PAGE_SIZES = '20,100,1000'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=parse_rows, default='10k', help='10k, 1m, 10m or a number')
+    parser.add_argument('--db', help='SQLite file to reuse between runs')
+    parser.add_argument('--page-sizes', default=PAGE_SIZES, help=f'comma-separated (default: {PAGE_SIZES})')
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--output', default='-', help='JSON results file (default: stdout)')
+    args = parser.parse_args()
+
+    setup_django(args.db)
+    from django.utils import timezone
+    from django.utils.text import compress_string
+
+    from tasks import compression
+    from tasks.models import Task
+    from tasks.renderers import MessagePackRenderer, TableJSONRenderer, msgpack
+    from tasks.serializers import TaskRowSerializer
+    from rest_framework.renderers import JSONRenderer
+    from .data import seed_tasks
+
+    seed_tasks(args.rows)
+    now = timezone.now()
+    renderers = {'json': JSONRenderer(), 'table': TableJSONRenderer()}
+    if msgpack is not None:
+        renderers['msgpack'] = MessagePackRenderer()
+    compressors = {'': None, 'gzip': compress_string}
+    if compression.brotli is not None:
+        compressors['br'] = lambda content: compression.brotli.compress(
+            content, quality=compression.BROTLI_QUALITY
+        )
+
+    results = []
+    for size in map(int, args.page_sizes.split(',')):
+        rows = Task.objects.with_overdue(now).values(*TaskRowSerializer.fields, 'overdue')[:size]
+        page = {
+            'count': args.rows,
+            'next': 'http://localhost/api/tasks/?page=2',
+            'previous': None,
+            'results': TaskRowSerializer(now).many(rows),
+        }
+        baseline = None
+        for name, renderer in renderers.items():
+            for encoding, compress in compressors.items():
+                def encode(renderer=renderer, compress=compress):
+                    content = renderer.render(page)
+                    return compress(content) if compress else content
+
+                size_bytes = len(encode())
+                baseline = baseline or size_bytes
+                case = f'{name}+{encoding}' if encoding else name
+                row = {
+                    'group': f'{size} tasks',
+                    'case': case,
+                    'bytes': size_bytes,
+                    'vs_json_percent': round(size_bytes / baseline * 100, 1),
+                    **measure(encode, args.repeat),
+                }
+                results.append(row)
+                print(f"{row['group']:11} {case:14} {size_bytes:>10,} B  {row['vs_json_percent']:>6.1f}%   "
+                      f"{row['p50_ms']:>9.4f} ms")
+
+    save_results(args.output, 'renderers', args, results)
+
+
+if __name__ == '__main__':
+    main()
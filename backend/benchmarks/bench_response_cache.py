@@ -0,0 +1,85 @@
+"""
+Measure list and detail latency with and without the response cache.
+
+Requests go through the full view stack (``TaskViewSet.as_view``) with
+``APIRequestFactory``; no HTTP server is involved. ``miss`` clears the cache
+before every request, ``hit`` repeats a request whose response is cached and
+``not_modified`` sends the ETag back.
+"""
+import argparse
+import json
+import statistics
+
+from . import setup_django, timed
+
+REQUESTS = [
+    ('list', {}),
+    ('list', {'page_size': '100'}),
+    ('list', {'status': 'todo', 'ordering': '-priority', 'page_size': '100'}),
+    ('list', {'search': 'report'}),
+    ('retrieve', {}),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--db', help='SQLite file to reuse between runs')
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    setup_django(args.db)
+    from rest_framework.test import APIRequestFactory
+
+    from tasks.models import Task
+    from tasks.response_cache import get_response_cache
+    from tasks.views import TaskViewSet
+    from .data import seed_tasks
+
+    seed_tasks(args.rows)
+    factory = APIRequestFactory(HTTP_HOST='localhost')
+    pk = str(Task.objects.values_list('pk', flat=True).first())
+    views = {
+        'list': TaskViewSet.as_view({'get': 'list'}),
+        'retrieve': TaskViewSet.as_view({'get': 'retrieve'}),
+    }
+    response_cache = get_response_cache()
+
+    def request(action, params, **headers):
+        path = '/api/tasks/' if action == 'list' else f'/api/tasks/{pk}/'
+        kwargs = {} if action == 'list' else {'pk': pk}
+        response = views[action](factory.get(path, params, **headers), **kwargs)
+        if hasattr(response, 'render'):
+            response.render()
+        return response
+
+    def miss(action, params):
+        def run():
+            response_cache.clear()
+            request(action, params)
+        return run
+
+    def hit(action, params):
+        return lambda: request(action, params)
+
+    def not_modified(action, params):
+        etag = request(action, params)['ETag']
+        return lambda: request(action, params, HTTP_IF_NONE_MATCH=etag)
+
+    results = []
+    for action, params in REQUESTS:
+        row = {'action': action, 'params': params}
+        for name, make in (('miss', miss), ('hit', hit), ('not_modified', not_modified)):
+            request(action, params)
+            timings = timed(make(action, params), repeat=args.repeat)
+            row[f'{name}_ms'] = round(statistics.median(timings) * 1000, 3)
+        results.append(row)
+        label = action + ('?' + '&'.join(f'{k}={v}' for k, v in params.items()) if params else '')
+        print(f"{label:55} miss {row['miss_ms']:>8.3f} ms   hit {row['hit_ms']:>7.3f} ms   "
+              f"304 {row['not_modified_ms']:>7.3f} ms")
+
+    print(json.dumps({'rows': args.rows, 'stats': response_cache.stats(), 'results': results}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
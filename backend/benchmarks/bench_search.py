@@ -0,0 +1,56 @@
+"""
+Compare the full-text search backend with DRF's icontains SearchFilter.
+
+Each query fetches what ``GET /api/tasks/?search=...`` would: the match count
+and the first page of results.
+"""
+import argparse
+import json
+import statistics
+
+from . import setup_django, timed
+
+QUERIES = ['report', 'quarterly budget', 'secur', 'incident audit cleanup', 'nomatch']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--db', help='SQLite file to reuse between runs')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    setup_django(args.db)
+    from rest_framework.filters import SearchFilter
+    from rest_framework.request import Request
+    from rest_framework.test import APIRequestFactory
+
+    from tasks.filters import TaskSearchFilter
+    from tasks.views import TaskViewSet
+    from .data import seed_tasks
+
+    seed_tasks(args.rows)
+    factory = APIRequestFactory()
+
+    def first_page(backend, query):
+        request = Request(factory.get('/api/tasks/', {'search': query}))
+        view = TaskViewSet(request=request, action='list', format_kwarg=None, kwargs={})
+        queryset = backend().filter_queryset(request, view.get_queryset(), view)
+        return lambda: (queryset.count(), list(queryset[:8]))
+
+    results = []
+    for query in QUERIES:
+        row = {'query': query}
+        for name, backend in (('icontains', SearchFilter), ('fulltext', TaskSearchFilter)):
+            timings = timed(first_page(backend, query), repeat=args.repeat)
+            row[f'{name}_ms'] = round(statistics.median(timings) * 1000, 2)
+        row['speedup'] = round(row['icontains_ms'] / max(row['fulltext_ms'], 1e-6), 1)
+        results.append(row)
+        print(f"{query!r:28} icontains {row['icontains_ms']:>9.2f} ms   "
+              f"fulltext {row['fulltext_ms']:>9.2f} ms   x{row['speedup']}")
+
+    print(json.dumps({'rows': args.rows, 'results': results}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+"""
+Compare TaskSerializer with the TaskRowSerializer fast path.
+
+Each run fetches and serializes one list page the way ``GET /api/tasks/``
+does, for a range of page sizes.
+"""
+import argparse
+import json
+import statistics
+
+from . import setup_django, timed
+
+PAGE_SIZES = [10, 100, 1000, 10000]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=20_000)
+    parser.add_argument('--db', help='SQLite file to reuse between runs')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    setup_django(args.db)
+    from tasks.models import Task
+    from tasks.serializers import TaskRowSerializer, TaskSerializer
+    from .data import seed_tasks
+
+    seed_tasks(args.rows)
+
+    def model_serializer(size):
+        return lambda: TaskSerializer(list(Task.objects.all()[:size]), many=True).data
+
+    def row_serializer(size):
+        rows = Task.objects.values(*TaskRowSerializer.fields)
+        return lambda: TaskRowSerializer().many(rows[:size])
+
+    results = []
+    for size in PAGE_SIZES:
+        row = {'page_size': size}
+        for name, run in (('serializer', model_serializer), ('fast', row_serializer)):
+            timings = timed(run(size), repeat=args.repeat)
+            row[f'{name}_ms'] = round(statistics.median(timings) * 1000, 2)
+        row['speedup'] = round(row['serializer_ms'] / max(row['fast_ms'], 1e-6), 1)
+        results.append(row)
+        print(f"page_size {size:>6}   serializer {row['serializer_ms']:>9.2f} ms   "
+              f"fast {row['fast_ms']:>9.2f} ms   x{row['speedup']}")
+
+    print(json.dumps({'rows': args.rows, 'results': results}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,137 @@
+"""
+Mixed read/write load against SQLite with and without the production profile.
+
+Each profile runs in its own process (``TASKS_DB_PROFILE``) on its own
+database file. ``--threads`` workers each simulate requests for ``--seconds``:
+a request opens with ``request_started`` and ends with ``request_finished``,
+like a real one, so connections are closed or reused as ``CONN_MAX_AGE``
+says. ``--writes`` of the requests update a task in a transaction that reads
+it first, the rest read a page or a single task. A request that fails with
+"database is locked" counts as an error.
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+from . import setup_django
+
+PROFILES = ('default', 'production')
+
+
+def run_profile(args):
+    setup_django(args.db)
+    from django.core.signals import request_finished, request_started
+    from django.db import OperationalError, connection, transaction
+
+    from tasks.db import sqlite_status
+    from tasks.models import Task
+    from .data import seed_tasks
+
+    seed_tasks(args.rows)
+    pks = list(Task.objects.values_list('pk', flat=True)[:1000])
+    pragmas = sqlite_status(connection)
+    connection.close()
+
+    def read_page(rng):
+        list(Task.objects.filter(status='todo').order_by('-created_at').values()[:20])
+
+    def read_task(rng):
+        Task.objects.get(pk=rng.choice(pks))
+
+    def update_task(rng):
+        with transaction.atomic():
+            task = Task.objects.get(pk=rng.choice(pks))
+            task.priority = rng.randint(1, 5)
+            task.save(update_fields=['priority', 'updated_at'])
+
+    results = {'reads': [], 'writes': [], 'errors': 0}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + args.seconds
+
+    def worker(seed):
+        rng = random.Random(seed)
+        reads, writes, errors = [], [], 0
+        while time.perf_counter() < deadline:
+            write = rng.random() < args.writes
+            operation = update_task if write else rng.choice((read_page, read_task))
+            start = time.perf_counter()
+            request_started.send(sender=None)
+            try:
+                operation(rng)
+            except OperationalError:
+                errors += 1
+                continue
+            finally:
+                request_finished.send(sender=None)
+            (writes if write else reads).append(time.perf_counter() - start)
+        with lock:
+            results['reads'] += reads
+            results['writes'] += writes
+            results['errors'] += errors
+
+    threads = [threading.Thread(target=worker, args=(seed,)) for seed in range(args.threads)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    def summarize(timings):
+        timings = sorted(timings)
+        if not timings:
+            return {'count': 0}
+        return {
+            'count': len(timings),
+            'p50_ms': round(statistics.median(timings) * 1000, 3),
+            'p99_ms': round(timings[int(len(timings) * 0.99)] * 1000, 3),
+        }
+
+    completed = len(results['reads']) + len(results['writes'])
+    return {
+        'profile': os.environ.get('TASKS_DB_PROFILE', 'default'),
+        'pragmas': pragmas,
+        'throughput_rps': round(completed / args.seconds, 1),
+        'errors': results['errors'],
+        'reads': summarize(results['reads']),
+        'writes': summarize(results['writes']),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--writes', type=float, default=0.2)
+    parser.add_argument('--db', help=argparse.SUPPRESS)
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_profile(args)))
+        return
+
+    results = []
+    for profile in PROFILES:
+        command = [
+            sys.executable, '-m', 'benchmarks.bench_sqlite', '--child',
+            '--rows', str(args.rows), '--threads', str(args.threads),
+            '--seconds', str(args.seconds), '--writes', str(args.writes),
+        ]
+        environ = {**os.environ, 'TASKS_DB_PROFILE': profile}
+        output = subprocess.run(command, env=environ, check=True, capture_output=True, text=True)
+        result = json.loads(output.stdout.strip().splitlines()[-1])
+        results.append(result)
+        print(f"{profile:11} {result['throughput_rps']:>8.1f} req/s   errors {result['errors']:>5}   "
+              f"read p99 {result['reads'].get('p99_ms', 0):>8.3f} ms   "
+              f"write p99 {result['writes'].get('p99_ms', 0):>8.3f} ms", file=sys.stderr)
+    print(json.dumps({'rows': args.rows, 'threads': args.threads, 'results': results}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,181 @@
+"""
+Worker startup and per-request cost of the default and API-only profiles.
+
+Each profile (``TASKS_APP_PROFILE`` unset, then ``api``) runs in fresh
+processes on one shared database:
+
+* ``--runs`` processes each start like a worker: load the settings and apps,
+  build the WSGI handler, and serve one request, which imports the URLconf
+  and views. ``process_ms`` is the wall time of the whole process, including
+  the interpreter; ``setup_ms`` and ``first_request_ms`` are measured inside.
+* One more process sends ``--requests`` requests per case straight to the
+  WSGI and ASGI handlers, without a server or test client, so the middleware
+  is most of what differs: ``summary`` is the dashboard summary, which is
+  cached, ``not_found`` a URL no view matches.
+"""
+import argparse
+import io
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from . import parse_rows, save_results, setup_django
+
+PROFILES = ('default', 'api')
+PATHS = {'summary': '/api/tasks/summary/', 'not_found': '/api/no-such-endpoint/'}
+
+
+def configure(db_path):
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'task_manager.settings')
+    from django.conf import settings
+
+    settings.DATABASES['default']['NAME'] = db_path
+    settings.DEBUG = False
+
+
+def wsgi_get(handler, path):
+    """GET ``path`` from a WSGI handler; return the status code."""
+    statuses = []
+    b''.join(handler(wsgi_environ(path), lambda status, headers: statuses.append(status)))
+    return int(statuses[0].split()[0])
+
+
+def wsgi_environ(path):
+    return {
+        'REQUEST_METHOD': 'GET', 'PATH_INFO': path, 'QUERY_STRING': '', 'SCRIPT_NAME': '',
+        'SERVER_NAME': 'localhost', 'SERVER_PORT': '80', 'HTTP_HOST': 'localhost',
+        'wsgi.url_scheme': 'http', 'wsgi.input': io.BytesIO(), 'wsgi.errors': sys.stderr,
+    }
+
+
+def start(db_path):
+    """Start like a worker; return the timings of each step."""
+    started = time.perf_counter()
+    configure(db_path)
+    import django
+    django.setup()
+    setup = time.perf_counter()
+
+    from django.core.handlers.wsgi import WSGIHandler
+    handler = WSGIHandler()
+    status = wsgi_get(handler, PATHS['summary'])
+    finished = time.perf_counter()
+    return {
+        'setup_ms': round((setup - started) * 1000, 3),
+        'first_request_ms': round((finished - setup) * 1000, 3),
+        'modules': len(sys.modules),
+        'status': status,
+    }
+
+
+def serve(db_path, requests):
+    """Time ``requests`` requests per path through the WSGI and ASGI handlers."""
+    import asyncio
+
+    configure(db_path)
+    import django
+    django.setup()
+    from django.core.handlers.asgi import ASGIHandler
+    from django.core.handlers.wsgi import WSGIHandler
+
+    wsgi = WSGIHandler()
+    asgi = ASGIHandler()
+
+    async def asgi_request(path):
+        scope = {
+            'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1',
+            'method': 'GET', 'scheme': 'http', 'path': path, 'raw_path': path.encode(),
+            'query_string': b'', 'root_path': '', 'headers': [(b'host', b'localhost')],
+            'client': ('127.0.0.1', 1), 'server': ('localhost', 80),
+        }
+
+        async def receive():
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+        async def send(message):
+            pass
+
+        await asgi(scope, receive, send)
+
+    async def asgi_timings(path):
+        timings = []
+        for _ in range(requests):
+            begin = time.perf_counter()
+            await asgi_request(path)
+            timings.append(time.perf_counter() - begin)
+        return timings
+
+    results = {}
+    for name, path in PATHS.items():
+        results[f'{name}_status'] = wsgi_get(wsgi, path)
+        timings = []
+        for _ in range(requests):
+            begin = time.perf_counter()
+            wsgi_get(wsgi, path)
+            timings.append(time.perf_counter() - begin)
+        results[f'wsgi_{name}_p50_ms'] = round(statistics.median(timings) * 1000, 4)
+        timings = asyncio.run(asgi_timings(path))
+        results[f'asgi_{name}_p50_ms'] = round(statistics.median(timings) * 1000, 4)
+    return results
+
+
+def child(command, profile, args):
+    environ = {**os.environ, 'TASKS_APP_PROFILE': profile if profile != 'default' else ''}
+    begin = time.perf_counter()
+    output = subprocess.run(
+        [sys.executable, '-m', 'benchmarks.bench_startup', '--child', command,
+         '--db', args.db, '--requests', str(args.requests)],
+        env=environ, check=True, capture_output=True, text=True,
+    )
+    elapsed = time.perf_counter() - begin
+    return json.loads(output.stdout.strip().splitlines()[-1]), elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=parse_rows, default='10k', help='10k, 1m, 10m or a number')
+    parser.add_argument('--db', help='SQLite file to reuse between runs')
+    parser.add_argument('--runs', type=int, default=10, help='worker starts per profile')
+    parser.add_argument('--requests', type=int, default=2000, help='requests per case')
+    parser.add_argument('--output', default='-', help='JSON results file (default: stdout)')
+    parser.add_argument('--child', choices=('start', 'serve'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child == 'start':
+        print(json.dumps(start(args.db)))
+        return
+    if args.child == 'serve':
+        print(json.dumps(serve(args.db, args.requests)))
+        return
+
+    args.db = args.db or os.path.join(tempfile.mkdtemp(prefix='tasks-bench-'), 'bench.sqlite3')
+    setup_django(args.db)
+    from .data import seed_tasks
+    seed_tasks(args.rows)
+
+    results = []
+    for profile in PROFILES:
+        starts = [child('start', profile, args) for _ in range(args.runs)]
+        row = {
+            'case': profile,
+            'process_ms': round(statistics.median(elapsed for _, elapsed in starts) * 1000, 3),
+        }
+        if any(result['status'] != 200 for result, _ in starts):
+            raise SystemExit(f'{profile}: the first request failed')
+        for key in ('setup_ms', 'first_request_ms', 'modules'):
+            row[key] = round(statistics.median(result[key] for result, _ in starts), 3)
+        row.update(child('serve', profile, args)[0])
+        results.append(row)
+        print(f"{profile:8} process {row['process_ms']:>8.1f} ms   setup {row['setup_ms']:>7.1f} ms   "
+              f"first request {row['first_request_ms']:>7.1f} ms   {row['modules']:>5.0f} modules   "
+              f"summary wsgi {row['wsgi_summary_p50_ms']:.3f} ms / asgi {row['asgi_summary_p50_ms']:.3f} ms",
+              file=sys.stderr)
+    save_results(args.output, 'startup', args, results)
+
+
+if __name__ == '__main__':
+    main()
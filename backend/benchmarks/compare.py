@@ -0,0 +1,77 @@
+"""
+Compare two saved benchmark results (``--output`` of bench_micro or bench_load).
+
+Rows are matched on their labels (``group`` and ``case``, or ``endpoint``).
+Every timing and rate is printed before and after, with the change. A change
+worse than ``--threshold`` percent is flagged: times (``*_ms``) that grew or
+rates (``*_rps``, ``*_per_s``) that fell. ``--fail`` exits with status 1 when
+anything is flagged, for use in CI.
+"""
+import argparse
+import json
+import sys
+
+LABELS = ('group', 'case', 'endpoint')
+
+
+def load(path):
+    with open(path) as file:
+        return json.load(file)
+
+
+def label(row):
+    return ' / '.join(str(row[key]) for key in LABELS if key in row)
+
+
+def higher_is_better(metric):
+    return metric.endswith(('_rps', '_per_s'))
+
+
+def compare(before, after, threshold):
+    """Yield (label, metric, old, new, change %, regressed) for matching rows."""
+    old_rows = {label(row): row for row in before['results']}
+    for row in after['results']:
+        old = old_rows.get(label(row))
+        if old is None:
+            continue
+        for metric, value in row.items():
+            if metric in LABELS or metric == 'count' or not isinstance(value, (int, float)):
+                continue
+            previous = old.get(metric)
+            if not isinstance(previous, (int, float)) or not previous:
+                continue
+            change = (value - previous) / previous * 100
+            worse = -change if higher_is_better(metric) else change
+            yield label(row), metric, previous, value, change, worse > threshold
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('before')
+    parser.add_argument('after')
+    parser.add_argument('--threshold', type=float, default=10, help='percent (default: 10)')
+    parser.add_argument('--fail', action='store_true', help='exit 1 on a regression')
+    args = parser.parse_args()
+
+    before, after = load(args.before), load(args.after)
+    if before['benchmark'] != after['benchmark']:
+        parser.error(f"cannot compare {before['benchmark']} with {after['benchmark']} results")
+    for name, document in (('before', before), ('after', after)):
+        environment = document['environment']
+        commit = (environment['commit'] or 'unknown')[:10] + (' (dirty)' if environment['dirty'] else '')
+        print(f"{name:6} {commit:18} {environment['date']}   {document['arguments']}")
+    print()
+
+    regressions = 0
+    for row_label, metric, old, new, change, regressed in compare(before, after, args.threshold):
+        regressions += regressed
+        print(f"{row_label:50} {metric:14} {old:>12.3f} -> {new:>12.3f}   {change:+7.1f}%"
+              f"{'   REGRESSION' if regressed else ''}")
+    if regressions:
+        print(f'\n{regressions} regression(s) beyond {args.threshold}%')
+    if regressions and args.fail:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
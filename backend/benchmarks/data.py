@@ -0,0 +1,193 @@
+"""
+Synthetic task data for benchmarks.
+
+Build a database once and reuse it across runs with ``--db``::
+
+    python -m benchmarks.data --rows 1m --db /tmp/tasks-1m.sqlite3
+
+Rows come from a seeded generator, so the same size always produces the same
+tasks (relative to the time they were generated). Tasks are created over the
+last two years, in order. Older tasks are more likely to be done, and tasks
+left open past their due date are overdue. ``created_at`` and ``updated_at``
+are written as generated, which ``bulk_create`` would not do for auto_now
+fields, so rows are inserted directly.
+"""
+import argparse
+import math
+import random
+import sys
+import time
+import uuid
+from datetime import timedelta
+from itertools import accumulate
+
+from . import parse_rows, setup_django
+
+WORDS = (
+    'report review deploy release invoice budget meeting design backend frontend '
+    'database migration customer support onboarding security audit incident '
+    'roadmap sprint planning refactor cleanup documentation testing coverage '
+    'performance latency cache index query export import dashboard summary '
+    'quarterly monthly weekly urgent follow client vendor contract hiring'
+).split()
+
+SYLLABLES = 'ka lo mi ne ru sa ti vo ze pa da fi gu ho je'.split()
+
+SPAN_DAYS = 730
+
+
+def vocabulary(size=5000, seed=0):
+    """Return ``size`` words with Zipf weights, the named WORDS most common."""
+    rng = random.Random(seed)
+    words = list(WORDS)
+    seen = set(words)
+    while len(words) < size:
+        word = ''.join(rng.choices(SYLLABLES, k=rng.randint(2, 4)))
+        if word not in seen:
+            seen.add(word)
+            words.append(word)
+    weights = [1 / rank for rank in range(1, size + 1)]
+    return words, weights
+
+
+def generate_tasks(count, seed=0, start=0, total=None, now=None):
+    """
+    Yield unsaved Task instances ``start`` to ``start + count`` of a table of
+    ``total`` tasks, with a plausible mix of field values.
+    """
+    from django.utils import timezone
+    from tasks.models import Task
+
+    total = total or start + count
+    rng = random.Random(seed + start)
+    words, weights = vocabulary()
+    # Precomputed so choices() does not add up 5000 weights per call.
+    cum_weights = list(accumulate(weights))
+    now = now or timezone.now()
+    for index in range(start, start + count):
+        age = SPAN_DAYS * (1 - (index + rng.random()) / total)
+        created_at = now - timedelta(days=age)
+        # Most tasks are done within a few months of being created; about
+        # three in four overall.
+        done = rng.random() < 0.05 + 0.8 * (1 - math.exp(-age / 90))
+        status = 'done' if done else rng.choice(('todo', 'todo', 'in_progress'))
+        has_due_date = rng.random() < 0.7
+        due_date = created_at + timedelta(days=rng.lognormvariate(2.3, 0.8)) if has_due_date else None
+        touched = status != 'todo' or rng.random() < 0.3
+        updated_at = created_at + timedelta(days=min(age, rng.expovariate(1 / 7))) if touched else created_at
+        yield Task(
+            id=uuid.UUID(int=rng.getrandbits(128), version=4),
+            title=' '.join(rng.choices(words, cum_weights=cum_weights, k=rng.randint(2, 6))).capitalize(),
+            description=' '.join(rng.choices(words, cum_weights=cum_weights, k=rng.randint(0, 60))),
+            status=status,
+            priority=rng.choices((1, 2, 3, 4, 5), weights=(10, 25, 35, 20, 10))[0],
+            due_date=due_date,
+            created_at=created_at,
+            updated_at=updated_at,
+        )
+
+
+def insert_tasks(tasks, connection):
+    """INSERT ``tasks`` as they are, including their timestamps."""
+    from tasks.models import Task
+
+    fields = Task._meta.concrete_fields
+    # get_db_prep_save() checks every datetime for naivety; the generated
+    # ones are aware, so adapt them directly.
+    prepare = [
+        connection.ops.adapt_datetimefield_value
+        if field.get_internal_type() == 'DateTimeField'
+        else lambda value, field=field: field.get_db_prep_save(value, connection)
+        for field in fields
+    ]
+    quote = connection.ops.quote_name
+    sql = 'INSERT INTO {} ({}) VALUES ({})'.format(
+        quote(Task._meta.db_table),
+        ', '.join(quote(field.column) for field in fields),
+        ', '.join(['%s'] * len(fields)),
+    )
+    rows = [
+        [convert(getattr(task, field.attname)) for field, convert in zip(fields, prepare)]
+        for task in tasks
+    ]
+    with connection.cursor() as cursor:
+        cursor.executemany(sql, rows)
+
+
+def seed_tasks(count, seed=0, batch_size=5000, progress=None):
+    """
+    Insert synthetic tasks until the table holds ``count``, then ANALYZE it
+    so the planner sees statistics like a production database's.
+    """
+    from itertools import islice
+    from django.db import connection, transaction
+    from tasks.models import Task
+
+    existing = Task.objects.count()
+    if existing >= count:
+        return existing
+    tasks = generate_tasks(count - existing, seed=seed, start=existing, total=count)
+    sqlite = connection.vendor == 'sqlite'
+    if sqlite:
+        # Scratch data: skip fsyncs while loading, as a restore would.
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA synchronous')
+            previous = cursor.fetchone()[0]
+            cursor.execute('PRAGMA synchronous = OFF')
+    try:
+        inserted = existing
+        while True:
+            batch = list(islice(tasks, batch_size))
+            if not batch:
+                break
+            with transaction.atomic():
+                insert_tasks(batch, connection)
+            inserted += len(batch)
+            if progress:
+                progress(inserted, count)
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+    finally:
+        if sqlite:
+            with connection.cursor() as cursor:
+                cursor.execute(f'PRAGMA synchronous = {previous}')
+    return count
+
+
+def describe(now=None):
+    """Return the status, priority and due date mix of the task table."""
+    from django.db.models import Count
+    from django.utils import timezone
+    from tasks.models import Task
+
+    now = now or timezone.now()
+    summary = Task.objects.summary(now)
+    return {
+        'rows': summary['total_tasks'],
+        'status': dict(Task.objects.order_by().values_list('status').annotate(Count('pk'))),
+        'priority': dict(Task.objects.order_by().values_list('priority').annotate(Count('pk'))),
+        'with_due_date': Task.objects.filter(due_date__isnull=False).count(),
+        'overdue': summary['overdue_count'],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=parse_rows, default='10k', help='10k, 1m, 10m or a number')
+    parser.add_argument('--db', help='SQLite file to create or extend')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    db_path = setup_django(args.db)
+    started = time.perf_counter()
+
+    def progress(inserted, total):
+        rate = inserted / (time.perf_counter() - started)
+        print(f'\r{inserted:>12,} / {total:,} tasks   {rate:>9,.0f} rows/s', end='', file=sys.stderr)
+
+    seed_tasks(args.rows, seed=args.seed, progress=progress)
+    print(f'\n{db_path}: {describe()}', file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1 @@
+pytest_plugins = ['tasks.tests.query_budget']
@@ -0,0 +1,11 @@
+"""
+URL configuration of the API alone.
+
+The root URLconf of the ``TASKS_APP_PROFILE=api`` settings profile, and the
+API part of ``task_manager.urls``.
+"""
+from django.urls import path, include
+
+urlpatterns = [
+    path('api/', include('tasks.urls')),
+]
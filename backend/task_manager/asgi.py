@@ -9,8 +9,14 @@ https://docs.djangoproject.com/en/5.1/howto/deployment/asgi/
 
 import os
 
-from django.core.asgi import get_asgi_application
+import django
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'task_manager.settings')
 
-application = get_asgi_application()
+# As get_asgi_application(), with a handler that can hold thousands of open
+# event streams (/api/tasks/events/) without a thread each.
+django.setup(set_prefix=False)
+
+from tasks.events import EventStreamHandler  # noqa: E402 (needs the app registry)
+
+application = EventStreamHandler()
@@ -1,5 +1,8 @@
+import os
 from pathlib import Path
 
+from corsheaders.defaults import default_headers
+
 BASE_DIR = Path(__file__).resolve().parent.parent
 
 SECRET_KEY = 'django-insecure-development-key-change-in-production'
@@ -27,7 +30,11 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'tasks.metrics.metrics_middleware',
+    'tasks.profiling.profiling_middleware',
+    'tasks.compression.compression_middleware',
     'corsheaders.middleware.CorsMiddleware',
+    'tasks.routers.replica_pinning_middleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -64,6 +71,58 @@ DATABASES = {
     }
 }
 
+# Read replicas: tasks.routers.TaskRouter reads task models from one of
+# TASKS_READ_DATABASES and writes to 'default'. A client that wrote reads from
+# 'default' for TASKS_REPLICA_PIN_SECONDS. TASKS_REPLICA_DB names a second
+# SQLite file to stand in for a replica locally (see sync_replicas).
+DATABASE_ROUTERS = ['tasks.routers.TaskRouter']
+TASKS_READ_DATABASES = []
+TASKS_REPLICA_PIN_SECONDS = 5
+
+if os.environ.get('TASKS_REPLICA_DB'):
+    DATABASES['replica'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.environ['TASKS_REPLICA_DB'],
+        'TEST': {'MIRROR': 'default'},
+    }
+    TASKS_READ_DATABASES = ['replica']
+
+# SQLite tuning applied to each new connection by tasks.db; empty for
+# development. TASKS_DB_PROFILE=production in the environment enables the
+# production profile below.
+TASKS_SQLITE_PRAGMAS = {}
+TASKS_SQLITE_TRANSACTION_MODE = None
+
+if os.environ.get('TASKS_DB_PROFILE') == 'production':
+    # Keep connections for ten minutes instead of reconnecting per request,
+    # checking they still work before reusing them.
+    DATABASES['default']['CONN_MAX_AGE'] = 600
+    DATABASES['default']['CONN_HEALTH_CHECKS'] = True
+    TASKS_SQLITE_PRAGMAS = {
+        # Readers and the writer no longer block each other.
+        'journal_mode': 'WAL',
+        # With WAL, a power loss can only lose the last commits, not corrupt.
+        'synchronous': 'NORMAL',
+        # Wait up to 5 s for another writer instead of failing right away.
+        'busy_timeout': 5000,
+        'mmap_size': 256 * 1024 * 1024,
+        # Negative values are KiB: 64 MiB of page cache per connection.
+        'cache_size': -64 * 1024,
+        'temp_store': 'MEMORY',
+    }
+    TASKS_SQLITE_TRANSACTION_MODE = 'IMMEDIATE'
+
+# Task version tokens, summaries and (with DjangoCacheBackend) responses live
+# here. Several worker processes must share it, e.g. through FileBasedCache:
+#   'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+#   'LOCATION': '/var/tmp/task_manager_cache',
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'task-manager',
+    }
+}
+
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
     {'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator'},
@@ -97,6 +156,37 @@ REST_FRAMEWORK = {
     ],
 }
 
+# API-only deployments: TASKS_APP_PROFILE=api in the environment serves just
+# /api/ (task_manager.api_urls), without the admin, Swagger/ReDoc and the
+# session, CSRF, auth, messages and clickjacking middleware, none of which
+# the JSON API uses. Startup skips loading those apps and each request skips
+# five middleware (and, under ASGI, their thread hops).
+API_ONLY_EXCLUDED_APPS = [
+    'django.contrib.admin',
+    'django.contrib.sessions',
+    'django.contrib.messages',
+    'drf_yasg',
+]
+API_ONLY_EXCLUDED_MIDDLEWARE = [
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+]
+
+if os.environ.get('TASKS_APP_PROFILE') == 'api':
+    INSTALLED_APPS = [app for app in INSTALLED_APPS if app not in API_ONLY_EXCLUDED_APPS]
+    MIDDLEWARE = [name for name in MIDDLEWARE if name not in API_ONLY_EXCLUDED_MIDDLEWARE]
+    ROOT_URLCONF = 'task_manager.api_urls'
+    TEMPLATES[0]['OPTIONS']['context_processors'].remove(
+        'django.contrib.messages.context_processors.messages'
+    )
+    # Without sessions only HTTP Basic credentials can identify a user.
+    REST_FRAMEWORK['DEFAULT_AUTHENTICATION_CLASSES'] = [
+        'rest_framework.authentication.BasicAuthentication',
+    ]
+
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:5173",
     "http://127.0.0.1:5173",
@@ -104,4 +194,86 @@ CORS_ALLOWED_ORIGINS = [
     "http://127.0.0.1:3000",
 ]
 
-CORS_ALLOW_METHODS = ['DELETE', 'GET', 'OPTIONS', 'PATCH', 'POST', 'PUT']
\ No newline at end of file
+CORS_ALLOW_METHODS = ['DELETE', 'GET', 'OPTIONS', 'PATCH', 'POST', 'PUT']
+
+# Conditional requests: let the frontend send If-Match and read the validators.
+CORS_ALLOW_HEADERS = list(default_headers) + ['if-match', 'if-none-match']
+CORS_EXPOSE_HEADERS = ['ETag', 'Last-Modified']
+
+# Summary counts are cached per time bucket (in seconds); overdue counts are
+# never more than one bucket behind the clock.
+TASKS_SUMMARY_CACHE_BUCKET = 60
+
+# Full-text search backend used by ?search= and title_contains. None picks one
+# for the database engine (FTS5 on SQLite, tsvector/GIN on PostgreSQL).
+TASKS_SEARCH_BACKEND = None
+
+# Bulk endpoints (/api/tasks/bulk/): items accepted per request and rows
+# written per INSERT/UPDATE statement inside the request's transaction.
+TASKS_BULK_MAX_ITEMS = 10000
+TASKS_BULK_CHUNK_SIZE = 500
+
+# Rows fetched per database round trip while streaming /api/tasks/export/.
+TASKS_EXPORT_CHUNK_SIZE = 2000
+
+# Rows inserted per transaction by the import_tasks management command.
+TASKS_IMPORT_BATCH_SIZE = 1000
+
+# Response cache for the task list and detail views (tasks.response_cache).
+# LRUBackend is per process; for several workers use
+# 'tasks.response_cache.DjangoCacheBackend' with OPTIONS {'alias': ..., 'timeout': ...}.
+# None disables it.
+TASKS_RESPONSE_CACHE = {
+    'BACKEND': 'tasks.response_cache.LRUBackend',
+    'OPTIONS': {'max_entries': 1000},
+}
+
+# Change feed (/api/tasks/changes/): writes younger than the settle delay are
+# held back so a slow transaction cannot commit behind a client's cursor (bulk
+# writes slower than half of it restamp their rows before committing);
+# deletions are remembered for the retention period (purge_tombstones), and
+# older cursors get 410 Gone.
+TASKS_CHANGES_SETTLE_SECONDS = 1
+TASKS_CHANGES_MAX_LIMIT = 1000
+TASKS_TOMBSTONE_RETENTION_DAYS = 30
+
+# Server-Sent Events (/api/tasks/events/, served by task_manager.asgi): events
+# queued per client before its backlog is replaced by a resync event, idle
+# seconds between heartbeats, seconds between summary deltas, and the most
+# tasks a write may touch before it is announced as a resync instead.
+TASKS_EVENTS_QUEUE_SIZE = 100
+TASKS_EVENTS_HEARTBEAT_SECONDS = 15
+TASKS_EVENTS_SUMMARY_SECONDS = 10
+TASKS_EVENTS_MAX_TASKS = 100
+
+# Requests slower than this are logged by tasks.metrics with the SQL they
+# issued (logger "tasks.metrics", level WARNING): the slowest statements, each
+# cut to a number of characters.
+TASKS_SLOW_REQUEST_SECONDS = 1.0
+TASKS_SLOW_REQUEST_STATEMENTS = 20
+TASKS_SLOW_REQUEST_SQL_LENGTH = 1000
+
+# Request profiling (tasks.profiling): a request is profiled when it sends
+# X-Tasks-Profile with TASKS_PROFILE_TOKEN (None turns the header off), or at
+# random for TASKS_PROFILE_SAMPLE_RATE of requests. Stacks are sampled every
+# TASKS_PROFILE_INTERVAL seconds; the last TASKS_PROFILE_KEEP profiles are kept
+# in TASKS_PROFILE_DIR. While a profile runs the interpreter's (process-wide)
+# switch interval is shortened to the sampling interval unless
+# TASKS_PROFILE_SHORTEN_SWITCH_INTERVAL is False.
+TASKS_PROFILE_TOKEN = os.environ.get('TASKS_PROFILE_TOKEN') or None
+TASKS_PROFILE_SAMPLE_RATE = 0.0
+TASKS_PROFILE_INTERVAL = 0.001
+TASKS_PROFILE_DIR = BASE_DIR / 'profiles'
+TASKS_PROFILE_KEEP = 100
+TASKS_PROFILE_SHORTEN_SWITCH_INTERVAL = True
+
+# OpenAPI document served by /swagger/ and /redoc/ (tasks.openapi), written by
+# the generate_openapi management command at deploy time. Without the file it
+# is generated once per process.
+TASKS_OPENAPI_FILE = BASE_DIR / 'openapi.json'
+
+# Response compression (tasks.compression): encodings in order of preference
+# (br needs the optional brotli package), applied to responses of at least
+# TASKS_COMPRESSION_MIN_BYTES. An empty list turns it off.
+TASKS_COMPRESSION = ['br', 'gzip']
+TASKS_COMPRESSION_MIN_BYTES = 1024
@@ -1,22 +1,12 @@
 from django.contrib import admin
-from django.urls import path, include
-from rest_framework import permissions
-from drf_yasg.views import get_schema_view
-from drf_yasg import openapi
+from django.urls import path
 
-schema_view = get_schema_view(
-    openapi.Info(
-        title="Task Manager API",
-        default_version='v1',
-        description="RESTful API for managing tasks",
-    ),
-    public=True,
-    permission_classes=(permissions.AllowAny,),
-)
+from tasks.openapi import SchemaView
 
-urlpatterns = [
+from .api_urls import urlpatterns as api_urlpatterns
+
+urlpatterns = api_urlpatterns + [
     path('admin/', admin.site.urls),
-    path('api/', include('tasks.urls')),
-    path('swagger/', schema_view.with_ui('swagger', cache_timeout=0), name='schema-swagger-ui'),
-    path('redoc/', schema_view.with_ui('redoc', cache_timeout=0), name='schema-redoc'),
-]
\ No newline at end of file
+    path('swagger/', SchemaView.with_ui('swagger', cache_timeout=0), name='schema-swagger-ui'),
+    path('redoc/', SchemaView.with_ui('redoc', cache_timeout=0), name='schema-redoc'),
+]
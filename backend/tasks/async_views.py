@@ -0,0 +1,91 @@
+"""
+Async read endpoints (``/api/async/tasks/``) for the ASGI entry point.
+
+They answer like the list, detail and summary actions of ``TaskViewSet``,
+with the same authentication, permissions, throttling, filters, search,
+ordering, pagination, sparse fieldsets and JSON, but run on the event loop
+and query through the async ORM. Under ASGI a DRF view is a sync view, which
+Django runs in a thread of its own for every request.
+
+Conditional requests and the response cache are not applied here because
+their storage is synchronous.
+"""
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.http import HttpResponse
+from rest_framework.exceptions import MethodNotAllowed, NotFound
+from rest_framework.renderers import JSONRenderer
+from rest_framework.views import APIView
+
+from .models import Task
+from .serializers import TaskRowSerializer, TaskSummarySerializer
+from .views import TaskViewSet
+
+
+def render(request, data, status=200, headers=None):
+    content = JSONRenderer().render(data)
+    response = HttpResponse(
+        b'' if request.method == 'HEAD' else content, status=status,
+        content_type='application/json', headers=headers,
+    )
+    response['Content-Length'] = len(content)
+    return response
+
+
+def read_view(action):
+    """
+    Turn ``view_func(view, request, **kwargs)`` into an async Django view.
+
+    ``view`` is a ``TaskViewSet`` set up for ``action``. Its ``initial()``
+    (authentication, permissions and throttles, which may query the
+    database) runs in a thread; of the rest only its filtering and
+    pagination, which do not touch the database, are used.
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        async def wrapper(request, **kwargs):
+            view = TaskViewSet(
+                action=action, args=(), kwargs=kwargs, format_kwarg=None,
+                detail=bool(kwargs), headers={},
+            )
+            request = view.request = APIView.initialize_request(view, request, **kwargs)
+            try:
+                if request.method not in ('GET', 'HEAD'):
+                    raise MethodNotAllowed(request.method)
+                await sync_to_async(view.initial)(request)
+                return render(request, await view_func(view, request, **kwargs))
+            except Exception as exc:
+                response = view.handle_exception(exc)
+                headers = {name: value for name, value in response.items() if name != 'Content-Type'}
+                return render(request, response.data, response.status_code, headers)
+        return wrapper
+    return decorator
+
+
+@read_view('list')
+async def task_list(view, request):
+    queryset = view.filter_queryset(view.get_queryset())
+    rows = queryset.values(*view.get_row_columns(queryset))
+    serializer = TaskRowSerializer(request.now, view.get_fieldset())
+    page = await view.paginator.apaginate_queryset(rows, request, view)
+    if page is not None:
+        return view.paginator.get_paginated_response(serializer.many(page)).data
+    return serializer.many([row async for row in rows])
+
+
+@read_view('retrieve')
+async def task_detail(view, request, pk):
+    queryset = view.get_queryset()
+    try:
+        row = await queryset.values(*view.get_row_columns(queryset)).aget(pk=pk)
+    except (Task.DoesNotExist, ValueError, DjangoValidationError):
+        raise NotFound()
+    return TaskRowSerializer(request.now, view.get_fieldset()).to_representation(row)
+
+
+@read_view('summary')
+async def task_summary(view, request):
+    queryset = view.filter_queryset(view.get_queryset())
+    return TaskSummarySerializer(await queryset.asummary(request.now)).data
@@ -0,0 +1,113 @@
+"""
+Cache helpers for derived Task data.
+
+Every cached entry is keyed by the current table version, a token that is
+replaced (together with the time of the change) whenever a task is written.
+Bumping the version makes all older entries unreachable, so invalidation is
+a single cache write no matter how many filtered variants are stored.
+"""
+import hashlib
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+
+from . import routers
+
+VERSION_KEY = 'tasks:version'
+
+
+def new_version():
+    return uuid.uuid4().hex, time.time()
+
+
+def get_version_info():
+    """
+    Return ``(version, changed_at)`` for the task table, creating them if the
+    cache is cold. A cold cache reports the current time as ``changed_at``
+    because the time of the last write is unknown.
+
+    With read replicas the version also tells which database the request
+    reads from (see ``routers.read_consistency``).
+    """
+    info = cache.get(VERSION_KEY)
+    if info is None:
+        info = new_version()
+        if not cache.add(VERSION_KEY, info, timeout=None):
+            info = cache.get(VERSION_KEY, info)
+    version, changed_at = info
+    return version + routers.read_consistency(changed_at), changed_at
+
+
+def get_version():
+    """Return the current table version token."""
+    return get_version_info()[0]
+
+
+def bump_version():
+    """Invalidate every entry derived from the task table."""
+    cache.set(VERSION_KEY, new_version(), timeout=None)
+
+
+def normalize_params(query_params, ignore=()):
+    """Return a stable string for a QueryDict, independent of parameter order."""
+    items = sorted(
+        (key, value)
+        for key, values in query_params.lists()
+        if key not in ignore
+        for value in values
+    )
+    return '&'.join(f'{key}={value}' for key, value in items)
+
+
+def summary_bucket_size():
+    return getattr(settings, 'TASKS_SUMMARY_CACHE_BUCKET', 60)
+
+
+def summary_bucket(now):
+    """Return the time bucket ``now`` falls in and the seconds left in it."""
+    size = summary_bucket_size()
+    timestamp = int(now.timestamp())
+    return timestamp // size, size - timestamp % size
+
+
+def summary_cache_key(params, bucket):
+    digest = hashlib.md5(params.encode('utf-8')).hexdigest()
+    return f'tasks:summary:{get_version()}:{bucket}:{digest}'
+
+
+def get_or_set_summary(params, now, compute):
+    """
+    Return the cached summary for ``params``, calling ``compute`` on a miss.
+
+    Entries expire at the end of their time bucket because overdue counts
+    change with the clock even when no task is written.
+    """
+    bucket, remaining = summary_bucket(now)
+    key = summary_cache_key(params, bucket)
+    data = cache.get(key)
+    if data is None:
+        data = compute()
+        cache.set(key, data, timeout=remaining)
+    return data
+
+
+def get_or_set_overdue_watermark(now, compute):
+    """
+    Return the latest due date before ``now`` among open tasks.
+
+    ``compute`` returns that watermark and the first open due date at or
+    after ``now``. Until that next due date passes (or a task is written) the
+    watermark cannot change, so both are cached under the table version and
+    reused by every request that falls in between.
+    """
+    key = f'tasks:overdue-watermark:{get_version()}'
+    bounds = cache.get(key)
+    if bounds is not None:
+        watermark, next_due = bounds
+        if (watermark is None or watermark < now) and (next_due is None or now <= next_due):
+            return watermark
+    watermark, next_due = compute()
+    cache.set(key, (watermark, next_due), timeout=None)
+    return watermark
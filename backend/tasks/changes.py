@@ -0,0 +1,174 @@
+"""
+Incremental change feed for task clients.
+
+A cursor holds two keyset positions: the (updated_at, id) of the last task
+and the (deleted_at, id) of the last tombstone a client has seen. Each call
+returns the tasks written and the ids deleted after those positions, oldest
+first, and a cursor for the next call.
+
+Rows younger than ``TASKS_CHANGES_SETTLE_SECONDS`` are held back: a write
+that commits later than a newer one must not end up behind a cursor that
+has already moved past it. Multi-row writes run in ``stamped_writes`` so
+they never commit later than that after their ``updated_at``.
+"""
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from contextlib import contextmanager
+from datetime import timedelta
+from time import monotonic
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework import status
+from rest_framework.exceptions import APIException, NotFound
+
+from .models import Task, TaskTombstone
+from .serializers import TaskRowSerializer
+
+
+class CursorExpired(APIException):
+    status_code = status.HTTP_410_GONE
+    default_detail = 'The cursor is older than the tombstone retention; fetch the full list again.'
+    default_code = 'cursor_expired'
+
+
+def get_settle_delay():
+    return timedelta(seconds=getattr(settings, 'TASKS_CHANGES_SETTLE_SECONDS', 1))
+
+
+@contextmanager
+def stamped_writes():
+    """
+    Run a multi-row task write in a transaction; yields ``(now, written)``.
+
+    Stamp the rows with ``now`` and add their pks to ``written``. A
+    transaction that has taken more than half the settle delay by the time
+    it commits (a slow batch, or one that waited for the write lock)
+    stamps its rows again just before committing. Batches are capped at
+    ``TASKS_BULK_MAX_ITEMS``, which keeps that last UPDATE short.
+    """
+    started = monotonic()
+    written = []
+    with transaction.atomic():
+        yield timezone.now(), written
+        if monotonic() - started > get_settle_delay().total_seconds() / 2:
+            now, chunk_size = timezone.now(), getattr(settings, 'TASKS_BULK_CHUNK_SIZE', 500)
+            for start in range(0, len(written), chunk_size):
+                Task.objects.filter(pk__in=written[start:start + chunk_size]).update(updated_at=now)
+
+
+def get_retention():
+    return timedelta(days=getattr(settings, 'TASKS_TOMBSTONE_RETENTION_DAYS', 30))
+
+
+def encode_cursor(position):
+    payload = json.dumps({
+        'u': position['updated_at'] and position['updated_at'].isoformat(),
+        'k': position['pk'] and str(position['pk']),
+        'd': position['deleted_at'] and position['deleted_at'].isoformat(),
+        't': position['tombstone'],
+        'i': position['issued_at'].isoformat(),
+    }, separators=(',', ':'))
+    return urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(encoded):
+    try:
+        payload = json.loads(urlsafe_b64decode(encoded.encode('ascii')))
+        position = {
+            'updated_at': payload['u'] and parse_datetime(payload['u']),
+            'pk': payload['k'] and Task._meta.pk.to_python(payload['k']),
+            'deleted_at': payload['d'] and parse_datetime(payload['d']),
+            'tombstone': payload['t'] and int(payload['t']),
+            'issued_at': parse_datetime(payload['i']),
+        }
+    except (TypeError, ValueError, KeyError, ValidationError):
+        raise NotFound('Invalid cursor')
+    if position['issued_at'] is None or (position['pk'] is None) != (position['updated_at'] is None):
+        raise NotFound('Invalid cursor')
+    return position
+
+
+def after(time_field, pk_field, time, pk):
+    if time is None:
+        return Q()
+    return Q(**{f'{time_field}__gt': time}) | Q(**{time_field: time, f'{pk_field}__gt': pk})
+
+
+def latest_cursor(now):
+    """Return a cursor positioned after every change visible at ``now``."""
+    horizon = now - get_settle_delay()
+    task = (
+        Task.objects.filter(updated_at__lte=horizon).order_by('-updated_at', '-pk')
+        .values('updated_at', 'pk').first()
+    ) or {'updated_at': None, 'pk': None}
+    tombstone = (
+        TaskTombstone.objects.filter(deleted_at__lte=horizon).order_by('-deleted_at', '-id')
+        .values('deleted_at', 'id').first()
+    ) or {'deleted_at': None, 'id': None}
+    return encode_cursor({
+        'updated_at': task['updated_at'], 'pk': task['pk'],
+        'deleted_at': tombstone['deleted_at'], 'tombstone': tombstone['id'],
+        'issued_at': horizon,
+    })
+
+
+def get_changes(encoded_cursor, limit, now):
+    """
+    Return the changes after ``encoded_cursor`` (None for a full sync).
+
+    At most ``limit`` tasks and ``limit`` deletions are returned; ``has_more``
+    tells the client to call again with the new cursor straight away.
+    """
+    horizon = now - get_settle_delay()
+    if encoded_cursor is None:
+        # A client without a cursor holds no tasks, so past deletions do not
+        # concern it; start its tombstone position at the present.
+        position = decode_cursor(latest_cursor(now))
+        position.update(updated_at=None, pk=None)
+    else:
+        position = decode_cursor(encoded_cursor)
+        if position['issued_at'] < now - get_retention():
+            raise CursorExpired()
+
+    tasks = list(
+        Task.objects.filter(updated_at__lte=horizon)
+        .filter(after('updated_at', 'pk', position['updated_at'], position['pk']))
+        .order_by('updated_at', 'pk')
+        .values(*TaskRowSerializer.fields)[:limit + 1]
+    )
+    tombstones = list(
+        TaskTombstone.objects.filter(deleted_at__lte=horizon)
+        .filter(after('deleted_at', 'id', position['deleted_at'], position['tombstone']))
+        .order_by('deleted_at', 'id')
+        .values('id', 'task_id', 'deleted_at')[:limit + 1]
+    )
+    has_more = len(tasks) > limit or len(tombstones) > limit
+    # The cursor may only claim to have seen deletions up to its tombstone
+    # position; that is what the retention check compares against.
+    position['issued_at'] = horizon
+    if len(tombstones) > limit:
+        position['issued_at'] = tombstones[limit - 1]['deleted_at']
+    tasks, tombstones = tasks[:limit], tombstones[:limit]
+
+    if tasks:
+        position.update(updated_at=tasks[-1]['updated_at'], pk=tasks[-1]['id'])
+    if tombstones:
+        position.update(deleted_at=tombstones[-1]['deleted_at'], tombstone=tombstones[-1]['id'])
+
+    return {
+        'changed': TaskRowSerializer(now).many(tasks),
+        'deleted': [str(tombstone['task_id']) for tombstone in tombstones],
+        'cursor': encode_cursor(position),
+        'has_more': has_more,
+    }
+
+
+def purge_tombstones(now):
+    """Delete tombstones older than the retention period; returns the count."""
+    deleted, _ = TaskTombstone.objects.filter(deleted_at__lt=now - get_retention()).delete()
+    return deleted
@@ -0,0 +1,135 @@
+"""
+HTTP validators (ETag / Last-Modified) for task responses.
+
+A task's representation changes when it is written and, without any write,
+when its due date passes and ``is_overdue`` flips. Detail validators are
+therefore built from ``updated_at`` and the overdue state. Collection
+validators use the table version from ``cache`` plus the latest due date that
+has passed among open tasks: overdue flips happen in due-date order, so that
+watermark moves whenever any task in any filtered list becomes overdue.
+"""
+import hashlib
+import re
+
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from . import cache
+from .models import Task
+
+
+class PreconditionFailed(APIException):
+    status_code = status.HTTP_412_PRECONDITION_FAILED
+    default_detail = 'The task has changed since it was fetched.'
+    default_code = 'precondition_failed'
+
+
+def make_etag(*parts):
+    digest = hashlib.sha1('\x1f'.join(map(str, parts)).encode('utf-8')).hexdigest()
+    return f'"{digest}"'
+
+
+# Compressed responses carry ``"<digest>-<coding>"`` (see ``coded_etag``).
+CODED_ETAG = re.compile(r'-(?:br|gzip)"')
+
+
+def coded_etag(etag, coding):
+    """
+    Return the strong ETag of ``etag``'s representation sent with
+    Content-Encoding ``coding``. Preconditions ignore the suffix, so the tag
+    of a compressed GET still matches an If-Match or If-None-Match.
+    """
+    return f'{etag[:-1]}-{coding}"'
+
+
+def strip_codings(request):
+    for header in ('HTTP_IF_MATCH', 'HTTP_IF_NONE_MATCH'):
+        if header in request.META:
+            request.META[header] = CODED_ETAG.sub('"', request.META[header])
+
+
+# Task fields read by ``task_validators``, loaded even for sparse fieldsets.
+VALIDATOR_FIELDS = ('status', 'due_date', 'updated_at')
+
+
+def task_validators(task, now, media_type, fields=None):
+    """
+    Return ``(etag, last_modified)`` for one task's representation, limited
+    to ``fields`` when given.
+    """
+    overdue = bool(task.due_date) and task.status != 'done' and now > task.due_date
+    modified = max(task.updated_at, task.due_date) if overdue else task.updated_at
+    variant = (media_type, ','.join(fields)) if fields else (media_type,)
+    etag = make_etag(task.pk, task.updated_at.isoformat(), overdue, *variant)
+    return etag, modified.timestamp()
+
+
+def overdue_bounds(now):
+    """Return the latest open due date before ``now`` and the first one after."""
+    open_tasks = Task.objects.exclude(status='done')
+    watermark = (
+        open_tasks.filter(due_date__lt=now).order_by('-due_date')
+        .values_list('due_date', flat=True).first()
+    )
+    next_due = (
+        open_tasks.filter(due_date__gte=now).order_by('due_date')
+        .values_list('due_date', flat=True).first()
+    )
+    return watermark, next_due
+
+
+def overdue_watermark(now):
+    return cache.get_or_set_overdue_watermark(now, lambda: overdue_bounds(now))
+
+
+def collection_validators(params, now, media_type):
+    """Return ``(etag, last_modified)`` for a list filtered by ``params``."""
+    version, changed_at = cache.get_version_info()
+    watermark = overdue_watermark(now)
+    etag = make_etag(version, watermark and watermark.isoformat(), params, media_type)
+    modified = max(changed_at, watermark.timestamp()) if watermark else changed_at
+    return etag, modified
+
+
+def summary_validators(params, now, media_type):
+    """
+    Return ``(etag, last_modified)`` for a summary. Summaries are cached per
+    time bucket, so the validators change with the bucket as well.
+    """
+    version, changed_at = cache.get_version_info()
+    bucket, _ = cache.summary_bucket(now)
+    etag = make_etag(version, bucket, params, media_type)
+    return etag, max(changed_at, bucket * cache.summary_bucket_size())
+
+
+def has_write_preconditions(request):
+    return request.method not in ('GET', 'HEAD', 'OPTIONS') and (
+        'HTTP_IF_MATCH' in request.META or 'HTTP_IF_UNMODIFIED_SINCE' in request.META
+    )
+
+
+def evaluate(request, etag, last_modified):
+    """
+    Evaluate the request's preconditions.
+
+    Returns a 304 response (carrying the validators) for a GET or HEAD whose
+    cached copy is current, raises ``PreconditionFailed`` when a precondition
+    fails and returns None when the request should proceed.
+    """
+    strip_codings(request)
+    response = get_conditional_response(request, etag=etag, last_modified=int(last_modified))
+    if response is None:
+        return None
+    if response.status_code == status.HTTP_412_PRECONDITION_FAILED:
+        raise PreconditionFailed()
+    return set_validators(response, etag, last_modified)
+
+
+def set_validators(response, etag, last_modified):
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    # Let clients keep the response but revalidate it on every use.
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
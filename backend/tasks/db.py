@@ -0,0 +1,54 @@
+"""
+SQLite connection tuning, applied to every new connection.
+
+``TASKS_SQLITE_PRAGMAS`` maps PRAGMA names to values, run in order when a
+connection opens. ``TASKS_SQLITE_TRANSACTION_MODE = 'IMMEDIATE'`` makes
+``atomic()`` take the write lock at BEGIN. A deferred transaction that reads
+and then writes cannot wait for a concurrent writer; it fails at once with
+"database is locked", whatever the busy timeout. Both settings are empty in
+development and filled by the production profile in ``settings.py``.
+"""
+import types
+
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+TRANSACTION_MODES = ('DEFERRED', 'IMMEDIATE', 'EXCLUSIVE')
+
+
+def start_transaction(connection, mode):
+    def _start_transaction_under_autocommit(self):
+        self.cursor().execute(f'BEGIN {mode}')
+    connection._start_transaction_under_autocommit = types.MethodType(
+        _start_transaction_under_autocommit, connection
+    )
+
+
+@receiver(connection_created)
+def configure_sqlite(sender, connection, **kwargs):
+    if connection.vendor != 'sqlite':
+        return
+    pragmas = getattr(settings, 'TASKS_SQLITE_PRAGMAS', None) or {}
+    if pragmas:
+        with connection.cursor() as cursor:
+            for name, value in pragmas.items():
+                cursor.execute(f'PRAGMA {name} = {value}')
+
+    mode = getattr(settings, 'TASKS_SQLITE_TRANSACTION_MODE', None)
+    if mode:
+        if mode not in TRANSACTION_MODES:
+            raise ValueError(f'TASKS_SQLITE_TRANSACTION_MODE must be one of {TRANSACTION_MODES}.')
+        start_transaction(connection, mode)
+
+
+def sqlite_status(connection):
+    """Return the effective values of the configured PRAGMAs."""
+    pragmas = getattr(settings, 'TASKS_SQLITE_PRAGMAS', None) or {}
+    with connection.cursor() as cursor:
+        status = {}
+        for name in pragmas:
+            cursor.execute(f'PRAGMA {name}')
+            row = cursor.fetchone()
+            status[name] = row[0] if row else None
+    return status
@@ -0,0 +1,252 @@
+"""
+In-process publish/subscribe for pushing task changes to clients.
+
+``tasks_changed`` receivers publish an ``Event`` once the write has committed
+and every ``Subscription`` (one per open event stream) gets it on its own
+bounded ``asyncio.Queue``. Subscriptions live on the event loop, so thousands
+of idle streams cost a queue each rather than a thread each (see
+``EventStreamHandler``). A subscriber that
+falls ``TASKS_EVENTS_QUEUE_SIZE`` events behind has its backlog replaced by a
+single ``resync`` event.
+
+While anyone is subscribed, one summary pump per process recomputes the task
+summary every ``TASKS_EVENTS_SUMMARY_SECONDS`` and publishes the counts that
+changed. Only writes made by this process are published as task events; the
+summary also reflects writes made elsewhere.
+"""
+import asyncio
+import json
+import threading
+from collections import namedtuple
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIHandler
+from django.db import transaction
+from django.http import QueryDict, StreamingHttpResponse
+from django.utils import timezone
+
+from . import cache
+from .models import Task
+from .serializers import TaskRowSerializer, TaskSummarySerializer
+
+# Scope key under which ``EventStreamHandler`` offers a coroutine function that
+# returns once the client has gone away.
+DISCONNECT_KEY = 'tasks.wait_for_disconnect'
+
+Event = namedtuple('Event', ['name', 'data'])
+
+
+def get_queue_size():
+    return getattr(settings, 'TASKS_EVENTS_QUEUE_SIZE', 100)
+
+
+def get_heartbeat():
+    return getattr(settings, 'TASKS_EVENTS_HEARTBEAT_SECONDS', 15)
+
+
+def get_summary_interval():
+    return getattr(settings, 'TASKS_EVENTS_SUMMARY_SECONDS', 10)
+
+
+class Subscription:
+    """One subscriber's queue, bound to the event loop it was created on."""
+
+    def __init__(self, loop, max_size):
+        self.loop = loop
+        self.queue = asyncio.Queue(max_size)
+        self.closed = False
+
+    def push(self, event):
+        """Queue ``event``; safe to call from any thread."""
+        self.loop.call_soon_threadsafe(self.put, event)
+
+    def put(self, event):
+        if self.closed:
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(Event('resync', {'reason': 'overflow'}))
+
+    def close(self):
+        """Wake the reader with a final None; later events are dropped."""
+        if not self.closed:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(None)
+            self.closed = True
+
+    async def get(self, timeout=None):
+        """Return the next event, None once closed, or raise TimeoutError."""
+        return await asyncio.wait_for(self.queue.get(), timeout)
+
+
+class Broker:
+    def __init__(self):
+        self.subscriptions = set()
+        self.lock = threading.Lock()
+        self.summary = None
+        self.pump = None
+
+    def has_subscribers(self):
+        return bool(self.subscriptions)
+
+    def subscribe(self):
+        """Subscribe from a coroutine; starts the summary pump if needed."""
+        loop = asyncio.get_running_loop()
+        subscription = Subscription(loop, get_queue_size())
+        with self.lock:
+            self.subscriptions.add(subscription)
+            if self.pump is None or self.pump.done() or self.pump.get_loop() is not loop:
+                self.summary = None
+                self.pump = loop.create_task(self.pump_summary())
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            self.subscriptions.discard(subscription)
+        subscription.close()
+
+    def publish(self, event):
+        with self.lock:
+            subscriptions = list(self.subscriptions)
+        for subscription in subscriptions:
+            try:
+                subscription.push(event)
+            except RuntimeError:
+                # Its event loop has been closed without unsubscribing.
+                self.unsubscribe(subscription)
+
+    async def pump_summary(self):
+        previous = None
+        while self.has_subscribers():
+            summary = await sync_to_async(current_summary)()
+            changed = {
+                key: value for key, value in summary.items()
+                if previous is None or previous.get(key) != value
+            }
+            self.summary = summary
+            if changed:
+                self.publish(Event('summary', changed))
+            previous = summary
+            await asyncio.sleep(get_summary_interval())
+
+
+broker = Broker()
+
+
+def current_summary():
+    now = timezone.now()
+    params = cache.normalize_params(QueryDict())
+    data = cache.get_or_set_summary(
+        params, now, lambda: TaskSummarySerializer(Task.objects.summary(now)).data
+    )
+    return dict(data)
+
+
+def task_events(action, pks, status=None):
+    """Return the events describing one ``tasks_changed`` notification."""
+    if pks is None or len(pks) > getattr(settings, 'TASKS_EVENTS_MAX_TASKS', 100):
+        return [Event('resync', {'reason': action})]
+    ids = [str(pk) for pk in pks]
+    if action == 'delete':
+        return [Event('delete', {'ids': ids})]
+    if status is not None:
+        return [Event('status', {'ids': ids, 'status': status})]
+    rows = Task.objects.filter(pk__in=pks).values(*TaskRowSerializer.fields)
+    return [Event(action, {'tasks': TaskRowSerializer().many(rows)})]
+
+
+def publish_task_change(action, pks, status=None):
+    """Publish a task change to this process's subscribers after commit."""
+    if not broker.has_subscribers():
+        return
+
+    def publish():
+        for event in task_events(action, pks, status):
+            broker.publish(event)
+
+    transaction.on_commit(publish)
+
+
+def format_event(event):
+    data = json.dumps(event.data, separators=(',', ':'))
+    return f'event: {event.name}\ndata: {data}\n\n'.encode('utf-8')
+
+
+async def stream(wait_for_disconnect):
+    """
+    Yield a subscriber's events as ``text/event-stream`` chunks until the
+    client disconnects, with a comment line as heartbeat when idle.
+    """
+    subscription = broker.subscribe()
+    watcher = asyncio.ensure_future(wait_for_disconnect())
+    watcher.add_done_callback(lambda _: broker.unsubscribe(subscription))
+    try:
+        yield b'retry: 3000\n\n'
+        if broker.summary is not None:
+            yield format_event(Event('summary', broker.summary))
+        while True:
+            try:
+                event = await subscription.get(get_heartbeat())
+            except asyncio.TimeoutError:
+                yield b': keepalive\n\n'
+                continue
+            if event is None:
+                return
+            yield format_event(event)
+    finally:
+        watcher.cancel()
+        broker.unsubscribe(subscription)
+
+
+class EventStreamResponse(StreamingHttpResponse):
+    def __init__(self, streaming_content):
+        super().__init__(streaming_content, content_type='text/event-stream')
+        self['Cache-Control'] = 'no-cache'
+        # Stop reverse proxies such as nginx from buffering the stream.
+        self['X-Accel-Buffering'] = 'no'
+
+
+class EventStreamHandler(ASGIHandler):
+    """
+    ASGIHandler that lets event streams outlive their request's thread.
+
+    Django runs each request in a ``ThreadSensitiveContext`` whose executor
+    keeps a thread for as long as the response is being sent, so every open
+    stream would hold a thread. An ``EventStreamResponse`` is instead sent
+    once that context has closed. Django also stops reading ``receive`` after
+    the body, so the scope offers a coroutine function under
+    ``DISCONNECT_KEY`` that returns when the client disconnects.
+    """
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            return await super().__call__(scope, receive, send)
+
+        async def wait_for_disconnect():
+            while (await receive())['type'] != 'http.disconnect':
+                pass
+
+        detached = DetachingSend(send)
+        await super().__call__({**scope, DISCONNECT_KEY: wait_for_disconnect}, receive, detached)
+        if detached.response is not None:
+            await super().send_response(detached.response, send)
+
+    async def send_response(self, response, send):
+        if isinstance(response, EventStreamResponse) and isinstance(send, DetachingSend):
+            send.response = response
+            return
+        await super().send_response(response, send)
+
+
+class DetachingSend:
+    def __init__(self, send):
+        self.send = send
+        self.response = None
+
+    async def __call__(self, message):
+        await self.send(message)
@@ -0,0 +1,77 @@
+"""
+Streaming export of task rows.
+
+Rows are read with ``values()`` and ``iterator()`` and written one line at a
+time, so neither model instances nor the full result set are held in memory.
+"""
+import csv
+import json
+
+from django.conf import settings
+from rest_framework import renderers
+
+from .serializers import TaskRowSerializer, TaskSerializer
+
+EXPORT_FIELDS = TaskRowSerializer.fields
+EXPORT_COLUMNS = TaskSerializer.Meta.fields
+
+
+class Echo:
+    """File-like object whose ``write`` returns the value, for csv.writer."""
+
+    def write(self, value):
+        return value
+
+
+def iter_rows(queryset, now):
+    """Yield ``TaskSerializer``-identical dicts with ``is_overdue`` computed against ``now``."""
+    serializer = TaskRowSerializer(now)
+    chunk_size = getattr(settings, 'TASKS_EXPORT_CHUNK_SIZE', 2000)
+    for row in queryset.values(*EXPORT_FIELDS).iterator(chunk_size=chunk_size):
+        yield serializer.to_representation(row)
+
+
+def stream_ndjson(rows):
+    for row in rows:
+        yield json.dumps(row, ensure_ascii=False, separators=(',', ':')) + '\n'
+
+
+def stream_csv(rows):
+    writer = csv.writer(Echo())
+    yield writer.writerow(EXPORT_COLUMNS)
+    for row in rows:
+        yield writer.writerow([
+            '' if row[column] is None else row[column] for column in EXPORT_COLUMNS
+        ])
+
+
+class NDJSONRenderer(renderers.BaseRenderer):
+    """Used for content negotiation; rendered data is only ever an error body."""
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        items = data if isinstance(data, list) else [data]
+        return ''.join(stream_ndjson(items)).encode(self.charset)
+
+
+class CSVRenderer(renderers.BaseRenderer):
+    """Used for content negotiation; rendered data is only ever an error body."""
+    media_type = 'text/csv'
+    format = 'csv'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        writer = csv.writer(Echo())
+        rows = data.items() if isinstance(data, dict) else [(None, data)]
+        return ''.join(
+            writer.writerow([key, '; '.join(map(str, value)) if isinstance(value, list) else value])
+            for key, value in rows
+        ).encode(self.charset)
+
+
+STREAMS = {
+    'ndjson': stream_ndjson,
+    'csv': stream_csv,
+}
@@ -0,0 +1,283 @@
+"""
+Streaming import of task rows.
+
+A file is read through a chain of generators (lines -> records -> cleaned
+rows -> batches), so memory use is bounded by the batch size rather than the
+file size. Each row remembers the byte offset just past its last line; the
+offset reported after a committed batch can be passed back as ``offset`` to
+resume an interrupted import without re-reading or duplicating rows.
+"""
+import csv
+import gzip
+import json
+import time
+import uuid
+from collections import namedtuple
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework import serializers
+
+from .changes import stamped_writes
+from .models import Task
+from .serializers import clean_priority, clean_title
+from .signals import tasks_changed
+
+FORMATS = {
+    '.ndjson': 'ndjson',
+    '.jsonl': 'ndjson',
+    '.json': 'ndjson',
+    '.csv': 'csv',
+}
+
+TITLE_MAX_LENGTH = Task._meta.get_field('title').max_length
+STATUSES = {value for value, label in Task.STATUS_CHOICES}
+
+Record = namedtuple('Record', ['offset', 'end', 'raw', 'data'])
+Row = namedtuple('Row', ['offset', 'end', 'raw', 'task', 'errors'])
+Progress = namedtuple('Progress', ['imported', 'rejected', 'offset', 'elapsed'])
+
+
+def detect_format(path):
+    name = path[:-3] if path.endswith('.gz') else path
+    for extension, fmt in FORMATS.items():
+        if name.endswith(extension):
+            return fmt
+    raise ValueError(f'Cannot tell the format of {path}; pass it explicitly.')
+
+
+def open_source(path):
+    """Open ``path`` for binary reading, decompressing gzip transparently."""
+    with open(path, 'rb') as fh:
+        compressed = fh.read(2) == b'\x1f\x8b'
+    return gzip.open(path, 'rb') if compressed else open(path, 'rb')
+
+
+def read_lines(fh, offset):
+    """Yield ``(offset, end, line)`` for every line from the current position."""
+    for line in fh:
+        start, offset = offset, offset + len(line)
+        yield start, offset, line
+
+
+def parse_ndjson(lines):
+    for start, end, line in lines:
+        if not line.strip():
+            continue
+        try:
+            data = json.loads(line)
+        except ValueError as exc:
+            data = {'non_field_errors': [f'Invalid JSON: {exc}']}
+            yield Record(start, end, line.decode('utf-8', 'replace'), None), data
+            continue
+        if not isinstance(data, dict):
+            yield Record(start, end, line.decode('utf-8', 'replace'), None), {
+                'non_field_errors': ['Expected a JSON object.']
+            }
+            continue
+        yield Record(start, end, line.decode('utf-8', 'replace'), data), None
+
+
+def parse_csv(lines, columns):
+    """
+    Parse CSV records under ``columns``.
+
+    ``csv.reader`` pulls one line at a time, so a quoted value spanning
+    several lines still ends with the offset of its last line.
+    """
+    consumed = []
+
+    def text():
+        for start, end, line in lines:
+            consumed.append((start, end, line))
+            yield line.decode('utf-8', 'replace')
+
+    for values in csv.reader(text()):
+        start, end = consumed[0][0], consumed[-1][1]
+        raw = b''.join(line for _, _, line in consumed).decode('utf-8', 'replace')
+        consumed.clear()
+        if not values:
+            continue
+        if len(values) != len(columns):
+            yield Record(start, end, raw, None), {
+                'non_field_errors': [f'Expected {len(columns)} columns, got {len(values)}.']
+            }
+            continue
+        yield Record(start, end, raw, dict(zip(columns, values))), None
+
+
+def clean_task(data):
+    """
+    Return ``(fields, errors)`` for one imported record.
+
+    Applies the TaskSerializer title and priority rules plus the model's field
+    constraints without instantiating a serializer. Unknown keys (such as the
+    ``is_overdue`` column of an export) are ignored.
+    """
+    fields, errors = {}, {}
+
+    def check(name, clean, required=False):
+        value = data.get(name)
+        if value is None or value == '':
+            if required:
+                errors[name] = ['This field is required.']
+            return
+        try:
+            fields[name] = clean(value)
+        except serializers.ValidationError as exc:
+            errors[name] = [str(message) for message in exc.detail]
+
+    def clean_id(value):
+        try:
+            return uuid.UUID(str(value))
+        except ValueError:
+            raise serializers.ValidationError('Must be a valid UUID.')
+
+    def clean_text(value):
+        if not isinstance(value, str):
+            raise serializers.ValidationError('Not a valid string.')
+        return value
+
+    def clean_required_title(value):
+        title = clean_title(clean_text(value))
+        if len(title) > TITLE_MAX_LENGTH:
+            raise serializers.ValidationError(
+                f'Ensure this field has no more than {TITLE_MAX_LENGTH} characters.'
+            )
+        return title
+
+    def clean_status(value):
+        if clean_text(value) not in STATUSES:
+            raise serializers.ValidationError(f'"{value}" is not a valid choice.')
+        return value
+
+    def clean_int_priority(value):
+        try:
+            if isinstance(value, bool) or isinstance(value, float) and not value.is_integer():
+                raise ValueError
+            value = int(value)
+        except (TypeError, ValueError):
+            raise serializers.ValidationError('A valid integer is required.')
+        return clean_priority(value)
+
+    def clean_due_date(value):
+        try:
+            due_date = parse_datetime(str(value))
+        except ValueError:
+            due_date = None
+        if due_date is None:
+            raise serializers.ValidationError('Datetime has wrong format.')
+        if timezone.is_naive(due_date):
+            due_date = timezone.make_aware(due_date)
+        return due_date
+
+    check('id', clean_id)
+    check('title', clean_required_title, required=True)
+    check('description', clean_text)
+    check('status', clean_status)
+    check('priority', clean_int_priority)
+    check('due_date', clean_due_date)
+    return fields, errors
+
+
+def clean_rows(records):
+    for record, errors in records:
+        task = None
+        if errors is None:
+            fields, errors = clean_task(record.data)
+            if not errors:
+                task, errors = Task(**fields), None
+        yield Row(record.offset, record.end, record.raw, task, errors)
+
+
+def insert_batch(rows):
+    """
+    Insert the tasks of ``rows`` in one transaction; return ``(inserted,
+    failed)``.
+
+    When the database refuses the batch (e.g. an imported ``id`` already
+    exists) it is retried row by row, each in a savepoint, and the refused
+    rows come back in ``failed`` with the database error.
+    """
+    tasks, failed = [row.task for row in rows], []
+    try:
+        with stamped_writes() as (now, written):
+            Task.objects.bulk_create(tasks)
+            written += [task.pk for task in tasks]
+    except IntegrityError:
+        tasks = []
+        with stamped_writes() as (now, written):
+            for row in rows:
+                try:
+                    with transaction.atomic():
+                        Task.objects.bulk_create([row.task])
+                except IntegrityError as exc:
+                    failed.append(row._replace(task=None, errors={'non_field_errors': [str(exc)]}))
+                else:
+                    tasks.append(row.task)
+                    written.append(row.task.pk)
+    if tasks:
+        tasks_changed.send(sender=Task, action='create', pks=[task.pk for task in tasks])
+    return tasks, failed
+
+
+def import_tasks(path, fmt=None, offset=0, batch_size=None, rejects=None, progress=None):
+    """
+    Import the tasks in ``path`` starting at byte ``offset``.
+
+    Valid rows are inserted with ``bulk_create``, one transaction per batch.
+    Invalid rows, and rows the database refuses, are passed to
+    ``rejects(row)``; ``progress(Progress)`` is called after every committed
+    batch, once every row up to its offset has been inserted or rejected.
+    Returns the final ``Progress``.
+    """
+    fmt = fmt or detect_format(path)
+    batch_size = min(
+        batch_size or getattr(settings, 'TASKS_IMPORT_BATCH_SIZE', 1000),
+        getattr(settings, 'TASKS_BULK_MAX_ITEMS', 10000),
+    )
+    imported = rejected = 0
+    started = time.perf_counter()
+
+    def report(position):
+        return Progress(imported, rejected, position, time.perf_counter() - started)
+
+    with open_source(path) as fh:
+        if fmt == 'csv':
+            header = fh.readline()
+            columns = next(csv.reader([header.decode('utf-8-sig')]), [])
+            offset = max(offset, len(header))
+        fh.seek(offset)
+        lines = read_lines(fh, offset)
+        records = parse_csv(lines, columns) if fmt == 'csv' else parse_ndjson(lines)
+
+        def reject(row):
+            nonlocal rejected
+            rejected += 1
+            if rejects is not None:
+                rejects(row)
+
+        def insert(batch):
+            nonlocal imported
+            inserted, failed = insert_batch(batch)
+            imported += len(inserted)
+            for row in failed:
+                reject(row)
+
+        batch, position = [], offset
+        for row in clean_rows(records):
+            if row.errors:
+                reject(row)
+            else:
+                batch.append(row)
+            position = row.end
+            if len(batch) >= batch_size:
+                insert(batch)
+                batch = []
+                if progress is not None:
+                    progress(report(position))
+        if batch:
+            insert(batch)
+    return report(position)
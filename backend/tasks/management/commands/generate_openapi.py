@@ -0,0 +1,31 @@
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks.openapi import generate_schema, get_schema_file, write_schema
+
+
+class Command(BaseCommand):
+    help = (
+        'Generate the OpenAPI document served by /swagger/ and /redoc/ and write it '
+        'to TASKS_OPENAPI_FILE. Run it at build or deploy time, after code changes.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', type=Path, help='File to write instead of TASKS_OPENAPI_FILE')
+        parser.add_argument(
+            '--check', action='store_true',
+            help='Write nothing; fail if the file is missing or out of date',
+        )
+
+    def handle(self, *args, **options):
+        path = options['output'] or get_schema_file()
+        content = generate_schema()
+        if options['check']:
+            if not path.exists() or path.read_bytes() != content:
+                raise CommandError(f'{path} is out of date; run generate_openapi')
+            self.stdout.write(self.style.SUCCESS(f'{path} is up to date'))
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        write_schema(path, content)
+        self.stdout.write(self.style.SUCCESS(f'Wrote {path} ({len(content)} bytes)'))
@@ -0,0 +1,95 @@
+import json
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError
+
+from tasks.importer import FORMATS, import_tasks
+
+
+class Command(BaseCommand):
+    help = (
+        'Import tasks from an NDJSON or CSV file, optionally gzip-compressed. '
+        'Invalid rows are written to a rejects file; an interrupted import can '
+        'be resumed with the --offset and --rejects-offset of its last checkpoint.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='File to import (.ndjson, .jsonl or .csv, optionally .gz).')
+        parser.add_argument(
+            '--format', choices=sorted(set(FORMATS.values())),
+            help='Input format; detected from the file extension by default.',
+        )
+        parser.add_argument(
+            '--offset', type=int, default=0,
+            help='Byte offset (of the uncompressed data) to resume from.',
+        )
+        parser.add_argument(
+            '--batch-size', type=int,
+            help='Rows inserted per transaction (default: TASKS_IMPORT_BATCH_SIZE).',
+        )
+        parser.add_argument(
+            '--rejects',
+            help='NDJSON file receiving invalid rows (default: <path>.rejects.ndjson).',
+        )
+        parser.add_argument(
+            '--rejects-offset', type=int,
+            help=(
+                'Size the rejects file had at the checkpoint being resumed; it is cut '
+                'back to this size so re-read rows are not rejected twice.'
+            ),
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        rejects_path = options['rejects'] or f'{path}.rejects.ndjson'
+        rejects_file = None
+        last = {'offset': options['offset'], 'rejects_offset': options['rejects_offset'] or 0}
+        if options['rejects_offset'] is not None and os.path.exists(rejects_path):
+            os.truncate(rejects_path, options['rejects_offset'])
+        append = options['offset'] or options['rejects_offset'] is not None
+
+        def reject(row):
+            nonlocal rejects_file
+            if rejects_file is None:
+                rejects_file = open(rejects_path, 'a' if append else 'w', encoding='utf-8')
+            rejects_file.write(json.dumps(
+                {'offset': row.offset, 'errors': row.errors, 'row': row.raw.rstrip('\r\n')},
+                ensure_ascii=False,
+            ) + '\n')
+
+        def progress(report):
+            last['offset'] = report.offset
+            if rejects_file is not None:
+                rejects_file.flush()
+                last['rejects_offset'] = rejects_file.tell()
+            self.stdout.write(f"{self.format_report(report)}, rejects offset {last['rejects_offset']}")
+
+        try:
+            report = import_tasks(
+                path,
+                fmt=options['format'],
+                offset=options['offset'],
+                batch_size=options['batch_size'],
+                rejects=reject,
+                progress=progress,
+            )
+        except (OSError, ValueError, DatabaseError) as exc:
+            raise CommandError(
+                f'{exc} (resume with --offset {last["offset"]} '
+                f'--rejects-offset {last["rejects_offset"]})'
+            )
+        finally:
+            if rejects_file is not None:
+                rejects_file.close()
+
+        self.stdout.write(self.style.SUCCESS(self.format_report(report)))
+        if report.rejected:
+            self.stdout.write(f'Rejected rows written to {rejects_path}')
+
+    def format_report(self, report):
+        rate = report.imported / report.elapsed if report.elapsed else 0
+        return (
+            f'{report.imported} imported, {report.rejected} rejected '
+            f'in {report.elapsed:.1f}s ({rate:,.0f} rows/s), offset {report.offset}'
+        )
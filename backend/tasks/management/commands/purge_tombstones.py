@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from tasks.changes import get_retention, purge_tombstones
+
+
+class Command(BaseCommand):
+    help = 'Delete change-feed tombstones older than TASKS_TOMBSTONE_RETENTION_DAYS.'
+
+    def handle(self, *args, **options):
+        deleted = purge_tombstones(timezone.now())
+        self.stdout.write(self.style.SUCCESS(
+            f'Deleted {deleted} tombstones older than {get_retention().days} days'
+        ))
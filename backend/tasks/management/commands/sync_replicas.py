@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from tasks.routers import PRIMARY, get_read_databases
+
+
+class Command(BaseCommand):
+    help = (
+        'Copy the primary SQLite database over every TASKS_READ_DATABASES alias, '
+        'standing in for replication when replicas are local SQLite files.'
+    )
+
+    def handle(self, *args, **options):
+        aliases = get_read_databases()
+        if not aliases:
+            raise CommandError('TASKS_READ_DATABASES is empty; there are no replicas to sync.')
+        source = connections[PRIMARY]
+        for alias in aliases:
+            target = connections[alias]
+            if source.vendor != 'sqlite' or target.vendor != 'sqlite':
+                raise CommandError('Only SQLite databases can be synced; use real replication.')
+            source.ensure_connection()
+            target.ensure_connection()
+            source.connection.backup(target.connection)
+            self.stdout.write(self.style.SUCCESS(f'Copied {PRIMARY} to {alias}'))
@@ -0,0 +1,341 @@
+"""
+Per-endpoint request metrics in the Prometheus text format.
+
+``metrics_middleware`` times every request and labels it with its endpoint,
+the ``TaskViewSet`` action (``list``, ``summary``, ...) or the URL name of
+other views. For each endpoint it keeps:
+
+* a latency histogram, with p50/p95/p99 estimated from it;
+* the number and total time of SQL queries;
+* the time spent serializing tasks (``timed('serializer')``);
+* the bytes sent.
+
+Queries are seen through an execute wrapper that ``connection_created``
+installs on every connection, since under ASGI a sync view does not run on
+the thread, or with the connection, the middleware sees. The request being
+recorded is found through a context variable. A request slower than
+``TASKS_SLOW_REQUEST_SECONDS`` is logged with its slowest SQL statements
+(``TASKS_SLOW_REQUEST_STATEMENTS``, each cut to
+``TASKS_SLOW_REQUEST_SQL_LENGTH`` characters).
+
+Work done while a streamed response is being sent (an export) only counts
+towards its bytes. Metrics are kept per process.
+"""
+import heapq
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from django.http import HttpResponse
+from django.utils.decorators import sync_and_async_middleware
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUANTILES = (0.5, 0.95, 0.99)
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+_recording = ContextVar('tasks_metrics_recording', default=None)
+
+
+def get_slow_request_seconds():
+    return getattr(settings, 'TASKS_SLOW_REQUEST_SECONDS', 1.0)
+
+
+def get_slow_request_statements():
+    return getattr(settings, 'TASKS_SLOW_REQUEST_STATEMENTS', 20)
+
+
+def get_slow_request_sql_length():
+    return getattr(settings, 'TASKS_SLOW_REQUEST_SQL_LENGTH', 1000)
+
+
+class Recording:
+    """What one request did, filled while it runs."""
+
+    __slots__ = ('queries', 'sql_seconds', 'serializer_seconds', 'statements', 'max_statements')
+
+    def __init__(self):
+        self.queries = 0
+        self.sql_seconds = self.serializer_seconds = 0.0
+        # A min-heap of (seconds, index, sql): the slowest statements so far.
+        self.statements = []
+        self.max_statements = get_slow_request_statements()
+
+    def add_query(self, sql, seconds):
+        self.queries += 1
+        self.sql_seconds += seconds
+        entry = (seconds, self.queries, sql)
+        if len(self.statements) < self.max_statements:
+            heapq.heappush(self.statements, entry)
+        elif self.statements and entry > self.statements[0]:
+            heapq.heapreplace(self.statements, entry)
+
+    def slowest_statements(self):
+        """The kept statements as ``(sql, seconds)``, in the order they ran."""
+        ordered = sorted(self.statements, key=lambda entry: entry[1])
+        return [(sql, seconds) for seconds, _, sql in ordered]
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                break
+        else:
+            index = len(self.buckets)
+        self.counts[index] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q):
+        """Estimate a quantile by interpolating inside its bucket, as PromQL does."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            if seen + count >= rank and count:
+                if index == len(self.buckets):
+                    return self.buckets[-1]
+                lower = self.buckets[index - 1] if index else 0.0
+                upper = self.buckets[index]
+                return lower + (upper - lower) * (rank - seen) / count
+            seen += count
+        return self.buckets[-1]
+
+
+class EndpointStats:
+    def __init__(self, buckets):
+        self.latency = Histogram(buckets)
+        self.queries = 0
+        self.sql_seconds = 0.0
+        self.serializer_seconds = 0.0
+        self.response_bytes = 0
+        self.slow = 0
+
+
+class Registry:
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.endpoints = {}
+        self.lock = threading.Lock()
+
+    def stats(self, endpoint):
+        stats = self.endpoints.get(endpoint)
+        if stats is None:
+            stats = self.endpoints.setdefault(endpoint, EndpointStats(self.buckets))
+        return stats
+
+    def record(self, endpoint, duration, recording, response_bytes, slow):
+        with self.lock:
+            stats = self.stats(endpoint)
+            stats.latency.observe(duration)
+            stats.queries += recording.queries
+            stats.sql_seconds += recording.sql_seconds
+            stats.serializer_seconds += recording.serializer_seconds
+            stats.response_bytes += response_bytes
+            stats.slow += slow
+
+    def add_bytes(self, endpoint, count):
+        with self.lock:
+            self.stats(endpoint).response_bytes += count
+
+    def clear(self):
+        with self.lock:
+            self.endpoints.clear()
+
+    def render(self):
+        """Return every metric in the Prometheus text exposition format."""
+        with self.lock:
+            endpoints = sorted(self.endpoints.items())
+            lines = [
+                '# HELP tasks_request_duration_seconds Request latency by endpoint.',
+                '# TYPE tasks_request_duration_seconds histogram',
+            ]
+            for endpoint, stats in endpoints:
+                cumulative = 0
+                bounds = [str(bound) for bound in self.buckets] + ['+Inf']
+                for bound, count in zip(bounds, stats.latency.counts):
+                    cumulative += count
+                    lines.append(
+                        f'tasks_request_duration_seconds_bucket'
+                        f'{{endpoint="{endpoint}",le="{bound}"}} {cumulative}'
+                    )
+                lines.append(
+                    f'tasks_request_duration_seconds_sum{{endpoint="{endpoint}"}} '
+                    f'{stats.latency.sum:.6f}'
+                )
+                lines.append(
+                    f'tasks_request_duration_seconds_count{{endpoint="{endpoint}"}} '
+                    f'{stats.latency.count}'
+                )
+            lines += [
+                '# HELP tasks_request_duration_quantile_seconds Latency quantiles '
+                'estimated from the histogram.',
+                '# TYPE tasks_request_duration_quantile_seconds gauge',
+            ]
+            for endpoint, stats in endpoints:
+                if not stats.latency.count:
+                    # Only bytes streamed after a clear(); no latency yet.
+                    continue
+                for q in QUANTILES:
+                    lines.append(
+                        f'tasks_request_duration_quantile_seconds'
+                        f'{{endpoint="{endpoint}",quantile="{q}"}} {stats.latency.quantile(q):.6f}'
+                    )
+            counters = (
+                ('tasks_sql_queries_total', 'SQL queries issued.', 'queries', '{}'),
+                ('tasks_sql_duration_seconds_total', 'Time spent in SQL.', 'sql_seconds', '{:.6f}'),
+                ('tasks_serializer_duration_seconds_total', 'Time spent serializing tasks.',
+                 'serializer_seconds', '{:.6f}'),
+                ('tasks_response_bytes_total', 'Response body bytes sent.', 'response_bytes', '{}'),
+                ('tasks_slow_requests_total', 'Requests slower than TASKS_SLOW_REQUEST_SECONDS.',
+                 'slow', '{}'),
+            )
+            for name, help_text, attribute, number in counters:
+                lines += [f'# HELP {name} {help_text}', f'# TYPE {name} counter']
+                for endpoint, stats in endpoints:
+                    value = number.format(getattr(stats, attribute))
+                    lines.append(f'{name}{{endpoint="{endpoint}"}} {value}')
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+
+@contextmanager
+def timed(phase):
+    """Add the time spent in the block to the current request's ``phase``."""
+    recording = _recording.get()
+    if recording is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        setattr(
+            recording, f'{phase}_seconds',
+            getattr(recording, f'{phase}_seconds') + time.perf_counter() - start
+        )
+
+
+def record_sql(execute, sql, params, many, context):
+    recording = _recording.get()
+    if recording is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        recording.add_query(sql, time.perf_counter() - start)
+
+
+@receiver(connection_created)
+def install_sql_wrapper(sender, connection, **kwargs):
+    if record_sql not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_sql)
+
+
+def endpoint_name(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unmatched'
+    # ViewSet views map HTTP methods to actions; DRF serves HEAD with 'get'.
+    actions = getattr(match.func, 'actions', None) or {}
+    method = request.method.lower()
+    action = actions.get('get' if method == 'head' else method)
+    return action or match.url_name or 'unnamed'
+
+
+def count_streamed_bytes(response, endpoint):
+    def counted(content):
+        sent = 0
+        try:
+            for chunk in content:
+                sent += len(chunk)
+                yield chunk
+        finally:
+            registry.add_bytes(endpoint, sent)
+
+    async def acounted(content):
+        sent = 0
+        try:
+            async for chunk in content:
+                sent += len(chunk)
+                yield chunk
+        finally:
+            registry.add_bytes(endpoint, sent)
+
+    if response.is_async:
+        response.streaming_content = acounted(response.streaming_content)
+    else:
+        response.streaming_content = counted(response.streaming_content)
+
+
+def finish(request, response, recording, start):
+    duration = time.perf_counter() - start
+    endpoint = endpoint_name(request)
+    if response.streaming:
+        count_streamed_bytes(response, endpoint)
+        response_bytes = 0
+    else:
+        response_bytes = len(response.content)
+    slow = duration >= get_slow_request_seconds()
+    if slow:
+        length = get_slow_request_sql_length()
+        statements = recording.slowest_statements()
+        logger.warning(
+            'Slow request: %s %s took %.3fs (%s, %d queries in %.3fs, %d slowest shown)\n%s',
+            request.method, request.get_full_path(), duration, endpoint,
+            recording.queries, recording.sql_seconds, len(statements),
+            '\n'.join(
+                f'  [{seconds * 1000:.1f} ms] {sql[:length]}{"..." if len(sql) > length else ""}'
+                for sql, seconds in statements
+            ),
+        )
+    registry.record(endpoint, duration, recording, response_bytes, slow)
+    return response
+
+
+@sync_and_async_middleware
+def metrics_middleware(get_response):
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            recording = Recording()
+            token = _recording.set(recording)
+            start = time.perf_counter()
+            try:
+                response = await get_response(request)
+            finally:
+                _recording.reset(token)
+            return finish(request, response, recording, start)
+    else:
+        def middleware(request):
+            recording = Recording()
+            token = _recording.set(recording)
+            start = time.perf_counter()
+            try:
+                response = get_response(request)
+            finally:
+                _recording.reset(token)
+            return finish(request, response, recording, start)
+    return middleware
+
+
+def metrics_view(request):
+    """Serve this process's metrics to a Prometheus scraper."""
+    return HttpResponse(registry.render(), content_type=CONTENT_TYPE)
@@ -0,0 +1,102 @@
+# Generated by Django 4.2.7 on 2026-10-17 00:22
+
+from importlib import import_module
+
+from django.db import migrations, models
+import django.db.models.deletion
+import tasks.models
+
+search_index = import_module('tasks.migrations.0003_task_search_index')
+
+# Re-key the FTS5 index from the task table's implicit rowid, which VACUUM
+# and table rebuilds may renumber, to INTEGER PRIMARY KEYs of its own.
+SQLITE_FORWARD = search_index.SQLITE_BACKWARD + [
+    """
+    CREATE TABLE tasks_task_search_key (
+        search_id integer NOT NULL PRIMARY KEY,
+        task_id char(32) NOT NULL UNIQUE
+    )
+    """,
+    'INSERT INTO tasks_task_search_key(task_id) SELECT id FROM tasks_task ORDER BY rowid',
+    """
+    CREATE VIEW tasks_task_search_content AS
+    SELECT search_key.search_id, task.title, task.description
+    FROM tasks_task_search_key search_key JOIN tasks_task task ON task.id = search_key.task_id
+    """,
+    """
+    CREATE VIRTUAL TABLE tasks_task_fts USING fts5(
+        title, description, content='tasks_task_search_content', content_rowid='search_id'
+    )
+    """,
+    """
+    CREATE TRIGGER tasks_task_fts_insert AFTER INSERT ON tasks_task BEGIN
+        INSERT INTO tasks_task_search_key(task_id) VALUES (new.id);
+        INSERT INTO tasks_task_fts(rowid, title, description)
+        VALUES (last_insert_rowid(), new.title, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER tasks_task_fts_delete AFTER DELETE ON tasks_task BEGIN
+        INSERT INTO tasks_task_fts(tasks_task_fts, rowid, title, description)
+        SELECT 'delete', search_id, old.title, old.description
+        FROM tasks_task_search_key WHERE task_id = old.id;
+        DELETE FROM tasks_task_search_key WHERE task_id = old.id;
+    END
+    """,
+    """
+    CREATE TRIGGER tasks_task_fts_update AFTER UPDATE OF title, description ON tasks_task BEGIN
+        INSERT INTO tasks_task_fts(tasks_task_fts, rowid, title, description)
+        SELECT 'delete', search_id, old.title, old.description
+        FROM tasks_task_search_key WHERE task_id = old.id;
+        INSERT INTO tasks_task_fts(rowid, title, description)
+        SELECT search_id, new.title, new.description
+        FROM tasks_task_search_key WHERE task_id = new.id;
+    END
+    """,
+    "INSERT INTO tasks_task_fts(tasks_task_fts) VALUES ('rebuild')",
+]
+
+SQLITE_BACKWARD = [
+    'DROP TRIGGER IF EXISTS tasks_task_fts_update',
+    'DROP TRIGGER IF EXISTS tasks_task_fts_delete',
+    'DROP TRIGGER IF EXISTS tasks_task_fts_insert',
+    'DROP TABLE IF EXISTS tasks_task_fts',
+    'DROP VIEW IF EXISTS tasks_task_search_content',
+    'DROP TABLE IF EXISTS tasks_task_search_key',
+] + search_index.SQLITE_FORWARD
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0005_task_status_order_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskSearchKey',
+            fields=[
+                ('search_id', models.AutoField(primary_key=True, serialize=False)),
+            ],
+            options={
+                'db_table': 'tasks_task_search_key',
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='TaskSearchIndex',
+            fields=[
+                ('key', models.OneToOneField(db_column='rowid', db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='index', serialize=False, to='tasks.tasksearchkey')),
+                ('document', tasks.models.SearchDocumentField(db_column='tasks_task_fts')),
+                ('rank', models.FloatField()),
+            ],
+            options={
+                'db_table': 'tasks_task_fts',
+                'managed': False,
+            },
+        ),
+        migrations.RunPython(
+            search_index.run_for_vendor({'sqlite': SQLITE_FORWARD}),
+            search_index.run_for_vendor({'sqlite': SQLITE_BACKWARD}),
+        ),
+    ]
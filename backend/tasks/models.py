@@ -1,8 +1,135 @@
-from django.db import models
+from django.db import connections, models
 from django.core.validators import MinValueValidator, MaxValueValidator
+from django.utils import timezone
 import uuid
 
 
+def overdue_q(now):
+    """Match the tasks ``Task.is_overdue()`` reports as overdue at ``now``."""
+    return models.Q(due_date__lt=now) & ~models.Q(status='done')
+
+
+def summary_aggregates(now):
+    return {
+        'total_tasks': models.Count('pk'),
+        'todo_count': models.Count('pk', filter=models.Q(status='todo')),
+        'in_progress_count': models.Count('pk', filter=models.Q(status='in_progress')),
+        'done_count': models.Count('pk', filter=models.Q(status='done')),
+        'overdue_count': models.Count('pk', filter=overdue_q(now)),
+        'high_priority_count': models.Count('pk', filter=models.Q(priority__gte=4)),
+    }
+
+
+class TaskQuerySet(models.QuerySet):
+    def with_overdue(self, now):
+        """Annotate ``overdue`` with the database-side equivalent of ``is_overdue()``."""
+        return self.annotate(overdue=models.Case(
+            models.When(overdue_q(now), then=models.Value(True)),
+            default=models.Value(False),
+            output_field=models.BooleanField(),
+        ))
+    
+    def summary(self, now):
+        """Return every dashboard count in a single conditional-aggregation query."""
+        return self.aggregate(**summary_aggregates(now))
+    
+    async def asummary(self, now):
+        return await self.aaggregate(**summary_aggregates(now))
+    
+    def bulk_insert(self, items, batch_size=None, now=None):
+        """
+        INSERT tasks given as dicts of validated field values; return the pks.
+        
+        Unlike ``bulk_create`` no model instance is built and compiled per
+        item: defaults and timestamps are prepared once, values only get the
+        backend's adaptation, and each batch is a single multi-row INSERT. As
+        with ``bulk_create`` no signals are sent.
+        """
+        self._for_write = True
+        connection = connections[self.db]
+        fields = self.model._meta.concrete_fields
+        now = now or timezone.now()
+        
+        def prepare(field, value):
+            return field.get_db_prep_value(value, connection, prepared=True)
+        
+        timestamps = {
+            field.attname: prepare(field, now) for field in fields
+            if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False)
+        }
+        defaults = {
+            field.attname: prepare(field, field.get_default()) for field in fields
+            if not callable(field.default)
+        }
+        pk = self.model._meta.pk
+        pks, rows = [], []
+        for item in items:
+            if pk.attname not in item:
+                item = {pk.attname: pk.get_default(), **item}
+            pks.append(item[pk.attname])
+            row = []
+            for field in fields:
+                name = field.attname
+                if name in timestamps:
+                    row.append(timestamps[name])
+                elif name in item:
+                    row.append(prepare(field, item[name]))
+                elif name in defaults:
+                    row.append(defaults[name])
+                else:
+                    row.append(prepare(field, field.get_default()))
+            rows.append(row)
+        
+        ops = connection.ops
+        batch_size = min(batch_size or len(rows), ops.bulk_batch_size(fields, rows)) or 1
+        row_sql = '({})'.format(', '.join(['%s'] * len(fields)))
+        sql = 'INSERT INTO {} ({}) VALUES '.format(
+            ops.quote_name(self.model._meta.db_table),
+            ', '.join(ops.quote_name(field.column) for field in fields),
+        )
+        with connection.cursor() as cursor:
+            for start in range(0, len(rows), batch_size):
+                batch = rows[start:start + batch_size]
+                cursor.execute(
+                    sql + ', '.join([row_sql] * len(batch)),
+                    [value for row in batch for value in row],
+                )
+        return pks
+    
+    def bulk_delete(self, pks, batch_size=None):
+        """
+        DELETE the tasks with the given pks; return the pks that existed.
+        
+        Unlike ``delete()`` the tasks are not collected first, so no
+        ``pre_delete``/``post_delete`` signal is sent per task; the caller
+        announces the deletions itself. The only relation pointing at tasks,
+        their search key, is cleaned up by the search index triggers.
+        """
+        self._for_write = True
+        connection = connections[self.db]
+        ops = connection.ops
+        pk = self.model._meta.pk
+        batch_size = batch_size or len(pks) or 1
+        sql = 'DELETE FROM {} WHERE {} IN '.format(
+            ops.quote_name(self.model._meta.db_table), ops.quote_name(pk.column)
+        )
+        deleted = []
+        with connection.cursor() as cursor:
+            for start in range(0, len(pks), batch_size):
+                batch = list(
+                    self.filter(pk__in=pks[start:start + batch_size])
+                    .order_by().values_list('pk', flat=True)
+                )
+                if not batch:
+                    continue
+                cursor.execute(
+                    sql + '({})'.format(', '.join(['%s'] * len(batch))),
+                    [pk.get_db_prep_value(value, connection) for value in batch],
+                )
+                deleted += batch
+        return deleted
+
+
 class Task(models.Model):
     STATUS_CHOICES = [
         ('todo', 'To Do'),
@@ -30,14 +157,97 @@ class Task(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = TaskQuerySet.as_manager()
+    
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Default list ordering and the ordering_fields exposed by the API.
+            models.Index(fields=['-created_at'], name='task_created_idx'),
+            # Also the (updated_at, id) keyset of the change feed.
+            models.Index(fields=['updated_at', 'id'], name='task_updated_idx'),
+            models.Index(fields=['due_date'], name='task_due_idx'),
+            # TaskFilter status/priority lookups combined with the default ordering.
+            models.Index(fields=['status', '-created_at'], name='task_status_created_idx'),
+            models.Index(fields=['priority', 'created_at'], name='task_priority_created_idx'),
+            # The status filter with the list's other orderings: highest or
+            # lowest priority and due soonest.
+            models.Index(fields=['status', 'priority'], name='task_status_priority_idx'),
+            models.Index(fields=['status', 'due_date'], name='task_status_due_idx'),
+            # Overdue lookups only ever look at tasks that are not done.
+            models.Index(
+                fields=['due_date'],
+                name='task_open_due_idx',
+                condition=~models.Q(status='done'),
+            ),
+        ]
     
     def __str__(self):
         return f"{self.title} ({self.get_status_display()})"
     
     def is_overdue(self):
         if self.due_date and self.status != 'done':
-            from django.utils import timezone
             return timezone.now() > self.due_date
-        return False
\ No newline at end of file
+        return False
+
+
+class TaskTombstone(models.Model):
+    """A deleted task, kept so the change feed can report the deletion."""
+    task_id = models.UUIDField()
+    deleted_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['deleted_at', 'id']
+        indexes = [
+            models.Index(fields=['deleted_at', 'id'], name='tombstone_deleted_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.task_id} deleted at {self.deleted_at}"
+
+
+class SearchDocumentField(models.TextField):
+    """The hidden column named after an FTS5 table, matched with ``__match``."""
+
+
+@SearchDocumentField.register_lookup
+class Match(models.Lookup):
+    lookup_name = 'match'
+    
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs} MATCH {rhs}', [*lhs_params, *rhs_params]
+
+
+class TaskSearchKey(models.Model):
+    """
+    The integer key of a task in the SQLite full-text index.
+    
+    FTS5 rows are keyed by integers, and ``tasks_task`` only has an implicit
+    rowid, which VACUUM and table rebuilds may renumber. These keys are an
+    INTEGER PRIMARY KEY, so they never change; triggers from
+    ``0006_task_search_key`` keep them in step with the task table.
+    """
+    search_id = models.AutoField(primary_key=True)
+    task = models.OneToOneField(
+        Task, on_delete=models.DO_NOTHING, db_constraint=False, related_name='search_key',
+    )
+    
+    class Meta:
+        managed = False
+        db_table = 'tasks_task_search_key'
+
+
+class TaskSearchIndex(models.Model):
+    """The SQLite FTS5 table over task titles and descriptions."""
+    key = models.OneToOneField(
+        TaskSearchKey, primary_key=True, db_column='rowid',
+        on_delete=models.DO_NOTHING, db_constraint=False, related_name='index',
+    )
+    document = SearchDocumentField(db_column='tasks_task_fts')
+    rank = models.FloatField()
+    
+    class Meta:
+        managed = False
+        db_table = 'tasks_task_fts'
@@ -0,0 +1,126 @@
+"""
+The OpenAPI document, generated once instead of on every request.
+
+``manage.py generate_openapi`` writes the document to ``TASKS_OPENAPI_FILE``
+at build or deploy time. ``SchemaView`` renders the /swagger/ and /redoc/
+pages like drf_yasg does (they hold no schema), but answers requests for the
+JSON document (``?format=openapi``) from that file, with an ETag and gzip.
+The file is read once and again only when it changes. Without it, the
+document is generated on first use and kept for the life of the process.
+"""
+import gzip
+import hashlib
+import os
+import threading
+from pathlib import Path
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.middleware.gzip import re_accepts_gzip
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from drf_yasg import openapi
+from drf_yasg.codecs import OpenAPICodecJson
+from drf_yasg.renderers import OpenAPIRenderer, SwaggerJSONRenderer
+from drf_yasg.views import get_schema_view
+from rest_framework import permissions
+
+INFO = openapi.Info(
+    title="Task Manager API",
+    default_version='v1',
+    description="RESTful API for managing tasks",
+)
+BaseSchemaView = get_schema_view(INFO, public=True, permission_classes=(permissions.AllowAny,))
+
+_lock = threading.Lock()
+_document = None
+
+
+def get_schema_file():
+    return Path(getattr(settings, 'TASKS_OPENAPI_FILE', settings.BASE_DIR / 'openapi.json'))
+
+
+def generate_schema():
+    """Return the OpenAPI document as JSON, introspecting every view."""
+    from rest_framework.test import APIRequestFactory
+    from rest_framework.views import APIView
+
+    # Views are inspected with a stand-in request, as drf_yasg's own
+    # generate_swagger --mock-request does. An empty URL leaves the host and
+    # scheme out, so clients use those the document was fetched from.
+    request = APIView().initialize_request(APIRequestFactory().get('/swagger/', {'format': 'openapi'}))
+    schema = BaseSchemaView.generator_class(INFO, url='').get_schema(request=request, public=True)
+    return OpenAPICodecJson(validators=[]).encode(schema)
+
+
+def write_schema(path, content):
+    temporary = path.with_name(f'.{path.name}.{os.getpid()}')
+    temporary.write_bytes(content)
+    os.replace(temporary, path)
+
+
+class SchemaDocument:
+    """An encoded document with its gzipped copy and validators."""
+
+    def __init__(self, content, path, mtime):
+        self.content = content
+        # mtime=0 keeps the gzip bytes, and so their ETag, the same in every
+        # process serving the same document.
+        self.gzipped = gzip.compress(content, mtime=0)
+        self.path = path
+        self.mtime = mtime
+        digest = hashlib.sha1(content).hexdigest()
+        self.etag = f'"{digest}"'
+        self.gzip_etag = f'"{digest}-gzip"'
+
+
+def get_document():
+    """Return the stored document, or the one generated by this process."""
+    global _document
+    path = get_schema_file()
+    try:
+        mtime = path.stat().st_mtime_ns
+    except FileNotFoundError:
+        mtime = None
+    document = _document
+    if document is not None and document.path == path and document.mtime == mtime:
+        return document
+    with _lock:
+        document = _document
+        if document is None or document.path != path or document.mtime != mtime:
+            content = generate_schema() if mtime is None else path.read_bytes()
+            document = _document = SchemaDocument(content, path, mtime)
+    return document
+
+
+def clear_document():
+    global _document
+    _document = None
+
+
+def document_response(request, document, content_type):
+    """Serve ``document``, gzipped if the client accepts it, or a 304."""
+    compressed = bool(re_accepts_gzip.search(request.META.get('HTTP_ACCEPT_ENCODING', '')))
+    etag = document.gzip_etag if compressed else document.etag
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = HttpResponse(
+            document.gzipped if compressed else document.content, content_type=content_type,
+        )
+        if compressed:
+            response['Content-Encoding'] = 'gzip'
+    response['ETag'] = etag
+    patch_vary_headers(response, ['Accept-Encoding'])
+    # Keep the document but revalidate it on every use: a deploy may change it.
+    patch_cache_control(response, no_cache=True)
+    return response
+
+
+class SchemaView(BaseSchemaView):
+    """drf_yasg's schema view, serving the JSON document from get_document()."""
+
+    def get(self, request, version='', format=None):
+        renderer = request.accepted_renderer
+        if isinstance(renderer, (OpenAPIRenderer, SwaggerJSONRenderer)):
+            return document_response(request, get_document(), renderer.media_type)
+        # The UI pages, and YAML, which nothing links to.
+        return super().get(request, version, format)
@@ -0,0 +1,176 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import namedtuple
+
+from django.core.exceptions import ValidationError
+from django.core.paginator import InvalidPage, Page
+from django.db.models import F, Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+from rest_framework.utils.urls import replace_query_param
+
+Position = namedtuple('Position', ['value', 'pk', 'reverse'])
+
+
+class TaskPageNumberPagination(PageNumberPagination):
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """``paginate_queryset`` for async views, through the async ORM."""
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        paginator = self.django_paginator_class(queryset, page_size)
+        # ``count`` is a cached property; fill it so the paginator never
+        # counts synchronously.
+        paginator.count = await queryset.acount()
+        page_number = self.get_page_number(request, paginator)
+        try:
+            number = paginator.validate_number(page_number)
+        except InvalidPage as exc:
+            raise NotFound(self.invalid_page_message.format(
+                page_number=page_number, message=str(exc)
+            ))
+
+        bottom = (number - 1) * page_size
+        results = [row async for row in queryset[bottom:bottom + page_size]]
+        self.page = Page(results, number, paginator)
+        if paginator.num_pages > 1 and self.template is not None:
+            self.display_page_controls = True
+        self.request = request
+        return results
+
+
+class TaskCursorPagination(CursorPagination):
+    """
+    Keyset pagination over the active ordering field with ``pk`` as tiebreaker.
+
+    Each cursor stores the (value, pk) of the last row it has seen, so a page
+    is fetched with an indexed range condition instead of an OFFSET and the
+    cost of page 10,000 matches page 1. No ``count`` is returned.
+    """
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    ordering = '-created_at'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return self.set_page(list(self.get_page_queryset(queryset, request, view)))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """``paginate_queryset`` for async views, through the async ORM."""
+        queryset = self.get_page_queryset(queryset, request, view)
+        return self.set_page([row async for row in queryset])
+
+    def get_page_queryset(self, queryset, request, view=None):
+        """Return the query for the requested page plus one row to look ahead."""
+        self.page_size = self.get_page_size(request)
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.field = self.ordering[0].lstrip('-')
+        self.descending = self.ordering[0].startswith('-')
+        self.model = queryset.model
+        # Orderings may name an annotation such as ``overdue`` as well as a field.
+        annotation = queryset.query.annotations.get(self.field)
+        if annotation is not None:
+            self.model_field, self.nullable = annotation.output_field, False
+        else:
+            self.model_field = self.model._meta.get_field(self.field)
+            self.nullable = self.model_field.null
+
+        self.cursor = self.decode_cursor(request)
+        reverse = self.cursor.reverse if self.cursor else False
+
+        queryset = queryset.order_by(*self.get_order_by(reverse))
+        if self.cursor is not None:
+            queryset = queryset.filter(self.get_after_position(self.cursor))
+
+        return queryset[:self.page_size + 1]
+
+    def set_page(self, results):
+        has_more = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        if self.cursor is not None and self.cursor.reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = self.cursor is not None, has_more
+        else:
+            self.has_next, self.has_previous = has_more, self.cursor is not None
+        return self.page
+
+    def get_order_by(self, reverse):
+        descending = self.descending != reverse
+        # NULLs come last walking forward, so first walking back.
+        nulls = {}
+        if self.nullable:
+            nulls = {'nulls_first': True} if reverse else {'nulls_last': True}
+        field = F(self.field).desc(**nulls) if descending else F(self.field).asc(**nulls)
+        return [field, '-pk' if descending else 'pk']
+
+    def get_after_position(self, position):
+        """Return a filter matching the rows that follow ``position``."""
+        descending = self.descending != position.reverse
+        nulls_last = not position.reverse
+        beyond = 'lt' if descending else 'gt'
+        within = 'lte' if descending else 'gte'
+        pk_before = 'gte' if descending else 'lte'
+
+        if position.value is None:
+            after = Q(**{f'{self.field}__isnull': True, f'pk__{beyond}': position.pk})
+            if not nulls_last:
+                after |= Q(**{f'{self.field}__isnull': False})
+            return after
+
+        after = Q(**{f'{self.field}__{within}': position.value}) & ~Q(
+            **{self.field: position.value, f'pk__{pk_before}': position.pk}
+        )
+        if self.nullable and nulls_last:
+            after |= Q(**{f'{self.field}__isnull': True})
+        return after
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return self.encode_cursor(self._get_position(self.page[-1], reverse=False))
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        return self.encode_cursor(self._get_position(self.page[0], reverse=True))
+
+    def _get_position(self, item, reverse):
+        if isinstance(item, dict):
+            value, pk = item[self.field], item.get('pk', item.get('id'))
+        else:
+            value, pk = getattr(item, self.field), item.pk
+        return Position(value=value, pk=pk, reverse=reverse)
+
+    def encode_cursor(self, position):
+        value = position.value
+        if hasattr(value, 'isoformat'):
+            value = value.isoformat()
+        payload = json.dumps({
+            'o': self.ordering[0],
+            'v': value,
+            'k': str(position.pk),
+            'r': position.reverse,
+        }, separators=(',', ':'))
+        encoded = urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+
+        try:
+            payload = json.loads(urlsafe_b64decode(encoded.encode('ascii')))
+            if payload['o'] != self.ordering[0]:
+                raise ValueError('cursor was issued for another ordering')
+            value = payload['v']
+            if value is not None:
+                value = self.model_field.to_python(value)
+            pk = self.model._meta.pk.to_python(payload['k'])
+            return Position(value=value, pk=pk, reverse=bool(payload['r']))
+        except (TypeError, ValueError, KeyError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
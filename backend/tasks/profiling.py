@@ -0,0 +1,268 @@
+"""
+Opt-in profiling of single requests.
+
+``profiling_middleware`` profiles a request when it carries the
+``X-Tasks-Profile`` header with the value of ``TASKS_PROFILE_TOKEN``, or
+at random for a ``TASKS_PROFILE_SAMPLE_RATE`` share of requests. Other
+requests pass straight through.
+
+A profiled request runs while a ``Sampler`` thread records the request
+thread's stack every ``TASKS_PROFILE_INTERVAL`` seconds. Each sample is
+assigned to a phase by the innermost frame that belongs to one: ``orm``,
+``serializer``, ``renderer``, ``filter`` or ``view``. Samples outside all of
+them, and any time not sampled, count as ``middleware``. The response gets
+the breakdown in a ``Server-Timing`` header and the profile's file name in
+``X-Tasks-Profile``.
+
+Stacks are written in the collapsed format that flamegraph.pl, speedscope
+and inferno read (``frame;frame;frame count``), next to a JSON summary.
+Both go to ``TASKS_PROFILE_DIR``, which holds at most ``TASKS_PROFILE_KEEP``
+profiles: a new one replaces the oldest.
+
+Under ASGI a profiled request runs its middleware and view in one worker
+thread, so they can be sampled. Async views run on the event loop and only
+show up as ``middleware`` time.
+"""
+import json
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from pathlib import Path
+
+from asgiref.sync import async_to_sync, iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.utils.crypto import constant_time_compare
+from django.utils.decorators import sync_and_async_middleware
+
+from .metrics import endpoint_name
+
+HEADER = 'X-Tasks-Profile'
+
+# Checked from the innermost frame outwards; the first match names the phase.
+PHASES = [
+    ('orm', ('django/db/',)),
+    ('serializer', (
+        'rest_framework/serializers.py', 'rest_framework/fields.py', 'tasks/serializers.py',
+    )),
+    ('renderer', ('rest_framework/renderers.py', 'json/encoder.py', 'django/template/')),
+    ('filter', (
+        'django_filters/', 'rest_framework/filters.py', 'tasks/filters.py', 'tasks/search.py',
+    )),
+    ('view', (
+        'tasks/views.py', 'tasks/pagination.py', 'rest_framework/views.py',
+        'rest_framework/generics.py', 'rest_framework/mixins.py', 'rest_framework/viewsets.py',
+        'rest_framework/pagination.py',
+    )),
+]
+PHASE_NAMES = [name for name, _ in PHASES] + ['middleware']
+
+_switch_lock = threading.Lock()
+_active_samplers = 0
+_switch_interval = None
+
+
+def get_sample_rate():
+    return getattr(settings, 'TASKS_PROFILE_SAMPLE_RATE', 0.0)
+
+
+def get_token():
+    return getattr(settings, 'TASKS_PROFILE_TOKEN', None)
+
+
+def get_interval():
+    return getattr(settings, 'TASKS_PROFILE_INTERVAL', 0.001)
+
+
+def get_directory():
+    return Path(getattr(settings, 'TASKS_PROFILE_DIR', settings.BASE_DIR / 'profiles'))
+
+
+def get_keep():
+    return getattr(settings, 'TASKS_PROFILE_KEEP', 100)
+
+
+def get_shorten_switch_interval():
+    return getattr(settings, 'TASKS_PROFILE_SHORTEN_SWITCH_INTERVAL', True)
+
+
+def should_profile(request):
+    token = get_token()
+    header = request.headers.get(HEADER)
+    if token and header is not None and constant_time_compare(header, token):
+        return True
+    rate = get_sample_rate()
+    return rate > 0 and random.random() < rate
+
+
+def classify(filenames):
+    """Return the phase of a stack given its file names, innermost first."""
+    for filename in filenames:
+        for phase, markers in PHASES:
+            if any(marker in filename for marker in markers):
+                return phase
+    return 'middleware'
+
+
+def frame_label(code):
+    parts = Path(code.co_filename).parts
+    return f'{code.co_name} ({"/".join(parts[-2:])}:{code.co_firstlineno})'
+
+
+class Sampler(threading.Thread):
+    """Record the stack of ``thread_id`` until ``stop()``, down to ``root``."""
+
+    def __init__(self, thread_id, root, interval):
+        super().__init__(name='tasks-profiler', daemon=True)
+        self.thread_id = thread_id
+        self.root = root
+        self.interval = interval
+        self.stacks = Counter()
+        self.phases = defaultdict(float)
+        self.samples = 0
+        self.stopped = threading.Event()
+
+    def run(self):
+        last = time.perf_counter()
+        while not self.stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            now = time.perf_counter()
+            if frame is not None:
+                self.record(frame, now - last)
+            last = now
+
+    def record(self, frame, elapsed):
+        codes = []
+        while frame is not None and frame.f_code is not self.root:
+            codes.append(frame.f_code)
+            frame = frame.f_back
+        if frame is None:
+            # Not inside the profiled request (yet, or any more).
+            return
+        filenames = [code.co_filename.replace(os.sep, '/') for code in codes]
+        self.phases[classify(filenames)] += elapsed
+        self.stacks[';'.join(frame_label(code) for code in reversed(codes))] += 1
+        self.samples += 1
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+
+def start_sampling(root):
+    """
+    Start a Sampler on the current thread.
+
+    Unless ``TASKS_PROFILE_SHORTEN_SWITCH_INTERVAL`` is off, the interpreter's
+    switch interval is shortened to the sampling interval while any sampler
+    runs, or a busy request thread would hold the GIL for 5 ms at a time and
+    the sampler could not keep its interval. The switch interval is
+    process-wide: every other thread switches that often too, which costs
+    CPU-bound requests running next to a profiled one some throughput.
+    """
+    global _active_samplers, _switch_interval
+    interval = get_interval()
+    with _switch_lock:
+        if not _active_samplers and get_shorten_switch_interval():
+            _switch_interval = sys.getswitchinterval()
+            sys.setswitchinterval(min(_switch_interval, interval))
+        _active_samplers += 1
+    sampler = Sampler(threading.get_ident(), root, interval)
+    sampler.start()
+    return sampler
+
+
+def stop_sampling(sampler):
+    global _active_samplers, _switch_interval
+    sampler.stop()
+    with _switch_lock:
+        _active_samplers -= 1
+        if not _active_samplers and _switch_interval is not None:
+            sys.setswitchinterval(_switch_interval)
+            _switch_interval = None
+
+
+def next_slot(directory, keep):
+    """Return the ring buffer slot to write: a free one, else the oldest."""
+    used = {}
+    for path in directory.glob('profile-*.json'):
+        try:
+            used[int(path.stem.split('-')[1])] = path.stat().st_mtime
+        except (ValueError, OSError):
+            continue
+    free = [slot for slot in range(keep) if slot not in used]
+    if free:
+        return free[0]
+    return min((slot for slot in used if slot < keep), key=used.get)
+
+
+def write_atomic(path, text):
+    temporary = path.with_name(f'.{path.name}.{os.getpid()}.{threading.get_ident()}')
+    temporary.write_text(text)
+    os.replace(temporary, path)
+
+
+def save_profile(request, response, sampler, duration, phases):
+    directory = get_directory()
+    directory.mkdir(parents=True, exist_ok=True)
+    slot = next_slot(directory, get_keep())
+    name = f'profile-{slot:03d}'
+    root = f'{request.method} {endpoint_name(request)}'
+    write_atomic(directory / f'{name}.folded', ''.join(
+        f'{root};{stack} {count}\n' for stack, count in sampler.stacks.most_common()
+    ))
+    write_atomic(directory / f'{name}.json', json.dumps({
+        'method': request.method,
+        'path': request.get_full_path(),
+        'endpoint': endpoint_name(request),
+        'status': response.status_code,
+        'started_at': time.time() - duration,
+        'duration_ms': round(duration * 1000, 3),
+        'samples': sampler.samples,
+        'interval_ms': sampler.interval * 1000,
+        'phases_ms': {phase: round(seconds * 1000, 3) for phase, seconds in phases.items()},
+    }, indent=2))
+    return name
+
+
+def profile(request, get_response):
+    sampler = start_sampling(profile.__code__)
+    start = time.perf_counter()
+    try:
+        response = get_response(request)
+    finally:
+        duration = time.perf_counter() - start
+        stop_sampling(sampler)
+
+    # The sampler's first and last intervals can overlap the request's edges;
+    # scale the samples down so that the phases never add up to more than it.
+    scale = min(1.0, duration / (sum(sampler.phases.values()) or 1.0))
+    phases = {phase: sampler.phases.get(phase, 0.0) * scale for phase in PHASE_NAMES}
+    # Whatever the samples do not account for happened outside the sampled
+    # phases (middleware, or async code on the event loop).
+    phases['middleware'] += max(0.0, duration - sum(phases.values()))
+    response[HEADER] = save_profile(request, response, sampler, duration, phases)
+    response['Server-Timing'] = ', '.join(
+        [f'{phase};dur={seconds * 1000:.3f}' for phase, seconds in phases.items()]
+        + [f'total;dur={duration * 1000:.3f}']
+    )
+    return response
+
+
+@sync_and_async_middleware
+def profiling_middleware(get_response):
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            if not should_profile(request):
+                return await get_response(request)
+            # Run the rest of the request from one thread, which sync views
+            # then also run in, so that the sampler can follow it.
+            return await sync_to_async(profile)(request, async_to_sync(get_response))
+    else:
+        def middleware(request):
+            if not should_profile(request):
+                return get_response(request)
+            return profile(request, get_response)
+    return middleware
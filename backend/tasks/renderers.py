@@ -0,0 +1,75 @@
+"""
+Compact renderers for task responses, picked by content negotiation.
+
+* ``TableJSONRenderer`` (``application/vnd.tasks.table+json``,
+  ``?format=table``) writes lists of tasks column by column: field names
+  appear once, followed by an array of values per field, instead of once
+  per task.
+* ``MessagePackRenderer`` (``application/msgpack``, ``?format=msgpack``)
+  writes the same document as the JSON renderer in MessagePack. It needs
+  the optional ``msgpack`` package and is only offered when it is installed.
+
+Both decode to the same values as JSON: ids and timestamps stay strings.
+"""
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.settings import api_settings
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import msgpack
+except ImportError:  # Optional: pip install msgpack
+    msgpack = None
+
+
+def to_columns(rows):
+    """
+    Return ``rows``, a list of dicts with the same keys, as one dict of
+    value lists; anything else is returned unchanged.
+    """
+    if not rows or not isinstance(rows, list) or not isinstance(rows[0], dict):
+        return rows
+    fields = list(rows[0])
+    if any(not isinstance(row, dict) or len(row) != len(fields) for row in rows):
+        return rows
+    try:
+        return {field: [row[field] for row in rows] for field in fields}
+    except KeyError:
+        return rows
+
+
+def to_table(data):
+    """Turn a list of rows, or the lists of rows in a dict (pages), into columns."""
+    if isinstance(data, list):
+        return to_columns(data)
+    if isinstance(data, dict):
+        return {key: to_columns(value) if isinstance(value, list) else value
+                for key, value in data.items()}
+    return data
+
+
+class TableJSONRenderer(JSONRenderer):
+    media_type = 'application/vnd.tasks.table+json'
+    format = 'table'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return super().render(to_table(data), accepted_media_type, renderer_context)
+
+
+class MessagePackRenderer(BaseRenderer):
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        # Whatever JSON would turn into a string (lazy translations, dates,
+        # decimals) is converted the same way.
+        return msgpack.packb(data, default=JSONEncoder().default, use_bin_type=True)
+
+
+def task_renderer_classes():
+    """The default renderers plus the compact ones available here."""
+    compact = [TableJSONRenderer] + ([MessagePackRenderer] if msgpack is not None else [])
+    return list(api_settings.DEFAULT_RENDERER_CLASSES) + compact
@@ -0,0 +1,161 @@
+"""
+Response cache for the task list and detail views.
+
+Entries hold the response data and are keyed by the task table version (see
+``cache``) among other parts, so every write makes all older entries
+unreachable. The storage backend is configured with ``TASKS_RESPONSE_CACHE``:
+
+* ``LRUBackend`` (default) keeps a bounded, per-process LRU dict.
+* ``DjangoCacheBackend`` stores entries in one of the ``CACHES``, e.g. a
+  ``FileBasedCache`` shared by several workers on one host.
+
+Hit, miss and eviction counts are kept per process.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+DEFAULT_CONFIG = {
+    'BACKEND': 'tasks.response_cache.LRUBackend',
+    'OPTIONS': {'max_entries': 1000},
+}
+
+
+class LRUBackend:
+    """Bounded in-process LRU; the least recently used entry is evicted first."""
+
+    def __init__(self, max_entries=1000):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.evictions = 0
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            try:
+                self.entries.move_to_end(key)
+            except KeyError:
+                return None
+            return self.entries[key]
+
+    def set(self, key, value):
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def stats(self):
+        return {
+            'entries': len(self.entries),
+            'max_entries': self.max_entries,
+            'evictions': self.evictions,
+        }
+
+
+class DjangoCacheBackend:
+    """
+    Entries stored in the Django cache named ``alias``. Eviction is up to
+    that cache and is not counted; entries from older table versions are
+    left to expire after ``timeout`` seconds.
+    """
+
+    def __init__(self, alias='default', timeout=300):
+        self.cache = caches[alias]
+        self.timeout = timeout
+
+    def get(self, key):
+        return self.cache.get(key)
+
+    def set(self, key, value):
+        self.cache.set(key, value, timeout=self.timeout)
+
+    def clear(self):
+        pass
+
+    def stats(self):
+        return {'entries': None, 'max_entries': None, 'evictions': None}
+
+
+class ResponseCache:
+    def __init__(self, backend):
+        self.backend = backend
+        self.hits = self.misses = 0
+
+    def make_key(self, parts):
+        digest = hashlib.sha1('\x1f'.join(map(str, parts)).encode('utf-8')).hexdigest()
+        return f'tasks:response:{digest}'
+
+    def get_or_set(self, parts, compute):
+        """Return the entry for ``parts``, calling ``compute`` on a miss."""
+        key = self.make_key(parts)
+        value = self.backend.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+        self.misses += 1
+        value = compute()
+        self.backend.set(key, value)
+        return value
+
+    def clear(self):
+        self.backend.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'backend': type(self.backend).__name__,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': round(self.hits / lookups, 4) if lookups else None,
+            **self.backend.stats(),
+        }
+
+
+class NullCache(ResponseCache):
+    """Used when ``TASKS_RESPONSE_CACHE`` is None: every lookup computes."""
+
+    def __init__(self):
+        super().__init__(backend=None)
+
+    def get_or_set(self, parts, compute):
+        return compute()
+
+    def clear(self):
+        pass
+
+    def stats(self):
+        return {'backend': None, 'hits': 0, 'misses': 0, 'hit_ratio': None}
+
+
+_response_cache = None
+
+
+def get_response_cache():
+    global _response_cache
+    if _response_cache is None:
+        config = getattr(settings, 'TASKS_RESPONSE_CACHE', DEFAULT_CONFIG)
+        if config is None:
+            _response_cache = NullCache()
+        else:
+            backend = import_string(config['BACKEND'])(**config.get('OPTIONS', {}))
+            _response_cache = ResponseCache(backend)
+    return _response_cache
+
+
+@receiver(setting_changed)
+def reset_response_cache(setting, **kwargs):
+    global _response_cache
+    if setting in ('TASKS_RESPONSE_CACHE', 'CACHES'):
+        _response_cache = None
@@ -0,0 +1,137 @@
+"""
+Read-replica routing for the tasks app.
+
+``TaskRouter`` sends reads of task models to one of ``TASKS_READ_DATABASES``
+and writes to ``default``. A request is read from the primary instead when
+it is itself a write (so a write reads the rows it is about to change from
+the primary), or when the same client wrote within the last
+``TASKS_REPLICA_PIN_SECONDS``, so it never reads a replica that has not
+caught up with its own write yet. ``replica_pinning_middleware`` tracks this
+with a cookie, and ``read_from_primary()`` forces it for a block of code.
+The choice is reset when the response has been sent (``request_finished``).
+"""
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.core.signals import request_finished
+from django.dispatch import receiver
+from django.utils.decorators import sync_and_async_middleware
+
+PRIMARY = 'default'
+PIN_COOKIE = 'tasks_read_primary'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+_read_primary = ContextVar('tasks_read_primary', default=False)
+
+
+def get_read_databases():
+    return getattr(settings, 'TASKS_READ_DATABASES', [])
+
+
+def get_pin_seconds():
+    return getattr(settings, 'TASKS_REPLICA_PIN_SECONDS', 5)
+
+
+@contextmanager
+def read_from_primary():
+    token = _read_primary.set(True)
+    try:
+        yield
+    finally:
+        _read_primary.reset(token)
+
+
+def read_consistency(changed_at):
+    """
+    Return a suffix for the table version that keeps data read from replicas
+    apart from data read from the primary.
+
+    Replicas are assumed to catch up within ``TASKS_REPLICA_PIN_SECONDS`` of
+    the last write (at ``changed_at``). Until then replica reads share a
+    ``:lagging`` suffix: they may still miss that write, so the pinned writer
+    (``:primary``) never sees them, and once the window has passed they are
+    replaced by fresh ``:replica`` reads. The version itself already changes
+    with every write.
+    """
+    if not get_read_databases():
+        return ''
+    if _read_primary.get():
+        return ':primary'
+    if time.time() - changed_at < get_pin_seconds():
+        return ':lagging'
+    return ':replica'
+
+
+class TaskRouter:
+    app_label = 'tasks'
+
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label != self.app_label:
+            return None
+        replicas = get_read_databases()
+        if not replicas or _read_primary.get():
+            return PRIMARY
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        if model._meta.app_label != self.app_label:
+            return None
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Every alias holds the same data.
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        # Replicas are copies of the primary (sync_replicas), never migrated.
+        if db in get_read_databases():
+            return False
+        return None
+
+
+def is_pinned(request, now):
+    if request.method not in SAFE_METHODS:
+        return True
+    try:
+        return float(request.COOKIES.get(PIN_COOKIE, 0)) > now
+    except ValueError:
+        return False
+
+
+def pin_after_write(request, response, now):
+    """Keep the client on the primary for a while after a successful write."""
+    seconds = get_pin_seconds()
+    if request.method not in SAFE_METHODS and response.status_code < 400 and seconds > 0:
+        response.set_cookie(
+            PIN_COOKIE, str(now + seconds), max_age=seconds, httponly=True, samesite='Lax'
+        )
+    return response
+
+
+@sync_and_async_middleware
+def replica_pinning_middleware(get_response):
+    """
+    Route a request's reads to the primary when it is pinned. The choice
+    outlives the view because a streamed response (an export) still reads
+    while it is being sent.
+    """
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            now = time.time()
+            _read_primary.set(is_pinned(request, now))
+            return pin_after_write(request, await get_response(request), now)
+    else:
+        def middleware(request):
+            now = time.time()
+            _read_primary.set(is_pinned(request, now))
+            return pin_after_write(request, get_response(request), now)
+    return middleware
+
+
+@receiver(request_finished)
+def unpin(sender, **kwargs):
+    _read_primary.set(False)
@@ -0,0 +1,177 @@
+"""
+Full-text search backends for tasks.
+
+``get_search_backend()`` picks an implementation for the configured database
+engine, or the class named by ``TASKS_SEARCH_BACKEND``. Each backend filters a
+queryset to the tasks matching every search term and, when asked to rank,
+annotates ``search_rank`` so ``order_by_rank`` can put the best matches first.
+"""
+import operator
+import re
+from functools import reduce
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import BooleanField, Expression, F, FloatField, Q
+from django.utils.module_loading import import_string
+
+SEARCHABLE_FIELDS = ('title', 'description')
+
+WORD = re.compile(r'\w', re.UNICODE)
+
+
+class AliasedSQL(Expression):
+    """
+    Raw SQL with an ``{alias}`` placeholder for the task table.
+
+    The placeholder is filled in at compile time, so the fragment keeps
+    pointing at the right table when the queryset is nested as a subquery
+    (e.g. under ``pk__in`` in an UPDATE) and Django renames its alias.
+    """
+
+    def __init__(self, sql, params, output_field):
+        super().__init__(output_field=output_field)
+        self.sql, self.params = sql, params
+
+    @property
+    def conditional(self):
+        return isinstance(self.output_field, BooleanField)
+
+    def as_sql(self, compiler, connection):
+        alias = compiler.quote_name_unless_alias(compiler.query.get_initial_alias())
+        return self.sql.format(alias=alias), self.params
+
+
+class LikeSearchBackend:
+    """Case-insensitive substring matching; works on every database."""
+
+    def search(self, queryset, terms, fields=SEARCHABLE_FIELDS, ranked=False):
+        for term in terms:
+            queryset = queryset.filter(
+                reduce(operator.or_, (Q(**{f'{field}__icontains': term}) for field in fields))
+            )
+        return queryset
+
+    def order_by_rank(self, queryset):
+        return queryset
+
+    def rebuild(self):
+        pass
+
+
+class SQLiteSearchBackend:
+    """
+    SQLite FTS5 index stored in ``tasks_task_fts``.
+
+    The index is keyed by ``TaskSearchKey`` rows rather than the task table's
+    rowid, and triggers keep both in sync, so ``bulk_create`` and
+    ``QuerySet.update`` are indexed too. Terms are matched as word prefixes
+    and ranked with bm25.
+    """
+    table = 'tasks_task_fts'
+    index = 'search_key__index'
+
+    def build_query(self, terms, fields):
+        phrases = [
+            '"{}"*'.format(term.replace('"', '""'))
+            for term in terms if WORD.search(term)
+        ]
+        if not phrases:
+            return None
+        return '{{{}}} : ({})'.format(' '.join(fields), ' '.join(phrases))
+
+    def search(self, queryset, terms, fields=SEARCHABLE_FIELDS, ranked=False):
+        if not set(fields) <= set(SEARCHABLE_FIELDS):
+            return LikeSearchBackend().search(queryset, terms, fields)
+        query = self.build_query(terms, fields)
+        if query is None:
+            # Only punctuation: nothing the index could match.
+            return queryset.none() if terms else queryset
+
+        # The index drives the join, which is also the only place bm25 is
+        # available; repeated searches add their MATCH to the same join.
+        queryset = queryset.filter(**{f'{self.index}__document__match': query})
+        if ranked and 'search_rank' not in queryset.query.annotations:
+            queryset = queryset.annotate(search_rank=F(f'{self.index}__rank'))
+        return queryset
+
+    def order_by_rank(self, queryset):
+        if 'search_rank' not in queryset.query.annotations:
+            return queryset
+        return queryset.order_by('search_rank', *queryset.model._meta.ordering)
+
+    def rebuild(self):
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(
+                'DELETE FROM tasks_task_search_key '
+                'WHERE task_id NOT IN (SELECT id FROM tasks_task)'
+            )
+            cursor.execute(
+                'INSERT INTO tasks_task_search_key(task_id) SELECT id FROM tasks_task '
+                'WHERE id NOT IN (SELECT task_id FROM tasks_task_search_key)'
+            )
+            cursor.execute(f"INSERT INTO {self.table}({self.table}) VALUES('rebuild')")
+
+
+class PostgresSearchBackend:
+    """
+    ``tsvector`` matching backed by GIN expression indexes.
+
+    The vectors are computed from the same expressions the indexes in
+    ``0003_task_search_index`` are built on, so PostgreSQL keeps them current
+    on every write and can answer matches from the index.
+    """
+    vectors = {
+        ('title',): "to_tsvector('english', {alias}.title)",
+        ('title', 'description'): (
+            "to_tsvector('english', coalesce({alias}.title, '') || ' ' || "
+            "coalesce({alias}.description, ''))"
+        ),
+    }
+
+    def build_query(self, terms):
+        lexemes = [
+            "'{}':*".format(term.replace("'", "''").replace('\\', '\\\\'))
+            for term in terms if WORD.search(term)
+        ]
+        return ' & '.join(lexemes) or None
+
+    def search(self, queryset, terms, fields=SEARCHABLE_FIELDS, ranked=False):
+        vector = self.vectors.get(tuple(fields))
+        if vector is None:
+            return LikeSearchBackend().search(queryset, terms, fields)
+        query = self.build_query(terms)
+        if query is None:
+            # Only punctuation: nothing the index could match.
+            return queryset.none() if terms else queryset
+
+        tsquery = "to_tsquery('english', %s)"
+        queryset = queryset.filter(
+            AliasedSQL(f'{vector} @@ {tsquery}', [query], output_field=BooleanField())
+        )
+        if ranked and 'search_rank' not in queryset.query.annotations:
+            queryset = queryset.annotate(search_rank=AliasedSQL(
+                f'ts_rank({vector}, {tsquery})', [query], output_field=FloatField()
+            ))
+        return queryset
+
+    def order_by_rank(self, queryset):
+        if 'search_rank' not in queryset.query.annotations:
+            return queryset
+        return queryset.order_by('-search_rank', *queryset.model._meta.ordering)
+
+    def rebuild(self):
+        pass
+
+
+BACKENDS = {
+    'sqlite': SQLiteSearchBackend,
+    'postgresql': PostgresSearchBackend,
+}
+
+
+def get_search_backend():
+    path = getattr(settings, 'TASKS_SEARCH_BACKEND', None)
+    if path:
+        return import_string(path)()
+    return BACKENDS.get(connection.vendor, LikeSearchBackend)()
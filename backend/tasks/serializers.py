@@ -1,8 +1,56 @@
-from rest_framework import serializers
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
+from . import metrics
 from .models import Task
 from django.utils import timezone
 
 
+def clean_title(value):
+    if not value or not value.strip():
+        raise serializers.ValidationError("Title cannot be empty.")
+    if len(value.strip()) < 3:
+        raise serializers.ValidationError("Title must be at least 3 characters.")
+    return value.strip()
+
+
+def clean_priority(value):
+    if value < 1 or value > 5:
+        raise serializers.ValidationError("Priority must be between 1 and 5.")
+    return value
+
+
+class TaskListSerializer(serializers.ListSerializer):
+    @property
+    def data(self):
+        with metrics.timed('serializer'):
+            return super().data
+    
+    def validate_items(self):
+        """
+        Validate every item with the shared child serializer.
+        
+        Unlike ``is_valid()`` an invalid item does not fail the whole list.
+        Returns ``(valid, errors)``: a list of ``(index, validated_data)``
+        pairs and a list of ``{'index': ..., 'errors': ...}`` dicts.
+        """
+        if not isinstance(self.initial_data, list):
+            raise serializers.ValidationError({
+                'non_field_errors': ['Expected a list of items.']
+            })
+        
+        valid, errors = [], []
+        for index, item in enumerate(self.initial_data):
+            data = self.child.validate_plain(item)
+            if data is not None:
+                valid.append((index, data))
+                continue
+            try:
+                valid.append((index, self.child.run_validation(item)))
+            except serializers.ValidationError as exc:
+                errors.append({'index': index, 'errors': exc.detail})
+        return valid, errors
+
+
 class TaskSerializer(serializers.ModelSerializer):
     is_overdue = serializers.SerializerMethodField()
     
@@ -13,21 +61,181 @@ class TaskSerializer(serializers.ModelSerializer):
             'due_date', 'created_at', 'updated_at', 'is_overdue'
         ]
         read_only_fields = ['id', 'created_at', 'updated_at', 'is_overdue']
+        list_serializer_class = TaskListSerializer
+    
+    def __init__(self, *args, fields=None, **kwargs):
+        """``fields`` limits the output (see ``select_fields``), not the input."""
+        super().__init__(*args, **kwargs)
+        self.selected_fields = fields
+    
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        if self.selected_fields is None:
+            return data
+        return {field: data[field] for field in self.selected_fields}
+    
+    @property
+    def data(self):
+        with metrics.timed('serializer'):
+            return super().data
     
     def get_is_overdue(self, obj):
         return obj.is_overdue()
     
+    # JSON types the fast path accepts without coercion.
+    PLAIN_TYPES = {'title': str, 'description': str, 'status': str, 'priority': int}
+    
+    def validate_plain(self, data):
+        """
+        Validate an item whose values are already of the right JSON type and
+        valid, without the per-field machinery of ``run_validation``.
+        
+        Values go through the same field validators and ``validate_<field>``
+        methods. Returns the validated data, or None when any value would
+        need coercion or fails a check; ``run_validation`` then gives the
+        exact result and error messages.
+        """
+        if not isinstance(data, dict) or not self.partial and 'title' not in data:
+            return None
+        validated = {}
+        try:
+            for name, kind in self.PLAIN_TYPES.items():
+                if name not in data:
+                    continue
+                value, field = data[name], self.fields[name]
+                if type(value) is not kind:
+                    return None
+                if kind is str:
+                    value = value.strip()
+                if isinstance(field, serializers.ChoiceField):
+                    value = field.to_internal_value(value)
+                field.run_validators(value)
+                validate = getattr(self, f'validate_{name}', None)
+                validated[name] = validate(value) if validate else value
+            if 'due_date' in data:
+                due_date = data['due_date']
+                if due_date is not None:
+                    if type(due_date) is not str:
+                        return None
+                    due_date = self.fields['due_date'].to_internal_value(due_date)
+                validated['due_date'] = due_date
+        except serializers.ValidationError:
+            return None
+        return validated
+    
     def validate_title(self, value):
-        if not value or not value.strip():
-            raise serializers.ValidationError("Title cannot be empty.")
-        if len(value.strip()) < 3:
-            raise serializers.ValidationError("Title must be at least 3 characters.")
-        return value.strip()
+        return clean_title(value)
     
     def validate_priority(self, value):
-        if value < 1 or value > 5:
-            raise serializers.ValidationError("Priority must be between 1 and 5.")
-        return value
+        return clean_priority(value)
+
+
+def parse_field_names(value):
+    return [name.strip() for name in value.split(',') if name.strip()] if value else []
+
+
+def select_fields(fields=None, exclude=None):
+    """
+    Return the ``TaskSerializer`` fields named in ``fields`` (all when not
+    given) minus those in ``exclude``, both comma-separated, in serializer
+    order. Returns None when that is every field.
+    """
+    available = TaskSerializer.Meta.fields
+    errors = {}
+    for param, value in (('fields', fields), ('exclude', exclude)):
+        unknown = [name for name in parse_field_names(value) if name not in available]
+        if unknown:
+            errors[param] = [f'Unknown field: {name}.' for name in unknown]
+    if errors:
+        raise serializers.ValidationError(errors)
+    
+    selected = set(parse_field_names(fields)) or set(available)
+    selected -= set(parse_field_names(exclude))
+    if not selected:
+        raise serializers.ValidationError({'exclude': ['At least one field must remain.']})
+    if len(selected) == len(available):
+        return None
+    return tuple(field for field in available if field in selected)
+
+
+class TaskRowSerializer:
+    """
+    Read-only fast path producing exactly the output of ``TaskSerializer``.
+    
+    Rows are ``values(*TaskRowSerializer.fields)`` dicts (or Task instances)
+    turned straight into dicts. ``is_overdue`` comes from the ``overdue``
+    annotation when the row has it and is otherwise computed against one
+    timestamp for the whole response instead of per row.
+    
+    With ``fields`` (see ``select_fields``) only those fields are written,
+    and rows only need the columns ``columns(fields)`` names.
+    """
+    fields = [field for field in TaskSerializer.Meta.fields if field != 'is_overdue']
+    datetime_fields = ('due_date', 'created_at', 'updated_at')
+    
+    @classmethod
+    def columns(cls, fields=None):
+        """The ``values()`` names to read for ``fields`` (default: all)."""
+        return [
+            'overdue' if field == 'is_overdue' else field
+            for field in fields or TaskSerializer.Meta.fields
+        ]
+    
+    def __init__(self, now=None, fields=None):
+        self.now = now or timezone.now()
+        self.selected_fields = fields
+        field = serializers.DateTimeField()
+        tz = field.default_timezone()
+        if api_settings.DATETIME_FORMAT != ISO_8601 or tz is None:
+            self.datetime = field.to_representation
+            return
+        
+        # DateTimeField.to_representation for aware ISO 8601 output, with the
+        # timezone resolved once instead of for every value.
+        def isoformat(value):
+            if not value:
+                return None
+            value = value.astimezone(tz).isoformat()
+            return value[:-6] + 'Z' if value.endswith('+00:00') else value
+        
+        self.datetime = isoformat
+    
+    def to_representation(self, row):
+        if not isinstance(row, dict):
+            row = row.__dict__
+        if self.selected_fields is not None:
+            return {field: self.represent(row, field) for field in self.selected_fields}
+        return {
+            'id': str(row['id']),
+            'title': row['title'],
+            'description': row['description'],
+            'status': row['status'],
+            'priority': row['priority'],
+            'due_date': self.datetime(row['due_date']),
+            'created_at': self.datetime(row['created_at']),
+            'updated_at': self.datetime(row['updated_at']),
+            'is_overdue': self.is_overdue(row),
+        }
+    
+    def represent(self, row, field):
+        if field == 'id':
+            return str(row['id'])
+        if field == 'is_overdue':
+            return self.is_overdue(row)
+        if field in self.datetime_fields:
+            return self.datetime(row[field])
+        return row[field]
+    
+    def is_overdue(self, row):
+        overdue = row.get('overdue')
+        if overdue is None:
+            due_date = row['due_date']
+            overdue = bool(due_date) and row['status'] != 'done' and self.now > due_date
+        return overdue
+    
+    def many(self, rows):
+        with metrics.timed('serializer'):
+            return [self.to_representation(row) for row in rows]
 
 
 class TaskSummarySerializer(serializers.Serializer):
@@ -36,4 +244,11 @@ class TaskSummarySerializer(serializers.Serializer):
     in_progress_count = serializers.IntegerField()
     done_count = serializers.IntegerField()
     overdue_count = serializers.IntegerField()
-    high_priority_count = serializers.IntegerField()
\ No newline at end of file
+    high_priority_count = serializers.IntegerField()
+
+
+class TaskTransitionSerializer(serializers.Serializer):
+    status = serializers.ChoiceField(choices=Task.STATUS_CHOICES)
+    ids = serializers.ListField(
+        child=serializers.UUIDField(), required=False, allow_empty=False
+    )
@@ -0,0 +1,59 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import Signal, receiver
+
+from . import cache, events
+from .models import Task, TaskTombstone
+from .response_cache import get_response_cache
+
+# Sent after tasks are created, updated or deleted, with ``action`` ('create',
+# 'update' or 'delete') and the affected ``pks`` (None when the rows were
+# changed by a query and are not known individually). Updates that only moved
+# the tasks to another status also pass that ``status``. Model saves and deletes
+# send it automatically; bulk writes that bypass them must send it themselves.
+tasks_changed = Signal()
+
+STATUS_FIELDS = {'status', 'updated_at'}
+
+
+@receiver(post_save, sender=Task)
+def task_saved(sender, instance, created, update_fields=None, **kwargs):
+    status = instance.status if update_fields and update_fields <= STATUS_FIELDS else None
+    tasks_changed.send(
+        sender=Task, action='create' if created else 'update', pks=[instance.pk], status=status
+    )
+
+
+@receiver(post_delete, sender=Task)
+def task_deleted(sender, instance, **kwargs):
+    tasks_changed.send(sender=Task, action='delete', pks=[instance.pk])
+
+
+def invalidate():
+    cache.bump_version()
+    # Entries are keyed by the version already; dropping the local ones
+    # frees their memory right away.
+    get_response_cache().clear()
+
+
+@receiver(tasks_changed)
+def invalidate_task_caches(sender, **kwargs):
+    # Right away, so reads later in the writing transaction miss older
+    # entries, and again on commit: until then other requests still read the
+    # old rows and may cache them under the interim version.
+    invalidate()
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(invalidate)
+
+
+@receiver(tasks_changed)
+def record_tombstones(sender, action, pks=None, **kwargs):
+    """Remember deleted ids for the change feed (``TaskViewSet.changes``)."""
+    if action == 'delete' and pks:
+        TaskTombstone.objects.bulk_create([TaskTombstone(task_id=pk) for pk in pks])
+
+
+@receiver(tasks_changed)
+def publish_task_events(sender, action, pks=None, status=None, **kwargs):
+    """Push the change to open event streams (``events.stream``)."""
+    events.publish_task_change(action, pks, status)
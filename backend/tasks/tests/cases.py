@@ -0,0 +1,20 @@
+"""Request parameters shared by the query plan and query budget tests."""
+
+# Each TaskFilter alone, a few combinations, and due dates far in the past and
+# far in the future.
+FILTERS = [
+    {},
+    {'status': 'todo'},
+    {'priority': '5'},
+    {'priority_min': '4'},
+    {'priority_max': '2'},
+    {'priority_min': '2', 'priority_max': '4'},
+    {'status': 'in_progress', 'priority': '3'},
+    {'title_contains': 'report'},
+    {'overdue': 'true'},
+    {'overdue': 'false'},
+    {'due_before': '2030-01-01T00:00:00Z'},
+    {'due_after': '2030-01-01T00:00:00Z'},
+    {'due_before': '2000-01-01T00:00:00Z'},
+    {'due_after': '2000-01-01T00:00:00Z'},
+]
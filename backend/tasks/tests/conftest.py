@@ -0,0 +1,21 @@
+import pytest
+from django.core.cache import cache
+from rest_framework.test import APIClient
+
+from tasks.response_cache import get_response_cache
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Keep cached task data from leaking between tests"""
+    cache.clear()
+    get_response_cache().clear()
+    yield
+    cache.clear()
+    get_response_cache().clear()
+
+
+@pytest.fixture
+def api_client():
+    """Fixture to create API client for testing"""
+    return APIClient()
@@ -0,0 +1,105 @@
+"""
+Pytest plugin that holds requests to a declared number of SQL queries.
+
+The ``query_budget`` fixture returns a context manager::
+
+    with query_budget(2):
+        api_client.get('/api/tasks/')
+
+When the block runs more queries than its budget the test fails with a diff
+of the SQL it ran against the baseline recorded for that test in
+``query_baselines.json``, so the queries that were added stand out. Values
+are replaced with ``?`` before comparing, so the diff only shows changes in
+the shape of the SQL. After a deliberate change, record new baselines with::
+
+    pytest tasks/tests/test_query_budgets.py --update-query-baselines
+"""
+import difflib
+import json
+import re
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+BASELINE_PATH = Path(__file__).with_name('query_baselines.json')
+
+VALUE_PATTERNS = [
+    (re.compile(r'"s\d+_x\d+"'), '"savepoint"'),
+    (re.compile(r"'(?:[^']|'')*'"), '?'),
+    (re.compile(r'\b\d+(?:\.\d+)?\b'), '?'),
+    (re.compile(r'\b[0-9a-f]{32}\b'), '?'),
+    (re.compile(r'\((?:\?, )+\?\)'), '(...)'),
+]
+
+
+def normalize(sql):
+    """Replace literal values in ``sql`` so that runs can be compared."""
+    for pattern, replacement in VALUE_PATTERNS:
+        sql = pattern.sub(replacement, sql)
+    return sql
+
+
+def load_baselines():
+    if not BASELINE_PATH.exists():
+        return {}
+    return json.loads(BASELINE_PATH.read_text())
+
+
+def describe_overrun(name, budget, executed, baseline):
+    lines = [f'{name} ran {len(executed)} queries, over its budget of {budget}.']
+    for sql, count in Counter(executed).items():
+        if count > 1:
+            lines.append(f'Repeated {count} times (N+1?): {sql}')
+    if baseline is None:
+        lines.append('No baseline recorded; executed SQL:')
+        lines += [f'  {sql}' for sql in executed]
+    else:
+        lines += difflib.unified_diff(
+            baseline, executed, 'baseline', 'executed', lineterm='', n=len(baseline) + len(executed)
+        )
+    return '\n'.join(lines)
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        '--update-query-baselines', action='store_true',
+        help='Record the SQL run inside query_budget blocks as the new baselines.'
+    )
+
+
+def pytest_configure(config):
+    config.query_baselines = {}
+
+
+def pytest_unconfigure(config):
+    if config.getoption('--update-query-baselines', False) and config.query_baselines:
+        baselines = {**load_baselines(), **config.query_baselines}
+        BASELINE_PATH.write_text(json.dumps(baselines, indent=2, sort_keys=True) + '\n')
+
+
+@pytest.fixture
+def query_budget(request):
+    """Fail the test when a block runs more SQL queries than its budget."""
+    baselines = load_baselines()
+    update = request.config.getoption('--update-query-baselines')
+    blocks = []
+
+    @contextmanager
+    def check(budget, using=connection):
+        name = request.node.nodeid.split('::', 1)[1]
+        if blocks:
+            name = f'{name}#{len(blocks)}'
+        blocks.append(name)
+        with CaptureQueriesContext(using) as captured:
+            yield captured
+        executed = [normalize(query['sql']) for query in captured]
+        if update:
+            request.config.query_baselines[name] = executed
+        elif len(executed) > budget:
+            pytest.fail(describe_overrun(name, budget, executed, baselines.get(name)), pytrace=False)
+
+    return check
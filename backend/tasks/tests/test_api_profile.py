@@ -0,0 +1,98 @@
+"""
+Tests for the API-only settings profile (TASKS_APP_PROFILE=api)
+"""
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+from django.conf import settings as django_settings
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from tasks.models import Task
+
+API_MIDDLEWARE = [
+    name for name in django_settings.MIDDLEWARE
+    if name not in django_settings.API_ONLY_EXCLUDED_MIDDLEWARE
+]
+
+PROBE = '''
+import json, sys
+import django
+django.setup()
+from django.conf import settings
+from django.core.management import call_command
+from django.urls import resolve
+call_command('check', fail_level='WARNING')
+resolve('/api/tasks/')
+print(json.dumps({
+    'apps': settings.INSTALLED_APPS,
+    'middleware': settings.MIDDLEWARE,
+    'urlconf': settings.ROOT_URLCONF,
+    'loaded': sorted(name for name in ('drf_yasg', 'tasks.admin', 'django.contrib.messages.middleware',
+                                       'django.contrib.sessions.middleware') if name in sys.modules),
+}))
+'''
+
+
+@pytest.fixture
+def api_only(settings):
+    settings.ROOT_URLCONF = 'task_manager.api_urls'
+    settings.MIDDLEWARE = API_MIDDLEWARE
+    settings.REST_FRAMEWORK = {
+        **settings.REST_FRAMEWORK,
+        'DEFAULT_AUTHENTICATION_CLASSES': ['rest_framework.authentication.BasicAuthentication'],
+    }
+
+
+@pytest.mark.django_db
+class TestApiOnlyProfile:
+    """Test the API served with the API-only URLconf and middleware"""
+
+    def test_api_works_without_session_middleware(self, api_only):
+        """Test reads and writes work without sessions, CSRF or auth middleware"""
+        client = APIClient(enforce_csrf_checks=True)
+        created = client.post('/api/tasks/', {'title': "API only"}, format='json')
+        assert created.status_code == status.HTTP_201_CREATED
+
+        response = client.get('/api/tasks/')
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['count'] == 1
+        assert 'X-Frame-Options' not in response
+        assert 'Cookie' not in response.get('Vary', '')
+
+        task = Task.objects.get()
+        assert client.post(f'/api/tasks/{task.id}/mark_done/').status_code == status.HTTP_200_OK
+
+    def test_admin_and_docs_not_served(self, api_only):
+        """Test only /api/ is routed"""
+        client = APIClient()
+        for path in ('/admin/', '/swagger/', '/redoc/'):
+            assert client.get(path).status_code == status.HTTP_404_NOT_FOUND
+
+    def test_browsable_api_renders(self, api_only):
+        """Test the HTML renderer works without the messages app's middleware"""
+        response = APIClient().get('/api/tasks/', HTTP_ACCEPT='text/html')
+        assert response.status_code == status.HTTP_200_OK
+        assert b'Task List' in response.content
+
+    def test_profile_settings(self):
+        """Test the profile drops the apps and middleware at startup"""
+        environ = {
+            **os.environ,
+            'TASKS_APP_PROFILE': 'api',
+            'DJANGO_SETTINGS_MODULE': 'task_manager.settings',
+        }
+        output = subprocess.run(
+            [sys.executable, '-c', PROBE], env=environ, cwd=django_settings.BASE_DIR,
+            check=True, capture_output=True, text=True,
+        )
+        profile = json.loads(output.stdout.strip().splitlines()[-1])
+
+        assert profile['urlconf'] == 'task_manager.api_urls'
+        assert profile['middleware'] == API_MIDDLEWARE
+        assert not set(profile['apps']) & set(django_settings.API_ONLY_EXCLUDED_APPS)
+        assert 'rest_framework' in profile['apps']
+        assert profile['loaded'] == []
@@ -0,0 +1,149 @@
+"""
+Tests for the async read endpoints
+"""
+import uuid
+from datetime import timedelta
+from unittest import mock
+
+import pytest
+from django.contrib.auth.models import User
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.throttling import SimpleRateThrottle
+
+from tasks.models import Task
+from tasks.views import TaskViewSet
+
+PARAMS = [
+    {},
+    {'page': '2', 'page_size': '2'},
+    {'page': 'last', 'page_size': '2'},
+    {'status': 'todo', 'ordering': '-priority'},
+    {'overdue': 'true'},
+    {'search': 'report'},
+    {'pagination': 'cursor', 'page_size': '2', 'ordering': 'due_date'},
+    {'fields': 'title,is_overdue', 'pagination': 'cursor', 'page_size': '2', 'ordering': 'priority'},
+    {'exclude': 'description'},
+    {'due_before': '2100-01-01T00:00:00Z', 'ordering': 'priority'},
+    {'due_after': '2000-01-01T00:00:00Z', 'pagination': 'cursor', 'page_size': '2'},
+]
+
+
+@pytest.fixture
+def tasks():
+    now = timezone.now()
+    return [
+        Task.objects.create(title="Quarterly report", priority=5, due_date=now - timedelta(days=1)),
+        Task.objects.create(title="Review budget", status='in_progress', priority=2),
+        Task.objects.create(title="Ship release", status='done', due_date=now - timedelta(days=2)),
+        Task.objects.create(title="Report bug", priority=4, due_date=now + timedelta(days=3)),
+        Task.objects.create(title="Plan sprint"),
+    ]
+
+
+def strip_host(data):
+    """Links are absolute; drop the view-specific prefix before comparing."""
+    if isinstance(data, dict):
+        return {
+            key: value.replace('/api/async/tasks/', '/api/tasks/')
+            if key in ('next', 'previous') and value else value
+            for key, value in data.items()
+        }
+    return data
+
+
+@pytest.mark.django_db
+class TestAsyncReadEndpoints:
+    """Test /api/async/tasks/ answers exactly like the TaskViewSet read actions"""
+
+    @pytest.mark.parametrize('params', PARAMS)
+    def test_list_matches_sync_view(self, api_client, tasks, params):
+        """Test the async list returns the same JSON as the sync list"""
+        sync = api_client.get('/api/tasks/', params)
+        response = api_client.get('/api/async/tasks/', params)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response['Content-Type'] == 'application/json'
+        assert strip_host(response.json()) == strip_host(sync.json())
+
+    def test_follow_cursor_link(self, api_client, tasks):
+        """Test keyset pagination links work on the async list"""
+        first = api_client.get('/api/async/tasks/', {'pagination': 'cursor', 'page_size': 3}).json()
+        second = api_client.get(first['next']).json()
+
+        titles = [task['title'] for task in first['results'] + second['results']]
+        assert sorted(titles) == sorted(task.title for task in tasks)
+
+    def test_detail_matches_sync_view(self, api_client, tasks):
+        """Test the async detail returns the same JSON as the sync detail"""
+        task = tasks[0]
+
+        response = api_client.get(f'/api/async/tasks/{task.id}/')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == api_client.get(f'/api/tasks/{task.id}/').json()
+        assert response.json()['is_overdue'] is True
+
+    def test_summary_matches_sync_view(self, api_client, tasks):
+        """Test the async summary returns the same counts as the sync summary"""
+        for params in (
+            {}, {'search': 'report'}, {'priority': 5},
+            {'due_after': '2000-01-01T00:00:00Z'}, {'due_before': '2000-01-01T00:00:00Z'},
+        ):
+            response = api_client.get('/api/async/tasks/summary/', params)
+
+            assert response.status_code == status.HTTP_200_OK
+            assert response.json() == api_client.get('/api/tasks/summary/', params).json()
+
+    def test_errors(self, api_client, tasks):
+        """Test missing tasks, invalid pages and filters, and writes"""
+        missing = api_client.get('/api/async/tasks/00000000-0000-0000-0000-000000000000/')
+        assert missing.status_code == status.HTTP_404_NOT_FOUND
+        assert missing.json() == {'detail': 'Not found.'}
+
+        invalid_page = api_client.get('/api/async/tasks/', {'page': 99})
+        assert invalid_page.status_code == status.HTTP_404_NOT_FOUND
+
+        invalid_filter = api_client.get('/api/async/tasks/', {'status': 'archived'})
+        assert invalid_filter.status_code == status.HTTP_400_BAD_REQUEST
+        assert 'status' in invalid_filter.json()
+
+        write = api_client.post('/api/async/tasks/', {'title': 'New task'}, format='json')
+        assert write.status_code == status.HTTP_405_METHOD_NOT_ALLOWED
+
+    def test_head_has_headers_but_no_body(self, api_client, tasks):
+        """Test HEAD answers like GET without sending the body"""
+        get = api_client.get('/api/async/tasks/')
+        head = api_client.head('/api/async/tasks/')
+
+        assert head.status_code == status.HTTP_200_OK
+        assert head.content == b''
+        assert head['Content-Length'] == str(len(get.content))
+
+    def test_permissions_apply(self, api_client, tasks):
+        """Test the viewset's permission classes guard the async views too"""
+        with mock.patch.object(TaskViewSet, 'permission_classes', [IsAuthenticated]):
+            anonymous = api_client.get('/api/async/tasks/summary/')
+            api_client.force_authenticate(user=User(username='reader'))
+            authenticated = api_client.get('/api/async/tasks/summary/')
+
+        assert anonymous.status_code == status.HTTP_403_FORBIDDEN
+        assert authenticated.status_code == status.HTTP_200_OK
+
+    def test_throttles_apply(self, api_client, tasks):
+        """Test the viewset's throttles limit the async views too"""
+        class OncePerMinute(SimpleRateThrottle):
+            rate = '1/min'
+            key = f'async-throttle-{uuid.uuid4()}'
+
+            def get_cache_key(self, request, view):
+                return self.key
+
+        with mock.patch.object(TaskViewSet, 'throttle_classes', [OncePerMinute]):
+            first = api_client.get('/api/async/tasks/summary/')
+            second = api_client.get('/api/async/tasks/summary/')
+
+        assert first.status_code == status.HTTP_200_OK
+        assert second.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        assert 'Retry-After' in second
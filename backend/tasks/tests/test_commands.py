@@ -0,0 +1,243 @@
+"""
+Tests for the tasks management commands
+"""
+import gzip
+import io
+import json
+import uuid
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.utils import timezone
+
+from tasks.models import Task, TaskTombstone
+
+
+def write_ndjson(path, rows):
+    path.write_text(''.join(json.dumps(row) + '\n' for row in rows), encoding='utf-8')
+    return path
+
+
+def run_import(*args):
+    stdout = io.StringIO()
+    call_command('import_tasks', *map(str, args), stdout=stdout)
+    return stdout.getvalue()
+
+
+@pytest.mark.django_db
+class TestImportTasksCommand:
+    """Test suite for the import_tasks management command"""
+
+    def test_import_ndjson(self, tmp_path):
+        """Test importing valid NDJSON rows"""
+        path = write_ndjson(tmp_path / 'tasks.ndjson', [
+            {'title': 'First task', 'priority': 5, 'due_date': '2030-01-01T09:00:00Z'},
+            {'title': '  Second task  ', 'status': 'done', 'description': 'Notes'},
+        ])
+
+        output = run_import(path)
+
+        assert '2 imported, 0 rejected' in output
+        first = Task.objects.get(title='First task')
+        assert first.priority == 5
+        assert first.status == 'todo'
+        assert first.due_date.year == 2030
+        second = Task.objects.get(title='Second task')
+        assert second.status == 'done'
+        assert second.priority == 3
+        assert not (tmp_path / 'tasks.ndjson.rejects.ndjson').exists()
+
+    def test_import_gzip_csv(self, tmp_path):
+        """Test importing a gzip-compressed CSV file with a multi-line value"""
+        path = tmp_path / 'tasks.csv.gz'
+        with gzip.open(path, 'wt', encoding='utf-8', newline='') as fh:
+            fh.write('title,description,priority,is_overdue\r\n')
+            fh.write('CSV task,"Line one\r\nLine two",4,False\r\n')
+            fh.write('Another task,,,\r\n')
+
+        run_import(path)
+
+        task = Task.objects.get(title='CSV task')
+        assert task.description == 'Line one\r\nLine two'
+        assert task.priority == 4
+        assert Task.objects.get(title='Another task').priority == 3
+
+    def test_rejects_use_serializer_rules(self, tmp_path):
+        """Test invalid rows are written to the rejects file"""
+        path = tmp_path / 'tasks.ndjson'
+        path.write_text(
+            json.dumps({'title': 'Valid task'}) + '\n'
+            + json.dumps({'title': 'AB'}) + '\n'
+            + json.dumps({'title': 'Bad priority', 'priority': 9}) + '\n'
+            + json.dumps({'title': 'Bad status', 'status': 'archived'}) + '\n'
+            + '{not json\n',
+            encoding='utf-8',
+        )
+
+        output = run_import(path)
+
+        assert '1 imported, 4 rejected' in output
+        rejects = [
+            json.loads(line)
+            for line in (tmp_path / 'tasks.ndjson.rejects.ndjson').read_text().splitlines()
+        ]
+        assert rejects[0]['errors'] == {'title': ['Title must be at least 3 characters.']}
+        assert rejects[1]['errors'] == {'priority': ['Priority must be between 1 and 5.']}
+        assert 'status' in rejects[2]['errors']
+        assert 'non_field_errors' in rejects[3]['errors']
+        assert rejects[3]['row'] == '{not json'
+        assert rejects[1]['offset'] == len(json.dumps({'title': 'Valid task'})) + 1 + len(
+            json.dumps({'title': 'AB'})
+        ) + 1
+
+    def test_non_string_status_is_rejected(self, tmp_path):
+        """Test a list or object status rejects its row instead of aborting the import"""
+        path = write_ndjson(tmp_path / 'tasks.ndjson', [
+            {'title': 'List status', 'status': ['done']},
+            {'title': 'Object status', 'status': {'done': True}},
+            {'title': 'Valid task'},
+        ])
+
+        output = run_import(path)
+
+        assert '1 imported, 2 rejected' in output
+        rejects = [
+            json.loads(line)
+            for line in (tmp_path / 'tasks.ndjson.rejects.ndjson').read_text().splitlines()
+        ]
+        assert [reject['errors'] for reject in rejects] == [{'status': ['Not a valid string.']}] * 2
+
+    def test_resume_from_offset(self, tmp_path):
+        """Test resuming an import from a reported byte offset"""
+        rows = [{'title': f'Task number {index}'} for index in range(5)]
+        path = write_ndjson(tmp_path / 'tasks.jsonl', rows)
+        offset = sum(len(json.dumps(row)) + 1 for row in rows[:3])
+
+        output = run_import(path, '--offset', offset)
+
+        assert f'offset {path.stat().st_size}' in output
+        assert sorted(Task.objects.values_list('title', flat=True)) == [
+            'Task number 3', 'Task number 4'
+        ]
+
+    def test_reports_progress_per_batch(self, tmp_path):
+        """Test every committed batch reports its resume offset"""
+        rows = [{'title': f'Task number {index}'} for index in range(5)]
+        path = write_ndjson(tmp_path / 'tasks.ndjson', rows)
+
+        output = run_import(path, '--batch-size', 2)
+
+        assert '2 imported' in output
+        assert '4 imported' in output
+        assert '5 imported, 0 rejected' in output
+        assert Task.objects.count() == 5
+
+    def test_rows_refused_by_the_database_are_rejected(self, tmp_path):
+        """Test a duplicate id rejects that row instead of the whole batch"""
+        existing = Task.objects.create(title='Existing task')
+        duplicate = str(uuid.uuid4())
+        path = write_ndjson(tmp_path / 'tasks.ndjson', [
+            {'title': 'First task'},
+            {'id': str(existing.pk), 'title': 'Clashing task'},
+            {'id': duplicate, 'title': 'Original task'},
+            {'id': duplicate, 'title': 'Repeated task'},
+            {'title': 'Last task'},
+        ])
+
+        output = run_import(path)
+
+        assert '3 imported, 2 rejected' in output
+        assert set(Task.objects.values_list('title', flat=True)) == {
+            'Existing task', 'First task', 'Original task', 'Last task'
+        }
+        rejects = [
+            json.loads(line)
+            for line in (tmp_path / 'tasks.ndjson.rejects.ndjson').read_text().splitlines()
+        ]
+        assert [json.loads(reject['row'])['title'] for reject in rejects] == [
+            'Clashing task', 'Repeated task'
+        ]
+        assert all('non_field_errors' in reject['errors'] for reject in rejects)
+
+    def test_resume_does_not_duplicate_rejects(self, tmp_path):
+        """Test resuming from a checkpoint cuts the rejects file back to it"""
+        rows = [{'title': 'AB'} if index % 2 else {'title': f'Task number {index}'} for index in range(6)]
+        path = write_ndjson(tmp_path / 'tasks.ndjson', rows)
+        output = run_import(path, '--batch-size', 1)
+        # Second checkpoint: rows 0-2 read, row 1 rejected. The rejects of
+        # rows 3 and 5 are already in the file, as after a crash.
+        checkpoint = output.splitlines()[1]
+        offset, rejects_offset = (int(part.split()[-1]) for part in checkpoint.split(', ')[-2:])
+
+        run_import(path, '--offset', offset, '--rejects-offset', rejects_offset)
+
+        rejects = (tmp_path / 'tasks.ndjson.rejects.ndjson').read_text().splitlines()
+        assert [json.loads(line)['offset'] for line in rejects] == [
+            sum(len(json.dumps(row)) + 1 for row in rows[:index]) for index in (1, 3, 5)
+        ]
+
+    def test_unknown_format(self, tmp_path):
+        """Test a file without a known extension needs --format"""
+        path = write_ndjson(tmp_path / 'tasks.txt', [{'title': 'Some task'}])
+
+        with pytest.raises(CommandError):
+            run_import(path)
+
+        run_import(path, '--format', 'ndjson')
+        assert Task.objects.count() == 1
+
+
+@pytest.mark.django_db
+class TestPurgeTombstonesCommand:
+    """Test suite for the purge_tombstones management command"""
+
+    def test_purges_only_expired_tombstones(self):
+        """Test tombstones inside the retention period are kept"""
+        old, recent = TaskTombstone.objects.bulk_create([
+            TaskTombstone(task_id=uuid.uuid4()), TaskTombstone(task_id=uuid.uuid4()),
+        ])
+        TaskTombstone.objects.filter(pk=old.pk).update(
+            deleted_at=timezone.now() - timedelta(days=31)
+        )
+        stdout = io.StringIO()
+
+        call_command('purge_tombstones', stdout=stdout)
+
+        assert 'Deleted 1 tombstones' in stdout.getvalue()
+        assert list(TaskTombstone.objects.values_list('pk', flat=True)) == [recent.pk]
+
+
+class TestGenerateOpenapiCommand:
+    """Test suite for the generate_openapi management command"""
+
+    def test_writes_document(self, settings, tmp_path):
+        """Test the document is written to TASKS_OPENAPI_FILE"""
+        settings.TASKS_OPENAPI_FILE = tmp_path / 'openapi.json'
+        stdout = io.StringIO()
+
+        call_command('generate_openapi', stdout=stdout)
+
+        document = json.loads(settings.TASKS_OPENAPI_FILE.read_text())
+        assert document['info']['title'] == 'Task Manager API'
+        assert '/tasks/' in document['paths']
+        assert '/tasks/{id}/mark_done/' in document['paths']
+        # Left out so the document works on any host.
+        assert 'host' not in document
+        assert 'Wrote' in stdout.getvalue()
+
+    def test_check(self, settings, tmp_path):
+        """Test --check fails for a missing or stale file and passes otherwise"""
+        path = tmp_path / 'openapi.json'
+        with pytest.raises(CommandError, match='out of date'):
+            call_command('generate_openapi', '--check', '--output', str(path), stdout=io.StringIO())
+
+        call_command('generate_openapi', '--output', str(path), stdout=io.StringIO())
+        stdout = io.StringIO()
+        call_command('generate_openapi', '--check', '--output', str(path), stdout=stdout)
+        assert 'up to date' in stdout.getvalue()
+
+        path.write_text('{}')
+        with pytest.raises(CommandError, match='out of date'):
+            call_command('generate_openapi', '--check', '--output', str(path), stdout=io.StringIO())
@@ -0,0 +1,115 @@
+"""
+Tests for the response compression middleware
+"""
+import gzip
+
+import pytest
+from rest_framework import status
+
+from tasks.compression import choose_encoding, parse_accept_encoding
+from tasks.models import Task
+
+
+@pytest.fixture
+def tasks():
+    return Task.objects.bulk_create([
+        Task(title=f"Compressible task {number}", description="Long enough to compress " * 4)
+        for number in range(20)
+    ])
+
+
+@pytest.mark.django_db
+class TestCompression:
+    """Test gzip and brotli responses negotiated with Accept-Encoding"""
+
+    def test_gzip(self, api_client, tasks):
+        """Test a list is gzipped for clients that accept it"""
+        plain = api_client.get('/api/tasks/?page_size=20')
+        response = api_client.get('/api/tasks/?page_size=20', HTTP_ACCEPT_ENCODING='gzip, deflate')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response['Content-Encoding'] == 'gzip'
+        assert gzip.decompress(response.content) == plain.content
+        assert int(response['Content-Length']) == len(response.content) < len(plain.content)
+        assert 'Accept-Encoding' in response['Vary'] and 'Accept-Encoding' in plain['Vary']
+        assert not plain.has_header('Content-Encoding')
+
+    def test_brotli_preferred(self, api_client, tasks):
+        """Test brotli is chosen over gzip when both are accepted"""
+        brotli = pytest.importorskip('brotli')
+        plain = api_client.get('/api/tasks/?page_size=20')
+        response = api_client.get('/api/tasks/?page_size=20', HTTP_ACCEPT_ENCODING='gzip, br')
+
+        assert response['Content-Encoding'] == 'br'
+        assert brotli.decompress(response.content) == plain.content
+
+    def test_coded_etag_revalidates(self, api_client, tasks):
+        """Test a compressed response's ETag stays strong and still gets a 304"""
+        response = api_client.get('/api/tasks/?page_size=20', HTTP_ACCEPT_ENCODING='gzip')
+        etag = response['ETag']
+        assert etag.startswith('"') and etag.endswith('-gzip"')
+
+        cached = api_client.get(
+            '/api/tasks/?page_size=20', HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=etag,
+        )
+        assert cached.status_code == status.HTTP_304_NOT_MODIFIED
+
+    def test_coded_etag_allows_if_match_write(self, api_client):
+        """Test the ETag of a gzipped task can be sent back with If-Match"""
+        task = Task.objects.create(title="Large task", description="Long description " * 100)
+        response = api_client.get(f'/api/tasks/{task.id}/', HTTP_ACCEPT_ENCODING='gzip')
+        assert response['Content-Encoding'] == 'gzip'
+
+        updated = api_client.patch(
+            f'/api/tasks/{task.id}/', {'priority': 5}, format='json',
+            HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_MATCH=response['ETag'],
+        )
+        stale = api_client.patch(
+            f'/api/tasks/{task.id}/', {'priority': 1}, format='json', HTTP_IF_MATCH=response['ETag'],
+        )
+
+        assert updated.status_code == status.HTTP_200_OK
+        assert stale.status_code == status.HTTP_412_PRECONDITION_FAILED
+        assert Task.objects.get(pk=task.pk).priority == 5
+
+    def test_left_alone(self, api_client, tasks, settings):
+        """Test small, refused, HTML and disabled cases are not compressed"""
+        small = api_client.get('/api/tasks/summary/', HTTP_ACCEPT_ENCODING='gzip')
+        assert not small.has_header('Content-Encoding')
+        refused = api_client.get('/api/tasks/?page_size=20', HTTP_ACCEPT_ENCODING='gzip;q=0, br;q=0')
+        assert not refused.has_header('Content-Encoding')
+        html = api_client.get('/api/tasks/', HTTP_ACCEPT='text/html', HTTP_ACCEPT_ENCODING='gzip')
+        assert not html.has_header('Content-Encoding')
+
+        settings.TASKS_COMPRESSION = []
+        disabled = api_client.get('/api/tasks/?page_size=20', HTTP_ACCEPT_ENCODING='gzip')
+        assert not disabled.has_header('Content-Encoding')
+
+    def test_streamed_export(self, api_client, tasks, settings):
+        """Test a streamed export is compressed as it streams"""
+        settings.TASKS_COMPRESSION = ['gzip']
+        plain = b''.join(api_client.get('/api/tasks/export/').streaming_content)
+        response = api_client.get('/api/tasks/export/', HTTP_ACCEPT_ENCODING='gzip')
+
+        assert response['Content-Encoding'] == 'gzip'
+        assert not response.has_header('Content-Length')
+        assert gzip.decompress(b''.join(response.streaming_content)) == plain
+
+
+class TestAcceptEncoding:
+    """Test parsing Accept-Encoding and choosing an encoding"""
+
+    def test_parse(self):
+        """Test codings and their q-values"""
+        assert parse_accept_encoding('gzip, br;q=0.5, identity; q=0, x;q=bad') == {
+            'gzip': 1.0, 'br': 0.5, 'identity': 0.0, 'x': 0.0,
+        }
+        assert parse_accept_encoding('') == {}
+
+    def test_choose(self, settings):
+        """Test the server's order decides among accepted encodings"""
+        settings.TASKS_COMPRESSION = ['gzip']
+        assert choose_encoding('br, gzip') == 'gzip'
+        assert choose_encoding('*') == 'gzip'
+        assert choose_encoding('*, gzip;q=0') is None
+        assert choose_encoding('identity') is None
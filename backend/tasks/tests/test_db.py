@@ -0,0 +1,81 @@
+"""
+Tests for the SQLite connection tuning
+"""
+import pytest
+from django.db import OperationalError, connection
+from django.db.backends.sqlite3.base import DatabaseWrapper
+
+PRODUCTION_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,
+    'cache_size': -64 * 1024,
+}
+
+
+def open_connection(path, alias='bench'):
+    wrapper = DatabaseWrapper({**connection.settings_dict, 'NAME': str(path)}, alias)
+    wrapper.ensure_connection()
+    return wrapper
+
+
+def pragma(wrapper, name):
+    with wrapper.cursor() as cursor:
+        cursor.execute(f'PRAGMA {name}')
+        return cursor.fetchone()[0]
+
+
+@pytest.mark.django_db
+class TestSQLiteTuning:
+    """Test PRAGMAs and the transaction mode applied on connection_created"""
+
+    def test_pragmas_applied_to_new_connections(self, settings, tmp_path):
+        """Test every configured PRAGMA is in effect"""
+        settings.TASKS_SQLITE_PRAGMAS = PRODUCTION_PRAGMAS
+        wrapper = open_connection(tmp_path / 'tuned.sqlite3')
+
+        assert pragma(wrapper, 'journal_mode') == 'wal'
+        assert pragma(wrapper, 'synchronous') == 1
+        assert pragma(wrapper, 'busy_timeout') == 5000
+        assert pragma(wrapper, 'cache_size') == -65536
+        wrapper.close()
+
+    def test_defaults_leave_sqlite_alone(self, settings, tmp_path):
+        """Test no PRAGMA is changed without a profile"""
+        settings.TASKS_SQLITE_PRAGMAS = {}
+        wrapper = open_connection(tmp_path / 'plain.sqlite3')
+
+        assert pragma(wrapper, 'journal_mode') == 'delete'
+        wrapper.close()
+
+    @pytest.mark.parametrize('mode, blocks_writers', [('IMMEDIATE', True), (None, False)])
+    def test_transaction_mode(self, settings, tmp_path, mode, blocks_writers):
+        """Test IMMEDIATE transactions take the write lock at BEGIN"""
+        settings.TASKS_SQLITE_PRAGMAS = {'journal_mode': 'WAL', 'busy_timeout': 0}
+        settings.TASKS_SQLITE_TRANSACTION_MODE = mode
+        path = tmp_path / 'locks.sqlite3'
+        first, second = open_connection(path, 'first'), open_connection(path, 'second')
+        with second.cursor() as cursor:
+            cursor.execute('CREATE TABLE item (id INTEGER PRIMARY KEY)')
+
+        # What atomic() does on entry.
+        first.set_autocommit(False, force_begin_transaction_with_broken_autocommit=True)
+        try:
+            with second.cursor() as cursor:
+                if blocks_writers:
+                    with pytest.raises(OperationalError, match='locked'):
+                        cursor.execute('INSERT INTO item DEFAULT VALUES')
+                else:
+                    cursor.execute('INSERT INTO item DEFAULT VALUES')
+        finally:
+            first.rollback()
+            first.set_autocommit(True)
+            first.close()
+            second.close()
+
+    def test_unknown_transaction_mode(self, settings, tmp_path):
+        """Test a misspelled transaction mode is reported"""
+        settings.TASKS_SQLITE_TRANSACTION_MODE = 'IMMEDIATELY'
+
+        with pytest.raises(ValueError):
+            open_connection(tmp_path / 'invalid.sqlite3')
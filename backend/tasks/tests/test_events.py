@@ -0,0 +1,199 @@
+"""
+Tests for the Server-Sent Events stream
+"""
+import asyncio
+import json
+
+import pytest
+from asgiref.sync import async_to_sync, sync_to_async
+from asgiref.testing import ApplicationCommunicator
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from task_manager.asgi import application
+from tasks.events import Event, Subscription, broker
+from tasks.models import Task
+
+EVENTS_SCOPE = {
+    'type': 'http',
+    'asgi': {'version': '3.0'},
+    'http_version': '1.1',
+    'method': 'GET',
+    'scheme': 'http',
+    'path': '/api/tasks/events/',
+    'raw_path': b'/api/tasks/events/',
+    'query_string': b'',
+    'headers': [(b'host', b'localhost'), (b'accept', b'text/event-stream')],
+    'client': ('127.0.0.1', 50000),
+    'server': ('localhost', 80),
+}
+
+
+async def connect():
+    communicator = ApplicationCommunicator(application, dict(EVENTS_SCOPE))
+    await communicator.send_input({'type': 'http.request', 'body': b'', 'more_body': False})
+    start = await communicator.receive_output(timeout=5)
+    return communicator, start
+
+
+async def next_event(communicator):
+    """Return the next ``(name, data)``, skipping the retry and heartbeat lines."""
+    while True:
+        message = await communicator.receive_output(timeout=5)
+        body = message['body'].decode('utf-8')
+        if body.startswith('event: '):
+            name_line, data_line = body.strip().split('\n')
+            return name_line[len('event: '):], json.loads(data_line[len('data: '):])
+
+
+async def disconnect(communicator):
+    await communicator.send_input({'type': 'http.disconnect'})
+    while True:
+        message = await communicator.receive_output(timeout=5)
+        if message['type'] == 'http.response.body' and not message.get('more_body'):
+            break
+    await communicator.wait(timeout=5)
+
+
+@pytest.mark.django_db(transaction=True)
+class TestTaskEventStream:
+    """Test GET /api/tasks/events/ through the ASGI application"""
+
+    @pytest.fixture(autouse=True)
+    def slow_summary(self, settings):
+        settings.TASKS_EVENTS_SUMMARY_SECONDS = 60
+
+    def test_stream_headers_and_initial_summary(self):
+        """Test the stream opens with a full summary"""
+        Task.objects.create(title="Existing task")
+
+        async def scenario():
+            communicator, start = await connect()
+            name, data = await next_event(communicator)
+            await disconnect(communicator)
+            return start, name, data
+
+        start, name, data = async_to_sync(scenario)()
+
+        assert start['status'] == 200
+        assert (b'Content-Type', b'text/event-stream') in start['headers']
+        assert (b'Cache-Control', b'no-cache') in start['headers']
+        assert name == 'summary'
+        assert data['total_tasks'] == 1
+        assert data['todo_count'] == 1
+
+    def test_task_writes_are_pushed(self):
+        """Test create, update, status and delete events"""
+        async def scenario():
+            communicator, _ = await connect()
+            received = [await next_event(communicator)]
+            task = await sync_to_async(Task.objects.create)(title="Pushed task")
+            task_id = str(task.pk)
+            received.append(await next_event(communicator))
+            task.priority = 5
+            await sync_to_async(task.save)()
+            received.append(await next_event(communicator))
+            task.status = 'done'
+            await sync_to_async(task.save)(update_fields=['status', 'updated_at'])
+            received.append(await next_event(communicator))
+            await sync_to_async(task.delete)()
+            received.append(await next_event(communicator))
+            await disconnect(communicator)
+            return task_id, received
+
+        task_id, received = async_to_sync(scenario)()
+
+        names = [name for name, _ in received]
+        assert names == ['summary', 'create', 'update', 'status', 'delete']
+        assert received[1][1]['tasks'][0]['title'] == 'Pushed task'
+        assert received[2][1]['tasks'][0]['priority'] == 5
+        assert received[3][1] == {'ids': [task_id], 'status': 'done'}
+        assert received[4][1] == {'ids': [task_id]}
+
+    def test_filtered_transition_names_changed_tasks(self):
+        """Test transitions by filter report the tasks they changed"""
+        task = Task.objects.create(title="Transitioned task")
+        Task.objects.create(title="Finished task", status='done')
+
+        async def scenario():
+            communicator, _ = await connect()
+            await next_event(communicator)
+            await sync_to_async(APIClient().post)(
+                '/api/tasks/transition/?status=todo', {'status': 'done'}, format='json'
+            )
+            event = await next_event(communicator)
+            await disconnect(communicator)
+            return event
+
+        assert async_to_sync(scenario)() == ('status', {'ids': [str(task.pk)], 'status': 'done'})
+
+    def test_large_writes_ask_for_resync(self, settings):
+        """Test writes touching more than TASKS_EVENTS_MAX_TASKS send resync"""
+        settings.TASKS_EVENTS_MAX_TASKS = 1
+        Task.objects.create(title="First task")
+        Task.objects.create(title="Second task")
+
+        async def scenario():
+            communicator, _ = await connect()
+            await next_event(communicator)
+            await sync_to_async(APIClient().post)(
+                '/api/tasks/transition/?status=todo', {'status': 'done'}, format='json'
+            )
+            event = await next_event(communicator)
+            await disconnect(communicator)
+            return event
+
+        assert async_to_sync(scenario)() == ('resync', {'reason': 'update'})
+
+    def test_summary_deltas(self, settings):
+        """Test the summary pump only sends counts that changed"""
+        settings.TASKS_EVENTS_SUMMARY_SECONDS = 0.05
+
+        async def scenario():
+            communicator, _ = await connect()
+            await next_event(communicator)
+            await sync_to_async(Task.objects.create)(title="Counted task", priority=5)
+            while True:
+                name, data = await next_event(communicator)
+                if name == 'summary':
+                    break
+            await disconnect(communicator)
+            return data
+
+        assert async_to_sync(scenario)() == {
+            'total_tasks': 1, 'todo_count': 1, 'high_priority_count': 1
+        }
+
+    def test_disconnect_unsubscribes(self):
+        """Test a client that goes away stops receiving events"""
+        async def scenario():
+            communicator, _ = await connect()
+            await next_event(communicator)
+            subscribed = broker.has_subscribers()
+            await disconnect(communicator)
+            return subscribed
+
+        assert async_to_sync(scenario)() is True
+        assert not broker.has_subscribers()
+
+    def test_not_served_over_wsgi(self):
+        """Test the stream is refused outside the ASGI entry point"""
+        response = APIClient().get('/api/tasks/events/')
+
+        assert response.status_code == status.HTTP_501_NOT_IMPLEMENTED
+
+
+class TestSubscription:
+    """Test the per-client event queue"""
+
+    def test_overflow_is_replaced_by_resync(self):
+        """Test a slow client gets one resync event instead of a backlog"""
+        async def scenario():
+            subscription = Subscription(asyncio.get_running_loop(), max_size=2)
+            for index in range(3):
+                subscription.put(Event('update', {'index': index}))
+            first = await subscription.get(timeout=1)
+            subscription.close()
+            return first, await subscription.get(timeout=1)
+
+        assert asyncio.run(scenario()) == (Event('resync', {'reason': 'overflow'}), None)
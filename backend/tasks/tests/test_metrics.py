@@ -0,0 +1,151 @@
+"""
+Tests for the request metrics middleware and endpoint
+"""
+import logging
+import re
+
+import pytest
+from rest_framework import status
+
+from tasks.metrics import Histogram, Recording, registry
+from tasks.models import Task
+
+
+@pytest.fixture(autouse=True)
+def empty_registry():
+    registry.clear()
+    yield
+    registry.clear()
+
+
+def scrape(api_client):
+    response = api_client.get('/api/metrics/')
+    assert response.status_code == status.HTTP_200_OK
+    assert response['Content-Type'].startswith('text/plain; version=0.0.4')
+    samples = {}
+    for line in response.content.decode().splitlines():
+        if not line.startswith('#'):
+            name, value = line.rsplit(' ', 1)
+            samples[name] = float(value)
+    return samples
+
+
+@pytest.mark.django_db
+class TestMetrics:
+    """Test GET /api/metrics/ after requests to the task API"""
+
+    def test_records_each_action(self, api_client):
+        """Test latency, SQL, serializer time and bytes per action"""
+        task = Task.objects.create(title="Measured task")
+        sizes = [len(api_client.get('/api/tasks/').content) for _ in range(3)]
+        api_client.get(f'/api/tasks/{task.id}/')
+        api_client.post(f'/api/tasks/{task.id}/mark_done/')
+
+        samples = scrape(api_client)
+
+        assert samples['tasks_request_duration_seconds_count{endpoint="list"}'] == 3
+        assert samples['tasks_request_duration_seconds_bucket{endpoint="list",le="+Inf"}'] == 3
+        assert samples['tasks_request_duration_seconds_count{endpoint="retrieve"}'] == 1
+        assert samples['tasks_request_duration_seconds_count{endpoint="mark_done"}'] == 1
+        assert samples['tasks_response_bytes_total{endpoint="list"}'] == sum(sizes)
+        # The first list is a response cache miss; the other two are hits.
+        assert samples['tasks_sql_queries_total{endpoint="list"}'] >= 2
+        assert samples['tasks_sql_duration_seconds_total{endpoint="list"}'] > 0
+        assert samples['tasks_serializer_duration_seconds_total{endpoint="list"}'] > 0
+        assert samples['tasks_serializer_duration_seconds_total{endpoint="mark_done"}'] > 0
+        for quantile in ('0.5', '0.95', '0.99'):
+            key = f'tasks_request_duration_quantile_seconds{{endpoint="list",quantile="{quantile}"}}'
+            assert samples[key] > 0
+
+    def test_other_views_use_url_names(self, api_client):
+        """Test views outside TaskViewSet are labelled by URL name"""
+        api_client.get('/api/async/tasks/')
+        api_client.get('/api/no-such-endpoint/')
+
+        samples = scrape(api_client)
+
+        assert samples['tasks_request_duration_seconds_count{endpoint="async-task-list"}'] == 1
+        assert samples['tasks_request_duration_seconds_count{endpoint="unmatched"}'] == 1
+
+    def test_streamed_bytes_are_counted(self, api_client):
+        """Test an export counts the bytes it streamed"""
+        Task.objects.create(title="Exported task")
+        response = api_client.get('/api/tasks/export/')
+        size = len(b''.join(response.streaming_content))
+
+        samples = scrape(api_client)
+
+        assert samples['tasks_response_bytes_total{endpoint="export"}'] == size
+
+    def test_slow_request_log(self, api_client, settings, caplog):
+        """Test slow requests are logged with their SQL"""
+        settings.TASKS_SLOW_REQUEST_SECONDS = 0
+        Task.objects.create(title="Slow task")
+
+        with caplog.at_level(logging.WARNING, logger='tasks.metrics'):
+            api_client.get('/api/tasks/summary/')
+
+        message = caplog.records[0].getMessage()
+        assert message.startswith('Slow request: GET /api/tasks/summary/')
+        assert re.search(r'\] SELECT .*COUNT', message)
+        assert scrape(api_client)['tasks_slow_requests_total{endpoint="summary"}'] == 1
+
+    def test_slow_request_log_truncates_sql(self, api_client, settings, caplog):
+        """Test logged statements are cut to TASKS_SLOW_REQUEST_SQL_LENGTH"""
+        settings.TASKS_SLOW_REQUEST_SECONDS = 0
+        settings.TASKS_SLOW_REQUEST_SQL_LENGTH = 10
+
+        with caplog.at_level(logging.WARNING, logger='tasks.metrics'):
+            api_client.get('/api/tasks/summary/')
+
+        statements = caplog.records[0].getMessage().splitlines()[1:]
+        assert statements
+        assert all(re.fullmatch(r'  \[[\d.]+ ms\] .{1,10}(\.\.\.)?', line) for line in statements)
+
+    def test_endpoint_without_requests_renders(self, api_client):
+        """Test streamed bytes counted after a clear do not break the quantiles"""
+        registry.add_bytes('export', 10)
+
+        samples = scrape(api_client)
+
+        assert samples['tasks_response_bytes_total{endpoint="export"}'] == 10
+        assert not any('endpoint="export",quantile' in name for name in samples)
+
+
+class TestHistogram:
+    """Test quantile estimates from histogram buckets"""
+
+    def test_quantiles_interpolate_within_buckets(self):
+        """Test quantiles fall inside the bucket holding that rank"""
+        histogram = Histogram((0.01, 0.1, 1))
+        for value in [0.005] * 50 + [0.05] * 45 + [0.5] * 5:
+            histogram.observe(value)
+
+        assert 0 < histogram.quantile(0.5) <= 0.01
+        assert 0.01 < histogram.quantile(0.95) <= 0.1
+        assert 0.1 < histogram.quantile(0.99) <= 1
+        assert Histogram((1,)).quantile(0.5) is None
+
+
+class TestRecording:
+    """Test the statements kept for the slow request log"""
+
+    def test_keeps_slowest_statements_in_order(self, settings):
+        """Test only the TASKS_SLOW_REQUEST_STATEMENTS slowest are kept"""
+        settings.TASKS_SLOW_REQUEST_STATEMENTS = 2
+        recording = Recording()
+        for sql, seconds in [('a', 0.1), ('b', 0.5), ('c', 0.2), ('d', 0.4), ('e', 0.3)]:
+            recording.add_query(sql, seconds)
+
+        assert recording.queries == 5
+        assert recording.sql_seconds == pytest.approx(1.5)
+        assert recording.slowest_statements() == [('b', 0.5), ('d', 0.4)]
+
+    def test_no_statements_kept(self, settings):
+        """Test a zero limit keeps counting without keeping SQL"""
+        settings.TASKS_SLOW_REQUEST_STATEMENTS = 0
+        recording = Recording()
+        recording.add_query('a', 0.1)
+
+        assert recording.queries == 1
+        assert recording.slowest_statements() == []
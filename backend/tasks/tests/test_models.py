@@ -1,3 +1,6 @@
+import uuid
+from unittest import mock
+
 import pytest
 from django.utils import timezone
 from datetime import timedelta
@@ -15,4 +18,44 @@ class TestTaskModel:
     def test_task_is_overdue(self):
         past_date = timezone.now() - timedelta(days=1)
         task = Task.objects.create(title="Test", due_date=past_date, status="todo")
-        assert task.is_overdue() is True
\ No newline at end of file
+        assert task.is_overdue() is True
+
+@pytest.mark.django_db
+class TestBulkInsert:
+    def test_fills_defaults_and_timestamps(self):
+        due = timezone.now() + timedelta(days=1)
+        pks = Task.objects.bulk_insert([
+            {'title': 'First'},
+            {'title': 'Second', 'status': 'done', 'priority': 5, 'due_date': due},
+        ])
+        first, second = (Task.objects.get(pk=pk) for pk in pks)
+        assert (first.title, first.status, first.priority, first.description) == ('First', 'todo', 3, '')
+        assert (second.status, second.priority, second.due_date) == ('done', 5, due)
+        assert first.created_at == first.updated_at == second.created_at
+    
+    def test_batches(self, django_assert_num_queries):
+        with django_assert_num_queries(3):
+            pks = Task.objects.bulk_insert([{'title': f'Task {i}'} for i in range(5)], batch_size=2)
+        assert set(Task.objects.values_list('pk', flat=True)) == set(pks)
+
+
+@pytest.mark.django_db
+class TestBulkDelete:
+    def test_returns_deleted_pks(self, django_assert_num_queries):
+        tasks = [Task.objects.create(title=f'Task {i}') for i in range(3)]
+        missing = uuid.uuid4()
+        
+        # SELECT + DELETE per batch
+        with django_assert_num_queries(4):
+            deleted = Task.objects.bulk_delete([tasks[0].pk, missing, tasks[1].pk], batch_size=2)
+        
+        assert set(deleted) == {tasks[0].pk, tasks[1].pk}
+        assert list(Task.objects.values_list('pk', flat=True)) == [tasks[2].pk]
+    
+    def test_sends_no_delete_signals(self):
+        task = Task.objects.create(title='Quiet')
+        
+        with mock.patch('tasks.signals.tasks_changed.send') as send:
+            Task.objects.bulk_delete([task.pk])
+        
+        send.assert_not_called()
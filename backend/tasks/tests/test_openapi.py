@@ -0,0 +1,101 @@
+"""
+Tests for serving the stored OpenAPI document
+"""
+import gzip
+import io
+import json
+import os
+
+import pytest
+from django.core.management import call_command
+from rest_framework import status
+
+from tasks import openapi
+
+
+@pytest.fixture
+def schema_file(settings, tmp_path):
+    settings.TASKS_OPENAPI_FILE = tmp_path / 'openapi.json'
+    openapi.clear_document()
+    yield settings.TASKS_OPENAPI_FILE
+    openapi.clear_document()
+
+
+@pytest.fixture
+def count_generations(monkeypatch):
+    calls = []
+    generate = openapi.generate_schema
+
+    def counted():
+        calls.append(1)
+        return generate()
+
+    monkeypatch.setattr(openapi, 'generate_schema', counted)
+    return calls
+
+
+class TestOpenapiDocument:
+    """Test GET /swagger/?format=openapi and /redoc/?format=openapi"""
+
+    def test_serves_stored_file(self, api_client, schema_file, count_generations):
+        """Test the stored file is served as is, without introspecting views"""
+        schema_file.write_bytes(b'{"swagger": "2.0", "stored": true}')
+
+        for path in ('/swagger/?format=openapi', '/redoc/?format=openapi'):
+            response = api_client.get(path)
+            assert response.status_code == status.HTTP_200_OK
+            assert response['Content-Type'] == 'application/openapi+json'
+            assert response.content == b'{"swagger": "2.0", "stored": true}'
+            assert 'no-cache' in response['Cache-Control']
+        assert count_generations == []
+
+    def test_gzip_and_etag(self, api_client, schema_file):
+        """Test gzip for clients that accept it, with its own ETag, and 304s"""
+        call_command('generate_openapi', stdout=io.StringIO())
+
+        plain = api_client.get('/swagger/?format=openapi')
+        compressed = api_client.get('/swagger/?format=openapi', HTTP_ACCEPT_ENCODING='gzip, deflate, br')
+
+        assert compressed['Content-Encoding'] == 'gzip'
+        assert gzip.decompress(compressed.content) == plain.content
+        assert len(compressed.content) < len(plain.content) / 3
+        assert 'Accept-Encoding' in compressed['Vary']
+        assert plain.has_header('ETag') and compressed.has_header('ETag')
+        assert plain['ETag'] != compressed['ETag']
+
+        cached = api_client.get(
+            '/swagger/?format=openapi', HTTP_ACCEPT_ENCODING='gzip',
+            HTTP_IF_NONE_MATCH=compressed['ETag'],
+        )
+        assert cached.status_code == status.HTTP_304_NOT_MODIFIED
+        assert cached.content == b''
+
+    def test_reloads_changed_file(self, api_client, schema_file):
+        """Test a rewritten file replaces the document in memory"""
+        schema_file.write_bytes(b'{"version": 1}')
+        first = api_client.get('/swagger/?format=openapi')
+        schema_file.write_bytes(b'{"version": 2}')
+        os.utime(schema_file, ns=(0, 10**9))
+
+        second = api_client.get('/swagger/?format=openapi')
+
+        assert json.loads(second.content) == {'version': 2}
+        assert second['ETag'] != first['ETag']
+
+    def test_generates_once_without_file(self, api_client, schema_file, count_generations):
+        """Test a missing file falls back to one generation per process"""
+        responses = [api_client.get('/swagger/?format=openapi') for _ in range(3)]
+
+        assert count_generations == [1]
+        assert not schema_file.exists()
+        document = json.loads(responses[0].content)
+        assert '/tasks/' in document['paths']
+        assert {response['ETag'] for response in responses} == {responses[0]['ETag']}
+
+    def test_ui_pages_still_render(self, api_client, schema_file, count_generations):
+        """Test the Swagger UI and ReDoc pages do not load the document"""
+        for path in ('/swagger/', '/redoc/'):
+            response = api_client.get(path)
+            assert response.status_code == status.HTTP_200_OK
+            assert response['Content-Type'].startswith('text/html')
+        assert count_generations == []
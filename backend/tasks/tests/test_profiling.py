@@ -0,0 +1,173 @@
+"""
+Tests for the per-request profiling middleware
+"""
+import asyncio
+import json
+import os
+import sys
+import time
+
+import pytest
+from django.test import AsyncClient
+from rest_framework import status
+
+from tasks import profiling
+from tasks.models import Task, TaskQuerySet
+
+
+@pytest.fixture
+def profile_dir(settings, tmp_path):
+    settings.TASKS_PROFILE_DIR = tmp_path
+    settings.TASKS_PROFILE_TOKEN = 'secret'
+    settings.TASKS_PROFILE_SAMPLE_RATE = 0.0
+    settings.TASKS_RESPONSE_CACHE = None
+    return tmp_path
+
+
+@pytest.fixture
+def slow_orm(monkeypatch):
+    """Make listing tasks take long enough to be sampled inside the ORM"""
+    iterator = TaskQuerySet._fetch_all
+
+    def _fetch_all(self):
+        time.sleep(0.02)
+        return iterator(self)
+
+    monkeypatch.setattr(TaskQuerySet, '_fetch_all', _fetch_all)
+
+
+def timings(response):
+    return {
+        name: float(duration.removeprefix('dur='))
+        for name, duration in (entry.split(';') for entry in response['Server-Timing'].split(', '))
+    }
+
+
+@pytest.mark.django_db
+class TestProfiling:
+    """Test requests profiled through the X-Tasks-Profile header"""
+
+    def test_profiles_request_with_token(self, api_client, profile_dir, slow_orm):
+        """Test a profiled request writes collapsed stacks and a summary"""
+        Task.objects.create(title="Profiled task")
+
+        response = api_client.get('/api/tasks/', HTTP_X_TASKS_PROFILE='secret')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response['X-Tasks-Profile'] == 'profile-000'
+        phases = timings(response)
+        assert list(phases) == profiling.PHASE_NAMES + ['total']
+        assert phases['orm'] >= 10
+        assert sum(phases.values()) - phases['total'] == pytest.approx(phases['total'], abs=0.01)
+
+        summary = json.loads((profile_dir / 'profile-000.json').read_text())
+        assert summary['method'] == 'GET'
+        assert summary['path'] == '/api/tasks/'
+        assert summary['endpoint'] == 'list'
+        assert summary['status'] == 200
+        assert summary['samples'] > 0
+        assert summary['phases_ms']['orm'] >= 10
+
+        lines = (profile_dir / 'profile-000.folded').read_text().splitlines()
+        assert lines
+        for line in lines:
+            stack, count = line.rsplit(' ', 1)
+            assert stack.startswith('GET list;')
+            assert int(count) > 0
+        assert any('_fetch_all' in line for line in lines)
+
+    def test_ignores_missing_or_wrong_token(self, api_client, profile_dir):
+        """Test requests without the right token are not profiled"""
+        for headers in ({}, {'HTTP_X_TASKS_PROFILE': 'guess'}):
+            response = api_client.get('/api/tasks/', **headers)
+            assert response.status_code == status.HTTP_200_OK
+            assert not response.has_header('X-Tasks-Profile')
+            assert not response.has_header('Server-Timing')
+        assert not list(profile_dir.iterdir())
+
+    def test_header_ignored_without_token_setting(self, api_client, profile_dir, settings):
+        """Test the header does nothing when no token is configured"""
+        settings.TASKS_PROFILE_TOKEN = None
+        response = api_client.get('/api/tasks/', HTTP_X_TASKS_PROFILE='')
+        assert not response.has_header('X-Tasks-Profile')
+
+    def test_sample_rate(self, api_client, profile_dir, settings):
+        """Test a sample rate of 1 profiles requests without the header"""
+        settings.TASKS_PROFILE_SAMPLE_RATE = 1.0
+        response = api_client.get('/api/tasks/summary/')
+        assert response['X-Tasks-Profile'] == 'profile-000'
+        assert json.loads((profile_dir / 'profile-000.json').read_text())['endpoint'] == 'summary'
+
+    def test_ring_buffer(self, api_client, profile_dir, settings):
+        """Test only the newest TASKS_PROFILE_KEEP profiles are kept"""
+        settings.TASKS_PROFILE_KEEP = 2
+        names = []
+        for path in ('/api/tasks/', '/api/tasks/summary/', '/api/tasks/?status=done'):
+            names.append(api_client.get(path, HTTP_X_TASKS_PROFILE='secret')['X-Tasks-Profile'])
+            time.sleep(0.01)
+
+        assert names == ['profile-000', 'profile-001', 'profile-000']
+        assert sorted(path.name for path in profile_dir.iterdir()) == [
+            'profile-000.folded', 'profile-000.json', 'profile-001.folded', 'profile-001.json',
+        ]
+        paths = {
+            json.loads((profile_dir / f'{name}.json').read_text())['path'] for name in names[1:]
+        }
+        assert paths == {'/api/tasks/summary/', '/api/tasks/?status=done'}
+
+    def test_profiles_asgi_request(self, profile_dir, slow_orm):
+        """Test a request through the ASGI handler is sampled in its sync view"""
+        response = asyncio.run(
+            AsyncClient().get('/api/tasks/', headers={'X-Tasks-Profile': 'secret'})
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response['X-Tasks-Profile'] == 'profile-000'
+        assert timings(response)['orm'] >= 10
+
+    def test_restores_switch_interval(self, api_client, profile_dir):
+        """Test the interpreter switch interval is restored afterwards"""
+        before = sys.getswitchinterval()
+        api_client.get('/api/tasks/', HTTP_X_TASKS_PROFILE='secret')
+        assert sys.getswitchinterval() == before
+
+    def test_switch_interval_can_be_left_alone(self, api_client, profile_dir, settings, monkeypatch):
+        """Test TASKS_PROFILE_SHORTEN_SWITCH_INTERVAL = False never changes it"""
+        settings.TASKS_PROFILE_SHORTEN_SWITCH_INTERVAL = False
+        calls = []
+        monkeypatch.setattr(profiling.sys, 'setswitchinterval', calls.append)
+
+        response = api_client.get('/api/tasks/', HTTP_X_TASKS_PROFILE='secret')
+
+        assert response['X-Tasks-Profile'] == 'profile-000'
+        assert calls == []
+
+
+class TestProfilingHelpers:
+    """Test phase classification and ring buffer slots"""
+
+    def test_innermost_phase_wins(self):
+        """Test the innermost frame with a phase decides"""
+        stack = [
+            '/usr/lib/python3/json/encoder.py',
+            '/site-packages/rest_framework/renderers.py',
+            '/site-packages/django/db/models/query.py',
+            '/app/tasks/views.py',
+        ]
+        assert profiling.classify(stack) == 'renderer'
+        assert profiling.classify(stack[2:]) == 'orm'
+        assert profiling.classify(stack[3:]) == 'view'
+
+    def test_everything_else_is_middleware(self):
+        """Test frames outside all phases count as middleware"""
+        assert profiling.classify(['/site-packages/corsheaders/middleware.py']) == 'middleware'
+        assert profiling.classify([]) == 'middleware'
+
+    def test_next_slot(self, tmp_path):
+        """Test free slots are used first, then the oldest"""
+        assert profiling.next_slot(tmp_path, 3) == 0
+        for slot, mtime in ((0, 30), (1, 10), (2, 20)):
+            path = tmp_path / f'profile-{slot:03d}.json'
+            path.write_text('{}')
+            os.utime(path, (mtime, mtime))
+        assert profiling.next_slot(tmp_path, 3) == 1
+        assert profiling.next_slot(tmp_path, 4) == 3
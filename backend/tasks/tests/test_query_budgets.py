@@ -0,0 +1,235 @@
+"""
+Query budgets for every task endpoint.
+
+Each request runs against a handful of tasks with a cold response cache and
+may issue at most the declared number of SQL queries (see query_budget.py).
+A budget that no longer holds usually means an N+1: a query per task.
+
+Cold reads of the list and of a task first look up the due dates on either
+side of now, which decide the overdue part of their validators.
+"""
+import itertools
+
+import pytest
+from django.utils import timezone
+from datetime import timedelta
+from rest_framework import status
+
+from tasks.models import Task
+from tasks.views import TaskViewSet
+
+from .cases import FILTERS
+from .query_budget import describe_overrun, normalize
+
+ORDERINGS = [None] + [
+    f'{prefix}{field}'
+    for field, prefix in itertools.product(TaskViewSet.ordering_fields, ('', '-'))
+]
+
+LIST_CASES = [
+    {**filters, **({'ordering': ordering} if ordering else {})}
+    for filters, ordering in itertools.product(FILTERS, ORDERINGS)
+]
+
+
+def case_id(params):
+    return '&'.join(f'{key}={value}' for key, value in params.items()) or 'default'
+
+
+@pytest.fixture
+def tasks(db):
+    """Tasks in every status, some overdue, so per-task queries would show"""
+    now = timezone.now()
+    return [
+        Task.objects.create(
+            title=f"Budget report {index}",
+            description="Quarterly numbers",
+            status=('todo', 'in_progress', 'done')[index % 3],
+            priority=index % 5 + 1,
+            due_date=now + timedelta(days=index - 4),
+        )
+        for index in range(8)
+    ]
+
+
+@pytest.mark.django_db
+class TestReadBudgets:
+    """Test the queries run by the read endpoints"""
+
+    @pytest.mark.parametrize('params', LIST_CASES, ids=[case_id(case) for case in LIST_CASES])
+    def test_list(self, api_client, tasks, query_budget, params):
+        """Test a page of tasks costs a count and a select"""
+        with query_budget(4):
+            response = api_client.get('/api/tasks/', params)
+
+        assert response.status_code == status.HTTP_200_OK
+
+    @pytest.mark.parametrize('params', [
+        {'search': 'report'},
+        {'search': 'report', 'ordering': '-priority'},
+        {'search': 'quarterly', 'status': 'todo'},
+    ], ids=case_id)
+    def test_search(self, api_client, tasks, query_budget, params):
+        """Test full-text search does not add queries"""
+        with query_budget(4):
+            response = api_client.get('/api/tasks/', params)
+
+        assert response.status_code == status.HTTP_200_OK
+
+    @pytest.mark.parametrize('params', [
+        {'pagination': 'cursor'},
+        {'pagination': 'cursor', 'ordering': 'due_date', 'status': 'todo'},
+    ], ids=case_id)
+    def test_cursor_list(self, api_client, tasks, query_budget, params):
+        """Test keyset pages skip the count"""
+        with query_budget(3):
+            response = api_client.get('/api/tasks/', params)
+
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_retrieve(self, api_client, tasks, query_budget):
+        """Test a single task is one select"""
+        with query_budget(3):
+            response = api_client.get(f'/api/tasks/{tasks[0].id}/')
+
+        assert response.status_code == status.HTTP_200_OK
+
+    @pytest.mark.parametrize('params', [{}, {'status': 'todo'}, {'search': 'report'}], ids=case_id)
+    def test_summary(self, api_client, tasks, query_budget, params):
+        """Test the summary is one aggregate query"""
+        with query_budget(1):
+            response = api_client.get('/api/tasks/summary/', params)
+
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_export(self, api_client, tasks, query_budget):
+        """Test an export streams from one query"""
+        with query_budget(1):
+            response = api_client.get('/api/tasks/export/')
+            b''.join(response.streaming_content)
+
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_changes(self, api_client, tasks, query_budget, settings):
+        """Test the change feed finds its position, then reads tasks and tombstones"""
+        settings.TASKS_CHANGES_SETTLE_SECONDS = 0
+        tasks[0].delete()
+
+        with query_budget(4):
+            response = api_client.get('/api/tasks/changes/')
+
+        assert response.status_code == status.HTTP_200_OK
+
+
+@pytest.mark.django_db
+class TestWriteBudgets:
+    """Test the queries run by the write endpoints"""
+
+    def test_create(self, api_client, query_budget):
+        """Test creating a task is one insert"""
+        with query_budget(1):
+            response = api_client.post('/api/tasks/', {'title': 'New task'}, format='json')
+
+        assert response.status_code == status.HTTP_201_CREATED
+
+    def test_update(self, api_client, tasks, query_budget):
+        """Test a full update selects then updates"""
+        data = {'title': 'Replaced task', 'status': 'done', 'priority': 2}
+        with query_budget(2):
+            response = api_client.put(f'/api/tasks/{tasks[0].id}/', data, format='json')
+
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_partial_update(self, api_client, tasks, query_budget):
+        """Test a partial update selects then updates"""
+        with query_budget(2):
+            response = api_client.patch(f'/api/tasks/{tasks[0].id}/', {'priority': 5}, format='json')
+
+        assert response.status_code == status.HTTP_200_OK
+
+    @pytest.mark.parametrize('action', ['mark_done', 'mark_in_progress'])
+    def test_set_status(self, api_client, tasks, query_budget, action):
+        """Test a status action selects then updates"""
+        with query_budget(2):
+            response = api_client.post(f'/api/tasks/{tasks[0].id}/{action}/')
+
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_destroy(self, api_client, tasks, query_budget):
+        """Test deleting a task selects, deletes and writes its tombstone"""
+        with query_budget(3):
+            response = api_client.delete(f'/api/tasks/{tasks[0].id}/')
+
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_transition_by_ids(self, api_client, tasks, query_budget):
+        """Test a transition by ids locks the changing tasks, then updates them"""
+        data = {'status': 'done', 'ids': [str(task.id) for task in tasks]}
+        with query_budget(4):
+            response = api_client.post('/api/tasks/transition/', data, format='json')
+
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_transition_by_filter(self, api_client, tasks, query_budget):
+        """Test a transition by filter locks the matching tasks, then updates them"""
+        with query_budget(4):
+            response = api_client.post(
+                '/api/tasks/transition/?search=report&priority_min=3', {'status': 'done'}, format='json'
+            )
+
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_bulk_create(self, api_client, query_budget, settings):
+        """Test a bulk create is one insert per chunk"""
+        settings.TASKS_BULK_CHUNK_SIZE = 10
+        data = [{'title': f'Bulk task {index}'} for index in range(20)]
+        with query_budget(4):
+            response = api_client.post('/api/tasks/bulk/', data, format='json')
+
+        assert response.status_code == status.HTTP_201_CREATED
+
+    def test_bulk_update(self, api_client, tasks, query_budget):
+        """Test a bulk update does not query per item"""
+        data = [{'id': str(task.id), 'status': 'done'} for task in tasks[:5]] + [
+            {'id': str(task.id), 'title': f'Renamed task {index}'} for index, task in enumerate(tasks[5:])
+        ]
+        with query_budget(5):
+            response = api_client.patch('/api/tasks/bulk/', data, format='json')
+
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_bulk_delete(self, api_client, tasks, query_budget):
+        """Test a bulk delete writes all tombstones in one insert"""
+        data = [str(task.id) for task in tasks]
+        with query_budget(5):
+            response = api_client.delete('/api/tasks/bulk/', data, format='json')
+
+        assert response.status_code == status.HTTP_200_OK
+
+
+class TestQueryBudgetReport:
+    """Test the report printed when a budget is exceeded"""
+
+    def test_values_are_normalized(self):
+        """Test literals, ids and IN lists do not show up as changes"""
+        sql = (
+            'SELECT "tasks_task"."id" FROM "tasks_task" WHERE ("tasks_task"."title" = \'It\'\'s\' '
+            'AND "tasks_task"."id" IN (\'0b4c5a9ed7f04e0c8a2f3d9e1b6c7a80\', 42)) LIMIT 21'
+        )
+
+        assert normalize(sql) == (
+            'SELECT "tasks_task"."id" FROM "tasks_task" WHERE ("tasks_task"."title" = ? '
+            'AND "tasks_task"."id" IN (...)) LIMIT ?'
+        )
+
+    def test_overrun_diffs_against_baseline(self):
+        """Test added queries are marked and repeated ones called out"""
+        baseline = ['SELECT COUNT(*) FROM "tasks_task"', 'SELECT * FROM "tasks_task" LIMIT ?']
+        executed = baseline + ['SELECT * FROM "tasks_tag" WHERE "task_id" = ?'] * 3
+
+        report = describe_overrun('test_list', 2, executed, baseline).splitlines()
+
+        assert report[0] == 'test_list ran 5 queries, over its budget of 2.'
+        assert report[1] == 'Repeated 3 times (N+1?): SELECT * FROM "tasks_tag" WHERE "task_id" = ?'
+        assert ' SELECT COUNT(*) FROM "tasks_task"' in report
+        assert report.count('+SELECT * FROM "tasks_tag" WHERE "task_id" = ?') == 3
@@ -0,0 +1,184 @@
+"""
+Query-plan regression tests for the task list.
+
+SQLite plans depend on table statistics. The module loads generated tasks
+(``benchmarks.data``), runs ANALYZE and scales the statistics it records to a
+1M-row table (see ``scale_statistics``) before EXPLAINing anything; the data
+is rolled back afterwards. For every TaskFilter / ordering combination both
+queries of a list page, the page itself and its COUNT(*), must find their
+rows through an index. Any SCAN of ``tasks_task``, even in index order,
+fails unless the plan is listed in ``ACCEPTED_SCANS``.
+"""
+import itertools
+import re
+
+import pytest
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from benchmarks.data import generate_tasks, insert_tasks
+from tasks import changes
+from tasks.models import Task
+from tasks.views import TaskViewSet
+
+from .cases import FILTERS
+
+# Generated rows, enough for ANALYZE to see the generator's value mix, and
+# the table size the statistics are scaled to.
+GENERATED_ROWS = 20_000
+ROWS = 1_000_000
+
+# Plans allowed to SCAN tasks_task, keyed by (filters as a query string,
+# ordering field or None for any ordering, query), with the reasons.
+ACCEPTED_SCANS = {
+    # Nothing to search for: the page reads the ordering index and stops
+    # after a page, and COUNT(*) visits every row anyway.
+    ('', None, 'page'): r'SCAN tasks_task USING INDEX \w+',
+    ('', None, 'count'): r'SCAN tasks_task USING COVERING INDEX \w+',
+    # Done, undated or not yet due tasks are most of the table; reading it in
+    # page order fills a page after a few rows, and no index narrows the count.
+    ('overdue=false', None, 'page'): r'SCAN tasks_task USING INDEX \w+',
+    ('overdue=false', None, 'count'): r'SCAN tasks_task( USING COVERING INDEX \w+)?',
+    # A third of the tasks per status: scanning updated_at order finds a
+    # page within a few dozen rows. The count searches the status index.
+    ('status=todo', 'updated_at', 'page'): r'SCAN tasks_task USING INDEX task_updated_idx',
+    # Two of five priorities, about a third of the tasks. No index gives a
+    # priority range in created_at or due_date order; scanning that order
+    # fills a page within a few dozen rows. The count searches the range.
+    ('priority_min=4', 'created_at', 'page'): r'SCAN tasks_task USING INDEX task_created_idx',
+    ('priority_min=4', 'due_date', 'page'): r'SCAN tasks_task USING INDEX task_due_idx',
+    ('priority_max=2', 'created_at', 'page'): r'SCAN tasks_task USING INDEX task_created_idx',
+    ('priority_max=2', 'due_date', 'page'): r'SCAN tasks_task USING INDEX task_due_idx',
+}
+
+# ``overdue`` is computed against the request time, so no index can hold it;
+# it orders whatever the filters select (typically ``overdue=true``).
+UNINDEXED_ORDERINGS = {'overdue'}
+
+ORDERINGS = [None] + [
+    f'{prefix}{field}'
+    for field, prefix in itertools.product(TaskViewSet.ordering_fields, ('', '-'))
+    if field not in UNINDEXED_ORDERINGS
+]
+
+TABLE_SCAN = re.compile(r'\bSCAN tasks_task\b')
+
+
+@pytest.fixture(scope='module')
+def analyzed_tasks(django_db_setup, django_db_blocker):
+    if connection.vendor != 'sqlite':
+        pytest.skip('query plan assertions are written for SQLite')
+    with django_db_blocker.unblock():
+        with transaction.atomic():
+            insert_tasks(generate_tasks(GENERATED_ROWS), connection)
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE')
+            scale_statistics(ROWS / GENERATED_ROWS)
+            yield
+            transaction.set_rollback(True)
+        with connection.cursor() as cursor:
+            # Drop the statistics of the rolled back rows from the schema cache.
+            cursor.execute('ANALYZE sqlite_schema')
+
+
+def scale_statistics(factor):
+    """
+    Scale the task table's ``sqlite_stat1`` rows as ANALYZE would record them
+    for a table ``factor`` times larger: the row count and the rows per key of
+    low-cardinality prefixes (status, priority) grow, while near-unique keys
+    keep one or two rows each.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT idx, stat FROM sqlite_stat1 WHERE tbl = 'tasks_task'")
+        for index, stat in cursor.fetchall():
+            numbers = [int(number) for number in stat.split()]
+            scaled = [round(numbers[0] * factor)] + [
+                round(number * factor) if number > 2 else number for number in numbers[1:]
+            ]
+            cursor.execute(
+                "UPDATE sqlite_stat1 SET stat = %s WHERE tbl = 'tasks_task' AND idx IS %s",
+                [' '.join(map(str, scaled)), index],
+            )
+        cursor.execute('ANALYZE sqlite_schema')
+
+
+@pytest.fixture
+def tasks_db(analyzed_tasks, db):
+    """The test database with the analyzed tasks loaded."""
+
+
+def list_queryset(params):
+    request = Request(APIRequestFactory().get('/api/tasks/', params))
+    view = TaskViewSet(request=request, format_kwarg=None, action='list', kwargs={})
+    return view.filter_queryset(view.get_queryset())
+
+
+def explain(sql):
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+        return '\n'.join(row[-1] for row in cursor.fetchall())
+
+
+def page_plans(params):
+    """Return the plans of a list page's query and of its COUNT(*)."""
+    queryset = list_queryset(params)
+    with CaptureQueriesContext(connection) as captured:
+        list(queryset[:8])
+        queryset.count()
+    page, count = captured
+    return {'page': explain(page['sql']), 'count': explain(count['sql'])}
+
+
+def accepted_scan(filters, ordering, query):
+    key = '&'.join(f'{name}={value}' for name, value in sorted(filters.items()))
+    field = (ordering or TaskViewSet.ordering[0]).lstrip('-')
+    return ACCEPTED_SCANS.get((key, field, query)) or ACCEPTED_SCANS.get((key, None, query))
+
+
+@pytest.mark.parametrize('ordering', ORDERINGS, ids=lambda value: value or 'default')
+@pytest.mark.parametrize(
+    'filters', FILTERS, ids=lambda value: '&'.join(value) or 'unfiltered'
+)
+def test_list_query_uses_index(tasks_db, filters, ordering):
+    params = dict(filters)
+    if ordering:
+        params['ordering'] = ordering
+
+    for query, plan in page_plans(params).items():
+        accepted = accepted_scan(filters, ordering, query)
+        for line in plan.splitlines():
+            if TABLE_SCAN.search(line) and not (accepted and re.fullmatch(accepted, line)):
+                pytest.fail(f'{query} query scans tasks_task for {params}:\n{plan}')
+
+
+def test_overdue_lookup_uses_partial_index(tasks_db):
+    queryset = Task.objects.filter(due_date__lt=timezone.now()).exclude(status='done')
+    plan = queryset.order_by().explain()
+
+    assert 'task_open_due_idx' in plan, plan
+
+
+@pytest.mark.parametrize('ordering', ['due_date', '-overdue'])
+def test_overdue_filter_uses_partial_index(tasks_db, ordering):
+    plan = list_queryset({'overdue': 'true', 'ordering': ordering})[:8].explain()
+
+    assert 'task_open_due_idx' in plan, plan
+
+
+def test_change_feed_uses_keyset_index(tasks_db, settings):
+    settings.TASKS_CHANGES_SETTLE_SECONDS = 0
+    Task.objects.create(title='Feed position')
+    cursor = changes.latest_cursor(timezone.now())
+
+    with CaptureQueriesContext(connection) as captured:
+        changes.get_changes(cursor, 100, timezone.now())
+    sql = next(query['sql'] for query in captured if 'FROM "tasks_task"' in query['sql'])
+    with connection.cursor() as db:
+        db.execute(f'EXPLAIN QUERY PLAN {sql}')
+        plan = '\n'.join(str(row) for row in db.fetchall())
+
+    assert 'task_updated_idx' in plan, plan
+    assert 'TEMP B-TREE' not in plan, plan
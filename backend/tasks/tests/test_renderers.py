@@ -0,0 +1,91 @@
+"""
+Tests for the columnar JSON and MessagePack task renderers
+"""
+import json
+
+import pytest
+from rest_framework import status
+
+from tasks.models import Task
+from tasks.renderers import to_columns, to_table
+
+TABLE = 'application/vnd.tasks.table+json'
+
+
+@pytest.fixture
+def tasks():
+    return [
+        Task.objects.create(title="First task", priority=5),
+        Task.objects.create(title="Second task", status='done', description="Notes"),
+    ]
+
+
+@pytest.mark.django_db
+class TestTableRenderer:
+    """Test the columnar ("table") JSON layout"""
+
+    def test_list_page_as_columns(self, api_client, tasks):
+        """Test a page lists each field once with a column of values"""
+        rows = api_client.get('/api/tasks/').json()
+        response = api_client.get('/api/tasks/', HTTP_ACCEPT=TABLE)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response['Content-Type'] == TABLE
+        table = json.loads(response.content)
+        assert table['count'] == 2
+        assert list(table['results']) == list(rows['results'][0])
+        for field, column in table['results'].items():
+            assert column == [row[field] for row in rows['results']]
+        assert len(response.content) < len(json.dumps(rows).encode())
+
+    def test_format_parameter_and_cursor_pages(self, api_client, tasks):
+        """Test ?format=table, also on keyset pages"""
+        response = api_client.get('/api/tasks/?pagination=cursor&format=table')
+        assert response['Content-Type'] == TABLE
+        table = json.loads(response.content)
+        assert table['results']['title'] == ["Second task", "First task"]
+
+    def test_other_responses_unchanged(self, api_client, tasks):
+        """Test details, summaries and errors render as plain JSON"""
+        detail = api_client.get(f'/api/tasks/{tasks[0].id}/?format=table')
+        assert json.loads(detail.content) == api_client.get(f'/api/tasks/{tasks[0].id}/').json()
+        summary = api_client.get('/api/tasks/summary/?format=table')
+        assert json.loads(summary.content)['total_tasks'] == 2
+        error = api_client.get('/api/tasks/?format=table&priority=high')
+        assert error.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_etag_depends_on_format(self, api_client, tasks):
+        """Test JSON and table responses carry different validators"""
+        assert api_client.get('/api/tasks/')['ETag'] != api_client.get('/api/tasks/?format=table')['ETag']
+
+    def test_to_columns(self):
+        """Test only lists of dicts with the same keys become columns"""
+        assert to_columns([{'a': 1, 'b': 2}, {'a': 3, 'b': 4}]) == {'a': [1, 3], 'b': [2, 4]}
+        assert to_columns([]) == []
+        assert to_columns([{'a': 1}, {'b': 2}]) == [{'a': 1}, {'b': 2}]
+        assert to_columns([{'a': 1}, {'a': 2, 'b': 3}]) == [{'a': 1}, {'a': 2, 'b': 3}]
+        assert to_columns([1, 2]) == [1, 2]
+        assert to_table({'results': [{'a': 1}], 'count': 1}) == {'results': {'a': [1]}, 'count': 1}
+
+
+@pytest.mark.django_db
+class TestMessagePackRenderer:
+    """Test MessagePack responses (needs the optional msgpack package)"""
+
+    @pytest.fixture(autouse=True)
+    def msgpack(self):
+        return pytest.importorskip('msgpack')
+
+    def test_same_document_as_json(self, api_client, tasks, msgpack):
+        """Test list, detail and summary decode to their JSON documents"""
+        for path in ('/api/tasks/', f'/api/tasks/{tasks[0].id}/', '/api/tasks/summary/'):
+            response = api_client.get(path, HTTP_ACCEPT='application/msgpack')
+            assert response.status_code == status.HTTP_200_OK
+            assert response['Content-Type'] == 'application/msgpack'
+            assert msgpack.unpackb(response.content) == api_client.get(path).json()
+
+    def test_format_parameter_and_errors(self, api_client, msgpack):
+        """Test ?format=msgpack, including error bodies"""
+        response = api_client.get('/api/tasks/?format=msgpack&priority=high')
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert msgpack.unpackb(response.content) == {'priority': ['Enter a number.']}
@@ -0,0 +1,149 @@
+"""
+Tests for read-replica routing, with a second SQLite file as the replica
+"""
+import io
+from unittest import mock
+
+import pytest
+from django.core.management import call_command
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from tasks import routers
+from tasks.models import Task
+
+
+@pytest.fixture
+def replica(settings, tmp_path, transactional_db):
+    """A 'replica' alias on its own file, synced from the primary on demand."""
+    connections.settings['replica'] = {
+        **connections['default'].settings_dict, 'NAME': str(tmp_path / 'replica.sqlite3')
+    }
+    settings.TASKS_READ_DATABASES = ['replica']
+
+    def sync():
+        call_command('sync_replicas', stdout=io.StringIO())
+
+    sync()
+    yield sync
+    connections['replica'].close()
+    del connections['replica']
+    del connections.settings['replica']
+
+
+def titles(response):
+    assert response.status_code == status.HTTP_200_OK
+    return [task['title'] for task in response.json()['results']]
+
+
+class TestTaskRouter:
+    """Test the routing decisions"""
+
+    def test_without_replicas_everything_uses_default(self, settings):
+        """Test an empty TASKS_READ_DATABASES keeps reads on the primary"""
+        settings.TASKS_READ_DATABASES = []
+
+        assert routers.TaskRouter().db_for_read(Task) == 'default'
+        assert routers.TaskRouter().db_for_write(Task) == 'default'
+
+    def test_reads_go_to_replicas_unless_pinned(self, settings):
+        """Test task reads use a replica, or the primary inside read_from_primary"""
+        settings.TASKS_READ_DATABASES = ['replica_a', 'replica_b']
+        router = routers.TaskRouter()
+
+        assert router.db_for_read(Task) in ('replica_a', 'replica_b')
+        with routers.read_from_primary():
+            assert router.db_for_read(Task) == 'default'
+        assert router.db_for_write(Task) == 'default'
+
+    def test_other_apps_are_not_routed(self, settings):
+        """Test models outside the tasks app keep Django's default routing"""
+        from django.contrib.sessions.models import Session
+        settings.TASKS_READ_DATABASES = ['replica']
+
+        assert routers.TaskRouter().db_for_read(Session) is None
+        assert routers.TaskRouter().db_for_write(Session) is None
+
+    def test_replicas_are_not_migrated(self, settings):
+        """Test migrations only run against the primary"""
+        settings.TASKS_READ_DATABASES = ['replica']
+        router = routers.TaskRouter()
+
+        assert router.allow_migrate('replica', 'tasks') is False
+        assert router.allow_migrate('replica', 'sessions') is False
+        assert router.allow_migrate('default', 'tasks') is None
+
+    def test_lagging_reads_share_a_version(self, settings):
+        """Test replica reads inside the pin window are cacheable, apart from later ones"""
+        settings.TASKS_READ_DATABASES = ['replica']
+        changed_at = routers.time.time()
+
+        assert routers.read_consistency(changed_at) == routers.read_consistency(changed_at)
+        assert routers.read_consistency(changed_at) != routers.read_consistency(changed_at - 60)
+        with routers.read_from_primary():
+            assert routers.read_consistency(changed_at) == ':primary'
+
+
+class TestReplicaPinning:
+    """Test requests against a lagging replica"""
+
+    def test_reads_come_from_the_replica(self, replica):
+        """Test list, retrieve and summary read from the replica"""
+        client = APIClient()
+
+        with CaptureQueriesContext(connections['default']) as primary:
+            with CaptureQueriesContext(connections['replica']) as replicated:
+                client.get('/api/tasks/')
+                client.get('/api/tasks/summary/')
+
+        assert len(replicated) > 0
+        assert len(primary) == 0
+
+    def test_writer_reads_its_writes_until_the_window_ends(self, replica):
+        """Test a client that wrote reads from the primary for a while"""
+        writer, reader = APIClient(), APIClient()
+
+        response = writer.post('/api/tasks/', {'title': 'Fresh task'}, format='json')
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert routers.PIN_COOKIE in response.cookies
+        # Another client still reads the replica, which has not caught up;
+        # what it read must not be served to the writer from a cache.
+        assert titles(reader.get('/api/tasks/')) == []
+        assert titles(writer.get('/api/tasks/')) == ['Fresh task']
+
+        # Once the window has passed the replica has caught up, and the
+        # writer reads it like everyone else.
+        replica()
+        with mock.patch('tasks.routers.time.time', return_value=2 ** 40):
+            with CaptureQueriesContext(connections['replica']) as replicated:
+                assert titles(writer.get('/api/tasks/')) == ['Fresh task']
+            assert len(replicated) > 0
+            assert titles(reader.get('/api/tasks/')) == ['Fresh task']
+
+    def test_writes_read_from_the_primary(self, replica):
+        """Test a write request finds rows the replica does not have yet"""
+        task = Task.objects.create(title="Primary only")
+
+        response = APIClient().patch(f'/api/tasks/{task.id}/', {'priority': 5}, format='json')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert Task.objects.using('default').get(pk=task.pk).priority == 5
+
+    def test_change_feed_reads_from_the_primary(self, replica, settings):
+        """Test the change feed never reads a lagging replica"""
+        settings.TASKS_CHANGES_SETTLE_SECONDS = 0
+        Task.objects.create(title="Not replicated")
+
+        response = APIClient().get('/api/tasks/changes/')
+
+        assert [task['title'] for task in response.json()['changed']] == ['Not replicated']
+
+    def test_failed_writes_do_not_pin(self, replica):
+        """Test a rejected write leaves the client on the replica"""
+        response = APIClient().post('/api/tasks/', {'title': 'AB'}, format='json')
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert routers.PIN_COOKIE not in response.cookies
@@ -1,11 +1,15 @@
 """
 Unit tests for Task serializers
 """
+import json
+
 import pytest
+from django.test import override_settings
 from django.utils import timezone
+from rest_framework import serializers
 from datetime import timedelta
 from tasks.models import Task
-from tasks.serializers import TaskSerializer
+from tasks.serializers import TaskRowSerializer, TaskSerializer, select_fields
 
 
 @pytest.mark.django_db
@@ -148,4 +152,166 @@ class TestTaskCreateAndUpdate:
         updated_task = serializer.save()
         
         assert updated_task.status == 'done'
-        assert updated_task.title == 'Original'
\ No newline at end of file
+        assert updated_task.title == 'Original'
+
+
+@pytest.fixture
+def parity_tasks():
+    """Tasks covering every branch of the serialized representation"""
+    now = timezone.now()
+    return [
+        Task.objects.create(title='No due date', description=''),
+        Task.objects.create(title='Overdue', due_date=now - timedelta(days=2), priority=5),
+        Task.objects.create(title='Done late', status='done', due_date=now - timedelta(days=2)),
+        Task.objects.create(
+            title='Future', status='in_progress', due_date=now + timedelta(days=3),
+            description='Ünïcödé \u2603 "quoted"\nmultiline',
+        ),
+        Task.objects.create(
+            title='Whole second', due_date=now.replace(microsecond=0) - timedelta(hours=1),
+        ),
+    ]
+
+
+@pytest.mark.django_db
+class TestTaskRowSerializer:
+    """Test TaskRowSerializer produces exactly TaskSerializer's output"""
+    
+    def assert_parity(self, tasks):
+        rows = Task.objects.order_by('title').values(*TaskRowSerializer.fields)
+        fast = TaskRowSerializer().many(rows)
+        expected = TaskSerializer(Task.objects.order_by('title'), many=True).data
+        
+        assert json.dumps(fast) == json.dumps(expected)
+    
+    def test_values_rows_match_task_serializer(self, parity_tasks):
+        """Test values() rows serialize identically, including key order"""
+        self.assert_parity(parity_tasks)
+    
+    def test_instances_match_task_serializer(self, parity_tasks):
+        """Test Task instances serialize identically"""
+        serializer = TaskRowSerializer()
+        for task in parity_tasks:
+            assert serializer.to_representation(task) == TaskSerializer(task).data
+    
+    @override_settings(TIME_ZONE='America/New_York')
+    def test_parity_in_local_timezone(self, parity_tasks):
+        """Test datetimes are rendered in the active timezone like DRF"""
+        self.assert_parity(parity_tasks)
+    
+    @override_settings(REST_FRAMEWORK={'DATETIME_FORMAT': '%Y-%m-%d %H:%M'})
+    def test_parity_with_custom_datetime_format(self, parity_tasks):
+        """Test a non-ISO DATETIME_FORMAT falls back to DRF's formatting"""
+        self.assert_parity(parity_tasks)
+    
+    def test_is_overdue_uses_single_timestamp(self, parity_tasks):
+        """Test is_overdue is computed against the serializer's timestamp"""
+        past = timezone.now() - timedelta(days=10)
+        future = timezone.now() + timedelta(days=10)
+        overdue = Task.objects.filter(title='Overdue').values(*TaskRowSerializer.fields).get()
+        
+        assert TaskRowSerializer(past).to_representation(overdue)['is_overdue'] is False
+        assert TaskRowSerializer(future).to_representation(overdue)['is_overdue'] is True
+    
+    def test_selected_fields_match_task_serializer(self, parity_tasks):
+        """Test a sparse fieldset gives TaskSerializer's output for those fields"""
+        fields = ('id', 'due_date', 'is_overdue')
+        rows = Task.objects.order_by('title').with_overdue(timezone.now()).values(
+            *TaskRowSerializer.columns(fields)
+        )
+        fast = TaskRowSerializer(fields=fields).many(rows)
+        expected = TaskSerializer(Task.objects.order_by('title'), many=True, fields=fields).data
+        
+        assert json.dumps(fast) == json.dumps(expected)
+        assert list(fast[0]) == list(fields)
+
+
+class TestSelectFields:
+    """Test parsing of the fields= and exclude= parameters"""
+    
+    def test_fields_in_serializer_order(self):
+        """Test selected fields keep the serializer's order"""
+        assert select_fields('title, id') == ('id', 'title')
+    
+    def test_exclude(self):
+        """Test excluded fields are removed from all or the selected fields"""
+        assert 'description' not in select_fields(exclude='description')
+        assert select_fields('id,title,status', 'status') == ('id', 'title')
+    
+    def test_every_field_is_none(self):
+        """Test selecting every field is the same as selecting none"""
+        assert select_fields() is None
+        assert select_fields(','.join(TaskSerializer.Meta.fields)) is None
+    
+    def test_unknown_fields_are_rejected(self):
+        """Test unknown names are reported per parameter"""
+        with pytest.raises(serializers.ValidationError) as exc:
+            select_fields('title,secret', 'bogus')
+        assert set(exc.value.detail) == {'fields', 'exclude'}
+    
+    def test_nothing_left_is_rejected(self):
+        """Test excluding every selected field is an error"""
+        with pytest.raises(serializers.ValidationError):
+            select_fields('title', 'title')
+    
+    def test_task_serializer_validates_every_field(self):
+        """Test a fieldset trims the output of TaskSerializer but not its input"""
+        serializer = TaskSerializer(data={'title': 'Sparse', 'priority': 9}, fields=('id',))
+        
+        assert not serializer.is_valid()
+        assert 'priority' in serializer.errors
+
+
+class TestValidatePlain:
+    """Test the bulk fast path agrees with full serializer validation"""
+    
+    ITEMS = [
+        {'title': 'Plain task'},
+        {'title': '  Padded title  ', 'description': ' Notes \n', 'status': 'done'},
+        {'title': 'Due task', 'priority': 5, 'due_date': '2030-01-01T12:00:00+02:00'},
+        {'title': 'Naive due', 'due_date': '2030-01-01T12:00:00'},
+        {'title': 'No due', 'due_date': None, 'id': 'ignored', 'extra': 1},
+        {'title': 'x' * 200},
+        {'title': 'x' * 201},
+        {'title': 'AB'},
+        {'title': '   '},
+        {'title': 'Null\x00char'},
+        {'title': 12345},
+        {'title': None},
+        {'description': 'No title'},
+        {'title': 'String priority', 'priority': '4'},
+        {'title': 'Bool priority', 'priority': True},
+        {'title': 'High priority', 'priority': 6},
+        {'title': 'Bad status', 'status': 'later'},
+        {'title': 'List status', 'status': ['done']},
+        {'title': 'Bad due', 'due_date': 'tomorrow'},
+        {'title': 'Date only', 'due_date': '2030-01-01'},
+        'not an object',
+    ]
+    
+    @pytest.mark.parametrize('partial', [False, True])
+    def test_matches_run_validation(self, partial):
+        """Test every accepted item validates to what run_validation returns"""
+        serializer = TaskSerializer(data=self.ITEMS, many=True, partial=partial)
+        child = serializer.child
+        accepted = 0
+        for item in self.ITEMS:
+            data = child.validate_plain(item)
+            try:
+                expected = dict(child.run_validation(item))
+            except serializers.ValidationError:
+                assert data is None, item
+                continue
+            if data is not None:
+                accepted += 1
+                assert data == expected, item
+        assert accepted >= 5
+    
+    def test_validate_items_keeps_error_messages(self):
+        """Test items the fast path declines still get the serializer's errors"""
+        serializer = TaskSerializer(data=[{'title': 'AB'}, {'title': 'Fine task'}], many=True)
+        
+        valid, errors = serializer.validate_items()
+        
+        assert [index for index, _ in valid] == [1]
+        assert errors == [{'index': 0, 'errors': {'title': ['Title must be at least 3 characters.']}}]
@@ -1,18 +1,23 @@
 """
 Unit tests for Task API endpoints (Views)
 """
+import csv
+import io
+import json
+from unittest import mock
+
 import pytest
+from django.db import connection, transaction
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 from datetime import timedelta
-from rest_framework.test import APIClient
 from rest_framework import status
+from tasks.cache import get_version
 from tasks.models import Task
-
-
-@pytest.fixture
-def api_client():
-    """Fixture to create API client for testing"""
-    return APIClient()
+from tasks.response_cache import LRUBackend
+from tasks.serializers import TaskSerializer
+from tasks.signals import tasks_changed
 
 
 @pytest.fixture
@@ -50,6 +55,25 @@ class TestTaskListEndpoint:
         assert response.status_code == status.HTTP_200_OK
         assert response.data['count'] == 3
         assert len(response.data['results']) == 3
+    
+    def test_list_matches_task_serializer(self, api_client):
+        """Test the fast list path renders exactly what TaskSerializer would"""
+        Task.objects.create(title="Open task", due_date=timezone.now() - timedelta(days=1))
+        Task.objects.create(title="Done task", status='done', priority=5)
+        
+        response = api_client.get('/api/tasks/')
+        expected = TaskSerializer(Task.objects.all(), many=True).data
+        
+        assert response.content == json.dumps(
+            {'count': 2, 'next': None, 'previous': None, 'results': expected},
+            separators=(',', ':')
+        ).encode()
+    
+    def test_retrieve_matches_task_serializer(self, api_client, sample_task):
+        """Test the detail view renders exactly what TaskSerializer would"""
+        response = api_client.get(f'/api/tasks/{sample_task.id}/')
+        
+        assert response.data == TaskSerializer(sample_task).data
 
 
 @pytest.mark.django_db
@@ -245,6 +269,161 @@ class TestTaskFiltering:
         assert 'High' in response.data['results'][0]['title']
 
 
+@pytest.mark.django_db
+class TestOverdueFiltering:
+    """Test the overdue annotation, filters and ordering"""
+    
+    def setup_method(self):
+        now = timezone.now()
+        self.late = Task.objects.create(title="Late task", due_date=now - timedelta(days=2))
+        self.later = Task.objects.create(title="Later task", due_date=now - timedelta(hours=1))
+        self.done = Task.objects.create(
+            title="Done late", status="done", due_date=now - timedelta(days=3)
+        )
+        self.future = Task.objects.create(title="Future task", due_date=now + timedelta(days=1))
+        self.undated = Task.objects.create(title="Undated task")
+    
+    def titles(self, response):
+        assert response.status_code == status.HTTP_200_OK
+        return [task['title'] for task in response.data['results']]
+    
+    def test_filter_overdue(self, api_client):
+        """Test overdue=true returns exactly the tasks is_overdue() reports"""
+        response = api_client.get('/api/tasks/?overdue=true&ordering=due_date')
+        
+        assert self.titles(response) == ["Late task", "Later task"]
+        assert all(task['is_overdue'] for task in response.data['results'])
+    
+    def test_filter_not_overdue(self, api_client):
+        """Test overdue=false keeps done, future and undated tasks"""
+        response = api_client.get('/api/tasks/?overdue=false')
+        
+        assert sorted(self.titles(response)) == ["Done late", "Future task", "Undated task"]
+        assert not any(task['is_overdue'] for task in response.data['results'])
+    
+    def test_filter_due_range(self, api_client):
+        """Test due_after is inclusive and due_before exclusive"""
+        response = api_client.get('/api/tasks/', {
+            'due_after': self.late.due_date.isoformat(),
+            'due_before': self.future.due_date.isoformat(),
+            'ordering': 'due_date',
+        })
+        
+        assert self.titles(response) == ["Late task", "Later task"]
+    
+    def test_invalid_due_date_filter(self, api_client):
+        """Test malformed datetimes are rejected"""
+        response = api_client.get('/api/tasks/?due_before=yesterday')
+        
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+    
+    def test_order_by_overdue(self, api_client):
+        """Test ordering=-overdue puts overdue tasks first"""
+        response = api_client.get('/api/tasks/?ordering=-overdue')
+        
+        flags = [task['is_overdue'] for task in response.data['results']]
+        assert flags == [True, True, False, False, False]
+    
+    def test_cursor_pagination_by_overdue(self, api_client):
+        """Test keyset pages can be ordered by the annotation"""
+        response = api_client.get('/api/tasks/?pagination=cursor&ordering=-overdue&page_size=1')
+        flags = []
+        while True:
+            flags.extend(task['is_overdue'] for task in response.data['results'])
+            if response.data['next'] is None:
+                break
+            response = api_client.get(response.data['next'])
+        
+        assert flags == [True, True, False, False, False]
+    
+    def test_summary_matches_filter(self, api_client):
+        """Test the summary overdue count agrees with the overdue filter"""
+        summary = api_client.get('/api/tasks/summary/')
+        listed = api_client.get('/api/tasks/?overdue=true')
+        
+        assert summary.data['overdue_count'] == listed.data['count'] == 2
+
+
+@pytest.mark.django_db
+class TestFullTextSearch:
+    """Test ?search= and title_contains through the full-text index"""
+    
+    def setup_method(self):
+        Task.objects.create(title="Quarterly report", description="Report on report totals")
+        Task.objects.create(title="Fix login bug", description="Mentioned in the report")
+        Task.objects.create(title="Plan offsite", description="Book venue")
+    
+    def titles(self, response):
+        return [task['title'] for task in response.data['results']]
+    
+    def test_search_ranks_by_relevance(self, api_client):
+        """Test the strongest match is listed first"""
+        response = api_client.get('/api/tasks/?search=report')
+        
+        assert self.titles(response) == ["Quarterly report", "Fix login bug"]
+    
+    def test_search_matches_word_prefixes(self, api_client):
+        """Test partial words match the start of indexed words"""
+        response = api_client.get('/api/tasks/?search=quart')
+        
+        assert self.titles(response) == ["Quarterly report"]
+    
+    def test_search_requires_every_term(self, api_client):
+        """Test multiple terms must all match"""
+        response = api_client.get('/api/tasks/?search=report login')
+        
+        assert self.titles(response) == ["Fix login bug"]
+    
+    @pytest.mark.parametrize('query', ['?search=!!!', '?title_contains=-'])
+    def test_punctuation_only_matches_nothing(self, api_client, query):
+        """Test terms without word characters do not match every task"""
+        response = api_client.get(f'/api/tasks/{query}')
+        
+        assert self.titles(response) == []
+    
+    def test_explicit_ordering_overrides_rank(self, api_client):
+        """Test ?ordering= takes precedence over relevance"""
+        response = api_client.get('/api/tasks/?search=report&ordering=-created_at')
+        
+        assert self.titles(response) == ["Fix login bug", "Quarterly report"]
+    
+    def test_title_contains_only_searches_title(self, api_client):
+        """Test title_contains ignores descriptions"""
+        response = api_client.get('/api/tasks/?title_contains=report')
+        
+        assert self.titles(response) == ["Quarterly report"]
+    
+    def test_search_combined_with_title_contains(self, api_client):
+        """Test search and title_contains can be used together"""
+        response = api_client.get('/api/tasks/?search=report&title_contains=fix')
+        
+        assert self.titles(response) == ["Fix login bug"]
+    
+    def test_index_follows_writes(self, api_client):
+        """Test updates, deletes and bulk inserts are reflected in results"""
+        task = Task.objects.get(title="Plan offsite")
+        task.title = "Plan report offsite"
+        task.save()
+        assert "Plan report offsite" in self.titles(api_client.get('/api/tasks/?search=report'))
+        
+        Task.objects.filter(pk=task.pk).update(title="Plan offsite")
+        task.delete()
+        Task.objects.bulk_create([Task(title="Bulk report")])
+        
+        response = api_client.get('/api/tasks/?search=report')
+        assert sorted(self.titles(response)) == ["Bulk report", "Fix login bug", "Quarterly report"]
+    
+    @pytest.mark.skipif(connection.vendor != 'sqlite', reason='SQLite rowids')
+    def test_index_survives_rowid_renumbering(self, api_client):
+        """Test matches stay attached to their tasks when VACUUM renumbers rowids"""
+        Task.objects.get(title="Quarterly report").delete()
+        with connection.cursor() as cursor:
+            cursor.execute('UPDATE tasks_task SET rowid = 100 - rowid')
+        
+        response = api_client.get('/api/tasks/?search=report')
+        assert self.titles(response) == ["Fix login bug"]
+
+
 @pytest.mark.django_db
 class TestTaskPagination:
     """Test pagination functionality"""
@@ -285,6 +464,115 @@ class TestTaskPagination:
         assert response.status_code == status.HTTP_404_NOT_FOUND
 
 
+@pytest.mark.django_db
+class TestCursorPagination:
+    """Test keyset pagination opted into with ?pagination=cursor"""
+    
+    def setup_method(self):
+        now = timezone.now()
+        for i in range(11):
+            Task.objects.create(
+                title=f"Task {i}",
+                priority=i % 3 + 1,
+                due_date=now + timedelta(days=i % 4) if i % 3 else None,
+            )
+    
+    def walk(self, api_client, url):
+        """Follow next links to the end, returning ids and the last response"""
+        ids = []
+        response = api_client.get(url)
+        while True:
+            assert response.status_code == status.HTTP_200_OK
+            ids.extend(task['id'] for task in response.data['results'])
+            if response.data['next'] is None:
+                return ids, response
+            response = api_client.get(response.data['next'])
+    
+    @pytest.mark.parametrize('ordering', [
+        'created_at', '-created_at', 'updated_at', '-updated_at',
+        'due_date', '-due_date', 'priority', '-priority',
+    ])
+    def test_walk_every_ordering(self, api_client, ordering):
+        """Test pages cover every task once in the requested order"""
+        ids, _ = self.walk(
+            api_client, f'/api/tasks/?pagination=cursor&page_size=3&ordering={ordering}'
+        )
+        
+        field = ordering.lstrip('-')
+        descending = ordering.startswith('-')
+        tasks = list(Task.objects.all())
+        present = sorted(
+            (t for t in tasks if getattr(t, field) is not None),
+            key=lambda t: (getattr(t, field), t.pk), reverse=descending,
+        )
+        # Rows without a value (null due dates) always come last.
+        missing = sorted(
+            (t for t in tasks if getattr(t, field) is None),
+            key=lambda t: t.pk, reverse=descending,
+        )
+        assert ids == [str(t.pk) for t in present + missing]
+    
+    def test_previous_link_returns_prior_page(self, api_client):
+        """Test following previous from page two returns page one"""
+        first = api_client.get('/api/tasks/?pagination=cursor&ordering=priority&page_size=4')
+        second = api_client.get(first.data['next'])
+        back = api_client.get(second.data['previous'])
+        
+        assert first.data['previous'] is None
+        assert [t['id'] for t in back.data['results']] == [t['id'] for t in first.data['results']]
+    
+    @pytest.mark.parametrize('ordering', ['due_date', '-due_date'])
+    def test_walk_back_across_nulls(self, api_client, ordering):
+        """Test previous links from the last page return every task, nulls included"""
+        forward, response = self.walk(
+            api_client, f'/api/tasks/?pagination=cursor&page_size=3&ordering={ordering}'
+        )
+        
+        backward = [task['id'] for task in response.data['results']]
+        while response.data['previous'] is not None:
+            response = api_client.get(response.data['previous'])
+            assert response.status_code == status.HTTP_200_OK
+            backward[:0] = [task['id'] for task in response.data['results']]
+        
+        assert backward == forward
+        assert len(forward) == Task.objects.count()
+    
+    def test_cursor_page_skips_count(self, api_client, django_assert_num_queries):
+        """Test a cursor page is a single query with no COUNT"""
+        first = api_client.get('/api/tasks/?pagination=cursor')
+        
+        with django_assert_num_queries(1) as captured:
+            api_client.get(first.data['next'])
+        
+        assert 'COUNT' not in captured.captured_queries[0]['sql']
+        assert 'count' not in first.data
+    
+    def test_page_size_is_capped(self, api_client):
+        """Test page_size above the maximum is clamped"""
+        for i in range(100):
+            Task.objects.create(title=f"Extra {i}")
+        
+        response = api_client.get('/api/tasks/?pagination=cursor&page_size=1000')
+        assert len(response.data['results']) == 100
+        
+        response = api_client.get('/api/tasks/?page_size=1000')
+        assert len(response.data['results']) == 100
+    
+    def test_invalid_cursor(self, api_client):
+        """Test malformed cursors return 404"""
+        response = api_client.get('/api/tasks/?cursor=not-a-cursor')
+        
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+    
+    def test_cursor_bound_to_ordering(self, api_client):
+        """Test a cursor cannot be replayed under a different ordering"""
+        first = api_client.get('/api/tasks/?pagination=cursor&ordering=priority&page_size=4')
+        url = first.data['next'].replace('ordering=priority', 'ordering=due_date')
+        
+        response = api_client.get(url)
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
 @pytest.mark.django_db
 class TestCustomActions:
     """Test custom actions: mark_done, mark_in_progress, summary"""
@@ -328,6 +616,381 @@ class TestCustomActions:
         assert response.data['high_priority_count'] == 2  # Priority >= 4
 
 
+@pytest.mark.django_db
+class TestSummaryEndpoint:
+    """Test GET /api/tasks/summary/ aggregation and caching"""
+    
+    def setup_method(self):
+        past_date = timezone.now() - timedelta(days=1)
+        Task.objects.create(title="Overdue Task", status="todo", priority=5, due_date=past_date)
+        Task.objects.create(title="Done Late Task", status="done", priority=4, due_date=past_date)
+        Task.objects.create(title="Doing Task", status="in_progress", priority=2)
+    
+    def test_summary_runs_single_query(self, api_client, django_assert_num_queries):
+        """Test all counts come from one aggregate query"""
+        with django_assert_num_queries(1):
+            response = api_client.get('/api/tasks/summary/')
+        
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data == {
+            'total_tasks': 3,
+            'todo_count': 1,
+            'in_progress_count': 1,
+            'done_count': 1,
+            'overdue_count': 1,
+            'high_priority_count': 2,
+        }
+    
+    def test_summary_is_cached(self, api_client, django_assert_num_queries):
+        """Test a repeated summary request is served from the cache"""
+        api_client.get('/api/tasks/summary/')
+        
+        with django_assert_num_queries(0):
+            response = api_client.get('/api/tasks/summary/')
+        
+        assert response.data['total_tasks'] == 3
+    
+    def test_summary_invalidated_on_write(self, api_client):
+        """Test creating and deleting tasks refreshes cached counts"""
+        api_client.get('/api/tasks/summary/')
+        
+        task = Task.objects.create(title="New Task", status="todo")
+        response = api_client.get('/api/tasks/summary/')
+        assert response.data['total_tasks'] == 4
+        assert response.data['todo_count'] == 2
+        
+        task.delete()
+        response = api_client.get('/api/tasks/summary/')
+        assert response.data['total_tasks'] == 3
+    
+    def test_summary_accepts_filters(self, api_client):
+        """Test summary honours TaskFilter parameters"""
+        response = api_client.get('/api/tasks/summary/?priority_min=4')
+        
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['total_tasks'] == 2
+        assert response.data['done_count'] == 1
+        assert response.data['in_progress_count'] == 0
+        
+        response = api_client.get('/api/tasks/summary/?status=todo')
+        assert response.data['total_tasks'] == 1
+        assert response.data['overdue_count'] == 1
+    
+    def test_summary_rejects_invalid_filter(self, api_client):
+        """Test invalid filter values return 400"""
+        response = api_client.get('/api/tasks/summary/?status=bogus')
+        
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+class TestExportEndpoint:
+    """Test GET /api/tasks/export/ streaming"""
+    
+    def setup_method(self):
+        past_date = timezone.now() - timedelta(days=1)
+        Task.objects.create(title="Write report", description='Line one\n"two", three', priority=5)
+        Task.objects.create(title="Review report", priority=2, due_date=past_date)
+        Task.objects.create(title="Book flights", priority=4, status="done", due_date=past_date)
+    
+    def read(self, response):
+        assert response.streaming
+        return b''.join(response.streaming_content).decode('utf-8')
+    
+    def test_export_ndjson_matches_serializer(self, api_client):
+        """Test NDJSON rows are identical to TaskSerializer output"""
+        response = api_client.get('/api/tasks/export/')
+        
+        assert response.status_code == status.HTTP_200_OK
+        assert response['Content-Type'].startswith('application/x-ndjson')
+        rows = [json.loads(line) for line in self.read(response).splitlines()]
+        expected = json.loads(json.dumps(TaskSerializer(Task.objects.all(), many=True).data))
+        assert rows == expected
+    
+    def test_export_csv(self, api_client):
+        """Test CSV export with header row and quoted values"""
+        response = api_client.get('/api/tasks/export/?format=csv&ordering=priority')
+        
+        assert response['Content-Type'].startswith('text/csv')
+        rows = list(csv.DictReader(io.StringIO(self.read(response))))
+        assert [row['title'] for row in rows] == ["Review report", "Book flights", "Write report"]
+        assert rows[2]['description'] == 'Line one\n"two", three'
+        assert rows[0]['is_overdue'] == 'True'
+        assert rows[0]['due_date'].endswith('Z')
+    
+    def test_export_honours_filters_and_search(self, api_client):
+        """Test export applies TaskFilter and search parameters"""
+        response = api_client.get('/api/tasks/export/?search=report&priority_min=3')
+        
+        rows = [json.loads(line) for line in self.read(response).splitlines()]
+        assert [row['title'] for row in rows] == ["Write report"]
+    
+    def test_export_runs_single_query(self, api_client, django_assert_num_queries):
+        """Test rows are read with one query and no per-row work"""
+        with django_assert_num_queries(1):
+            response = api_client.get('/api/tasks/export/')
+            self.read(response)
+    
+    def test_export_invalid_filter(self, api_client):
+        """Test filter errors are reported in the requested format"""
+        response = api_client.get('/api/tasks/export/?format=csv&status=bogus')
+        
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.content.decode().startswith('status,')
+
+
+@pytest.mark.django_db
+class TestTransitionEndpoint:
+    """Test POST /api/tasks/transition/"""
+    
+    def setup_method(self):
+        self.tasks = [
+            Task.objects.create(title="Write report", priority=5),
+            Task.objects.create(title="Review report", priority=2),
+            Task.objects.create(title="Book flights", priority=5, status="done"),
+        ]
+    
+    def statuses(self):
+        return [Task.objects.get(pk=task.pk).status for task in self.tasks]
+    
+    def test_transition_by_ids(self, api_client, django_assert_num_queries):
+        """Test listed tasks are selected and moved with a single UPDATE"""
+        data = {'status': 'done', 'ids': [str(self.tasks[0].pk), str(self.tasks[1].pk)]}
+        
+        # SAVEPOINT + SELECT + UPDATE + RELEASE
+        with django_assert_num_queries(4):
+            response = api_client.post('/api/tasks/transition/', data, format='json')
+        
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data == {'status': 'done', 'updated': 2}
+        assert self.statuses() == ['done', 'done', 'done']
+    
+    def test_transition_by_filter(self, api_client, django_assert_num_queries):
+        """Test tasks can be selected with list filter and search parameters"""
+        with django_assert_num_queries(4):
+            response = api_client.post(
+                '/api/tasks/transition/?priority_min=4&search=report',
+                {'status': 'in_progress'},
+                format='json'
+            )
+        
+        assert response.data['updated'] == 1
+        assert self.statuses() == ['in_progress', 'todo', 'done']
+    
+    def test_transition_skips_tasks_already_in_status(self, api_client):
+        """Test tasks already in the target status are left untouched"""
+        before = Task.objects.get(pk=self.tasks[2].pk).updated_at
+        
+        response = api_client.post(
+            '/api/tasks/transition/?priority=5', {'status': 'done'}, format='json'
+        )
+        
+        assert response.data['updated'] == 1
+        assert Task.objects.get(pk=self.tasks[2].pk).updated_at == before
+    
+    def test_transition_requires_selection(self, api_client):
+        """Test a transition without ids or filters is rejected"""
+        response = api_client.post('/api/tasks/transition/', {'status': 'done'}, format='json')
+        
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert self.statuses() == ['todo', 'todo', 'done']
+    
+    @pytest.mark.parametrize('query', ['?bogus=1', '?status=', '?search=', '?search=%20,', '?page=2'])
+    def test_transition_ignores_empty_and_unknown_parameters(self, api_client, query):
+        """Test only a non-empty recognised filter or search term selects tasks"""
+        response = api_client.post(f'/api/tasks/transition/{query}', {'status': 'done'}, format='json')
+        
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert self.statuses() == ['todo', 'todo', 'done']
+    
+    def test_transition_rejects_invalid_filters(self, api_client):
+        """Test invalid filter values are reported instead of selecting everything"""
+        response = api_client.post(
+            '/api/tasks/transition/?priority=high', {'status': 'done'}, format='json'
+        )
+        
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert 'priority' in response.data
+        assert self.statuses() == ['todo', 'todo', 'done']
+    
+    def test_transition_caps_filtered_selection(self, api_client, settings):
+        """Test filters selecting more than TASKS_BULK_MAX_ITEMS tasks are rejected"""
+        settings.TASKS_BULK_MAX_ITEMS = 1
+        response = api_client.post(
+            '/api/tasks/transition/?status=todo', {'status': 'done'}, format='json'
+        )
+        
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert self.statuses() == ['todo', 'todo', 'done']
+    
+    def test_transition_signals_changed_tasks(self, api_client):
+        """Test tasks_changed names only the tasks whose status changed"""
+        received = []
+        
+        def receiver(sender, **kwargs):
+            received.append(kwargs)
+        
+        tasks_changed.connect(receiver)
+        try:
+            api_client.post('/api/tasks/transition/?priority=5', {'status': 'done'}, format='json')
+        finally:
+            tasks_changed.disconnect(receiver)
+        
+        assert [(event['action'], event['pks']) for event in received] == [
+            ('update', [self.tasks[0].pk])
+        ]
+    
+    def test_transition_invalid_status(self, api_client):
+        """Test unknown statuses are rejected"""
+        data = {'status': 'archived', 'ids': [str(self.tasks[0].pk)]}
+        
+        response = api_client.post('/api/tasks/transition/', data, format='json')
+        
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert 'status' in response.data
+    
+    def test_transition_refreshes_summary(self, api_client):
+        """Test transitions invalidate the cached summary"""
+        api_client.get('/api/tasks/summary/')
+        api_client.post('/api/tasks/transition/?status=todo', {'status': 'done'}, format='json')
+        
+        response = api_client.get('/api/tasks/summary/')
+        assert response.data['done_count'] == 3
+    
+    def test_mark_done_updates_only_status(self, api_client, django_assert_num_queries):
+        """Test single-task transitions write only status and updated_at"""
+        with django_assert_num_queries(2) as captured:
+            api_client.post(f'/api/tasks/{self.tasks[0].pk}/mark_done/')
+        
+        update = captured.captured_queries[1]['sql']
+        assert update.startswith('UPDATE')
+        assert '"title"' not in update
+        assert '"status"' in update and '"updated_at"' in update
+
+
+@pytest.mark.django_db
+class TestBulkEndpoints:
+    """Test POST/PATCH/DELETE /api/tasks/bulk/"""
+    
+    def test_bulk_create_reports_invalid_items(self, api_client):
+        """Test valid items are created while invalid ones are reported"""
+        data = [
+            {'title': 'First Task', 'priority': 2},
+            {'title': 'AB'},
+            {'title': 'Third Task', 'status': 'done'},
+            'not an object',
+        ]
+        
+        response = api_client.post('/api/tasks/bulk/', data, format='json')
+        
+        assert response.status_code == status.HTTP_201_CREATED
+        assert len(response.data['created']) == 2
+        assert [error['index'] for error in response.data['errors']] == [1, 3]
+        assert 'title' in response.data['errors'][0]['errors']
+        assert set(Task.objects.values_list('title', flat=True)) == {'First Task', 'Third Task'}
+    
+    def test_bulk_create_all_invalid(self, api_client):
+        """Test a batch without valid items returns 400"""
+        response = api_client.post('/api/tasks/bulk/', [{'priority': 9}], format='json')
+        
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert Task.objects.count() == 0
+    
+    def test_bulk_requires_list(self, api_client):
+        """Test non-list and empty payloads are rejected"""
+        response = api_client.post('/api/tasks/bulk/', {'title': 'Single'}, format='json')
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        
+        response = api_client.post('/api/tasks/bulk/', [], format='json')
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+    
+    def test_bulk_size_limit(self, api_client, settings):
+        """Test batches above TASKS_BULK_MAX_ITEMS are rejected"""
+        settings.TASKS_BULK_MAX_ITEMS = 2
+        data = [{'title': f'Task {i}'} for i in range(3)]
+        
+        response = api_client.post('/api/tasks/bulk/', data, format='json')
+        
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert Task.objects.count() == 0
+    
+    def test_bulk_create_writes_in_chunks(self, api_client, settings, django_assert_num_queries):
+        """Test inserts are batched by TASKS_BULK_CHUNK_SIZE"""
+        settings.TASKS_BULK_CHUNK_SIZE = 2
+        data = [{'title': f'Task {i}'} for i in range(5)]
+        
+        # SAVEPOINT + 3 INSERTs + RELEASE
+        with django_assert_num_queries(5):
+            response = api_client.post('/api/tasks/bulk/', data, format='json')
+        
+        assert response.status_code == status.HTTP_201_CREATED
+        assert Task.objects.count() == 5
+    
+    def test_bulk_update(self, api_client):
+        """Test partial updates, shared and individual, with per-item errors"""
+        tasks = [Task.objects.create(title=f"Task {i}") for i in range(3)]
+        before = {task.pk: task.updated_at for task in tasks}
+        data = [
+            {'id': str(tasks[0].pk), 'status': 'done'},
+            {'id': str(tasks[1].pk), 'status': 'done'},
+            {'id': str(tasks[2].pk), 'title': 'Renamed Task', 'priority': 5},
+            {'id': '00000000-0000-0000-0000-000000000000', 'status': 'done'},
+            {'id': str(tasks[0].pk), 'priority': 10},
+        ]
+        
+        response = api_client.patch('/api/tasks/bulk/', data, format='json')
+        
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data['updated']) == 3
+        assert [error['index'] for error in response.data['errors']] == [3, 4]
+        for task in tasks:
+            task.refresh_from_db()
+            assert task.updated_at > before[task.pk]
+        assert [task.status for task in tasks] == ['done', 'done', 'todo']
+        assert tasks[2].title == 'Renamed Task'
+        assert tasks[2].priority == 5
+        assert tasks[0].priority == 3
+    
+    def test_bulk_update_reports_bad_ids(self, api_client):
+        """Test items with a missing or malformed id get their own errors"""
+        data = [
+            {'status': 'done'},
+            {'id': '', 'status': 'done'},
+            {'id': 'not-a-uuid', 'status': 'done'},
+            {'id': '00000000-0000-0000-0000-000000000000', 'status': 'done'},
+        ]
+    
+        response = api_client.patch('/api/tasks/bulk/', data, format='json')
+    
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert [error['errors']['id'] for error in response.data['errors']] == [
+            ['This field is required.'],
+            ['This field is required.'],
+            ['Must be a valid UUID.'],
+            ['Task not found.'],
+        ]
+    
+    def test_bulk_delete(self, api_client):
+        """Test deleting by id list with invalid ids reported"""
+        tasks = [Task.objects.create(title=f"Task {i}") for i in range(3)]
+        data = [str(tasks[0].pk), str(tasks[1].pk), 'not-a-uuid']
+        
+        response = api_client.delete('/api/tasks/bulk/', data, format='json')
+        
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['deleted'] == 2
+        assert response.data['errors'][0]['index'] == 2
+        assert list(Task.objects.values_list('pk', flat=True)) == [tasks[2].pk]
+    
+    def test_bulk_write_refreshes_summary(self, api_client):
+        """Test bulk writes invalidate the cached summary"""
+        api_client.get('/api/tasks/summary/')
+        api_client.post('/api/tasks/bulk/', [{'title': 'Bulk Task'}], format='json')
+        
+        response = api_client.get('/api/tasks/summary/')
+        assert response.data['total_tasks'] == 1
+
+
 @pytest.mark.django_db
 class TestComputedFields:
     """Test computed fields in API responses"""
@@ -368,3 +1031,428 @@ class TestComputedFields:
         
         assert response.status_code == status.HTTP_200_OK
         assert response.data['is_overdue'] is False
+
+
+@pytest.mark.django_db
+class TestConditionalRequests:
+    """Test ETag / Last-Modified validators and If-* preconditions"""
+    
+    def setup_method(self):
+        self.task = Task.objects.create(
+            title="Watched Task", due_date=timezone.now() + timedelta(hours=1)
+        )
+    
+    def test_list_not_modified(self, api_client, django_assert_num_queries):
+        """Test a repeated list poll is answered with 304 without queries"""
+        first = api_client.get('/api/tasks/')
+        
+        assert first['ETag'].startswith('"')
+        assert 'Last-Modified' in first
+        assert 'no-cache' in first['Cache-Control']
+        with django_assert_num_queries(0):
+            response = api_client.get('/api/tasks/', HTTP_IF_NONE_MATCH=first['ETag'])
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response['ETag'] == first['ETag']
+    
+    def test_list_etag_depends_on_params(self, api_client):
+        """Test each query string has its own validator"""
+        first = api_client.get('/api/tasks/')
+        response = api_client.get('/api/tasks/?ordering=priority', HTTP_IF_NONE_MATCH=first['ETag'])
+        
+        assert response.status_code == status.HTTP_200_OK
+        assert response['ETag'] != first['ETag']
+    
+    def test_list_modified_after_write(self, api_client):
+        """Test any task write changes the list validators"""
+        first = api_client.get('/api/tasks/')
+        Task.objects.create(title="New Task")
+        
+        response = api_client.get('/api/tasks/', HTTP_IF_NONE_MATCH=first['ETag'])
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['count'] == 2
+    
+    def test_list_modified_when_task_becomes_overdue(self, api_client):
+        """Test validators change when a due date passes without any write"""
+        first = api_client.get('/api/tasks/')
+        later = timezone.now() + timedelta(hours=2)
+        
+        with mock.patch('django.utils.timezone.now', return_value=later):
+            response = api_client.get('/api/tasks/', HTTP_IF_NONE_MATCH=first['ETag'])
+            detail = api_client.get(
+                f'/api/tasks/{self.task.pk}/', HTTP_IF_MODIFIED_SINCE=first['Last-Modified']
+            )
+        
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['results'][0]['is_overdue'] is True
+        assert detail.status_code == status.HTTP_200_OK
+    
+    def test_detail_not_modified(self, api_client):
+        """Test If-None-Match and If-Modified-Since on a single task"""
+        url = f'/api/tasks/{self.task.pk}/'
+        first = api_client.get(url)
+        
+        assert api_client.get(url, HTTP_IF_NONE_MATCH=first['ETag']).status_code == 304
+        response = api_client.get(url, HTTP_IF_MODIFIED_SINCE=first['Last-Modified'])
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    
+    def test_summary_not_modified(self, api_client):
+        """Test summary polls are answered with 304 until a write"""
+        first = api_client.get('/api/tasks/summary/')
+        
+        response = api_client.get('/api/tasks/summary/', HTTP_IF_NONE_MATCH=first['ETag'])
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        
+        api_client.post(f'/api/tasks/{self.task.pk}/mark_done/')
+        response = api_client.get('/api/tasks/summary/', HTTP_IF_NONE_MATCH=first['ETag'])
+        assert response.status_code == status.HTTP_200_OK
+    
+    def test_update_with_current_etag(self, api_client):
+        """Test If-Match with the current ETag lets the write through"""
+        url = f'/api/tasks/{self.task.pk}/'
+        etag = api_client.get(url)['ETag']
+        
+        response = api_client.patch(url, {'priority': 5}, format='json', HTTP_IF_MATCH=etag)
+        
+        assert response.status_code == status.HTTP_200_OK
+        assert response['ETag'] != etag
+        assert api_client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code == 304
+    
+    def test_concurrent_edit_is_rejected(self, api_client):
+        """Test a write based on a stale ETag fails with 412"""
+        url = f'/api/tasks/{self.task.pk}/'
+        etag = api_client.get(url)['ETag']
+        api_client.patch(url, {'priority': 1}, format='json', HTTP_IF_MATCH=etag)
+        
+        data = {'title': 'Clobbered', 'status': 'todo', 'priority': 2}
+        response = api_client.put(url, data, format='json', HTTP_IF_MATCH=etag)
+        
+        assert response.status_code == status.HTTP_412_PRECONDITION_FAILED
+        self.task.refresh_from_db()
+        assert self.task.title == "Watched Task"
+        assert self.task.priority == 1
+    
+    def test_stale_delete_and_action_are_rejected(self, api_client):
+        """Test If-Match also guards deletes and status actions"""
+        url = f'/api/tasks/{self.task.pk}/'
+        stale = '"not-the-current-etag"'
+        
+        assert api_client.delete(url, HTTP_IF_MATCH=stale).status_code == 412
+        response = api_client.post(f'{url}mark_done/', HTTP_IF_MATCH=stale)
+        assert response.status_code == status.HTTP_412_PRECONDITION_FAILED
+        assert Task.objects.get(pk=self.task.pk).status == 'todo'
+    
+    def test_write_without_precondition(self, api_client):
+        """Test writes without If-Match behave as before"""
+        response = api_client.patch(
+            f'/api/tasks/{self.task.pk}/', {'status': 'done'}, format='json'
+        )
+        
+        assert response.status_code == status.HTTP_200_OK
+        assert 'ETag' in response
+
+
+@pytest.mark.django_db
+class TestResponseCache:
+    """Test the list/retrieve response cache"""
+    
+    def setup_method(self):
+        self.task = Task.objects.create(title="Cached Task", priority=2)
+    
+    def test_repeated_list_is_served_from_cache(self, api_client, django_assert_num_queries):
+        """Test an identical list request runs no queries"""
+        first = api_client.get('/api/tasks/?ordering=priority')
+        
+        with django_assert_num_queries(0):
+            second = api_client.get('/api/tasks/?ordering=priority')
+        assert second.content == first.content
+    
+    def test_repeated_retrieve_is_served_from_cache(self, api_client, django_assert_num_queries):
+        """Test an identical detail request runs no queries"""
+        first = api_client.get(f'/api/tasks/{self.task.pk}/')
+        
+        with django_assert_num_queries(0):
+            second = api_client.get(f'/api/tasks/{self.task.pk}/')
+        assert second.data == first.data
+        assert second['ETag'] == first['ETag']
+    
+    def test_writes_invalidate_entries(self, api_client):
+        """Test create, update, mark_* and delete invalidate cached responses"""
+        url = f'/api/tasks/{self.task.pk}/'
+        api_client.get('/api/tasks/')
+        api_client.get(url)
+        
+        api_client.post(f'{url}mark_done/')
+        assert api_client.get(url).data['status'] == 'done'
+        
+        api_client.patch(url, {'priority': 5}, format='json')
+        assert api_client.get(url).data['priority'] == 5
+        
+        api_client.post('/api/tasks/', {'title': 'Another Task'}, format='json')
+        assert api_client.get('/api/tasks/').data['count'] == 2
+        
+        api_client.delete(url)
+        assert api_client.get(url).status_code == status.HTTP_404_NOT_FOUND
+        assert api_client.get('/api/tasks/').data['count'] == 1
+    
+    def test_writes_invalidate_again_on_commit(self, django_capture_on_commit_callbacks):
+        """Test entries cached while a write's transaction is open are dropped at commit"""
+        with django_capture_on_commit_callbacks(execute=True):
+            with transaction.atomic():
+                self.task.priority = 4
+                self.task.save()
+                during = get_version()
+        
+        assert get_version() != during
+    
+    def test_cache_stats(self, api_client):
+        """Test hits and misses are exposed"""
+        api_client.get('/api/tasks/')
+        api_client.get('/api/tasks/')
+        api_client.get('/api/tasks/?page=1')
+        
+        response = api_client.get('/api/tasks/cache-stats/')
+        
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['backend'] == 'LRUBackend'
+        assert response.data['entries'] == 2
+    
+    def test_django_cache_backend(self, api_client, django_assert_num_queries):
+        """Test entries can live in a Django cache shared by workers"""
+        config = {'BACKEND': 'tasks.response_cache.DjangoCacheBackend', 'OPTIONS': {}}
+        with override_settings(TASKS_RESPONSE_CACHE=config):
+            api_client.get('/api/tasks/')
+            with django_assert_num_queries(0):
+                api_client.get('/api/tasks/')
+            Task.objects.create(title="Fresh Task")
+            assert api_client.get('/api/tasks/').data['count'] == 2
+            assert api_client.get('/api/tasks/cache-stats/').data['hits'] == 1
+    
+    def test_lru_evicts_least_recently_used(self):
+        """Test the LRU backend stays bounded and counts evictions"""
+        backend = LRUBackend(max_entries=2)
+        backend.set('a', 1)
+        backend.set('b', 2)
+        backend.get('a')
+        backend.set('c', 3)
+        
+        assert backend.get('b') is None
+        assert backend.get('a') == 1 and backend.get('c') == 3
+        assert backend.stats() == {'entries': 2, 'max_entries': 2, 'evictions': 1}
+    
+    @override_settings(TASKS_RESPONSE_CACHE=None)
+    def test_cache_can_be_disabled(self, api_client, django_assert_max_num_queries):
+        """Test every request queries when the cache is disabled"""
+        api_client.get('/api/tasks/')
+        
+        with django_assert_max_num_queries(2) as captured:
+            api_client.get('/api/tasks/')
+        assert len(captured) == 2
+
+
+@pytest.mark.django_db
+class TestChangeFeed:
+    """Test GET /api/tasks/changes/ - incremental sync"""
+    
+    @pytest.fixture(autouse=True)
+    def no_settle_delay(self, settings):
+        settings.TASKS_CHANGES_SETTLE_SECONDS = 0
+    
+    def setup_method(self):
+        self.tasks = [Task.objects.create(title=f"Synced {i}") for i in range(3)]
+    
+    def sync(self, api_client, cursor=None, **params):
+        if cursor:
+            params['cursor'] = cursor
+        response = api_client.get('/api/tasks/changes/', params)
+        assert response.status_code == status.HTTP_200_OK
+        return response.data
+    
+    def test_full_sync_pages_through_every_task(self, api_client):
+        """Test a cursor-less sync returns every task, oldest write first"""
+        first = self.sync(api_client, limit=2)
+        second = self.sync(api_client, first['cursor'], limit=2)
+        
+        assert first['has_more'] is True
+        assert second['has_more'] is False
+        ids = [task['id'] for task in first['changed'] + second['changed']]
+        assert ids == [str(task.pk) for task in self.tasks]
+        assert first['changed'][0] == TaskSerializer(self.tasks[0]).data
+        assert first['deleted'] == second['deleted'] == []
+    
+    def test_deltas_since_cursor(self, api_client):
+        """Test only creates, updates and deletes after the cursor come back"""
+        cursor = self.sync(api_client)['cursor']
+        
+        api_client.patch(f'/api/tasks/{self.tasks[0].pk}/', {'priority': 5}, format='json')
+        created = api_client.post('/api/tasks/', {'title': 'Brand new'}, format='json').data
+        api_client.delete(f'/api/tasks/{self.tasks[1].pk}/')
+        
+        data = self.sync(api_client, cursor)
+        assert [task['id'] for task in data['changed']] == [str(self.tasks[0].pk), created['id']]
+        assert data['changed'][0]['priority'] == 5
+        assert data['deleted'] == [str(self.tasks[1].pk)]
+        
+        data = self.sync(api_client, data['cursor'])
+        assert data['changed'] == [] and data['deleted'] == []
+    
+    def test_bulk_writes_are_reported(self, api_client):
+        """Test transitions and bulk deletes show up in the feed"""
+        cursor = self.sync(api_client)['cursor']
+        
+        api_client.post(
+            '/api/tasks/transition/', {'ids': [str(self.tasks[2].pk)], 'status': 'done'},
+            format='json'
+        )
+        api_client.delete('/api/tasks/bulk/', [str(self.tasks[0].pk)], format='json')
+        
+        data = self.sync(api_client, cursor)
+        assert [task['status'] for task in data['changed']] == ['done']
+        assert data['deleted'] == [str(self.tasks[0].pk)]
+    
+    def test_latest_cursor_skips_history(self, api_client):
+        """Test ?latest=true starts a client at the present"""
+        api_client.delete(f'/api/tasks/{self.tasks[0].pk}/')
+        cursor = self.sync(api_client, latest='true')['cursor']
+        
+        assert self.sync(api_client, cursor)['changed'] == []
+        Task.objects.create(title="After latest")
+        assert [task['title'] for task in self.sync(api_client, cursor)['changed']] == ["After latest"]
+    
+    def test_full_sync_skips_old_tombstones(self, api_client):
+        """Test a client without a cursor is not sent earlier deletions"""
+        api_client.delete(f'/api/tasks/{self.tasks[0].pk}/')
+        
+        assert self.sync(api_client)['deleted'] == []
+    
+    def test_recent_writes_are_held_back(self, api_client, settings):
+        """Test writes inside the settle delay wait for a later call"""
+        settings.TASKS_CHANGES_SETTLE_SECONDS = 60
+        data = self.sync(api_client)
+        assert data['changed'] == []
+        
+        later = timezone.now() + timedelta(minutes=2)
+        with mock.patch('django.utils.timezone.now', return_value=later):
+            data = self.sync(api_client, data['cursor'])
+        assert len(data['changed']) == 3
+    
+    def test_slow_bulk_writes_are_restamped(self, api_client, settings):
+        """Test a bulk write outlasting half the settle delay stamps its rows at commit"""
+        settings.TASKS_CHANGES_SETTLE_SECONDS = 60
+        with mock.patch('tasks.changes.monotonic', side_effect=[0, 31]):
+            response = api_client.post('/api/tasks/bulk/', [{'title': 'Slow batch'}], format='json')
+        
+        task = Task.objects.get(pk=response.data['created'][0])
+        assert task.updated_at > task.created_at
+    
+    def test_quick_bulk_writes_keep_their_stamp(self, api_client, settings):
+        """Test a bulk write inside the settle delay is not stamped again"""
+        settings.TASKS_CHANGES_SETTLE_SECONDS = 60
+        with mock.patch('tasks.changes.monotonic', side_effect=[0, 29]):
+            response = api_client.post('/api/tasks/bulk/', [{'title': 'Quick batch'}], format='json')
+        
+        task = Task.objects.get(pk=response.data['created'][0])
+        assert task.updated_at == task.created_at
+    
+    def test_expired_cursor(self, api_client):
+        """Test cursors older than the tombstone retention are rejected"""
+        cursor = self.sync(api_client)['cursor']
+        
+        later = timezone.now() + timedelta(days=31)
+        with mock.patch('django.utils.timezone.now', return_value=later):
+            response = api_client.get('/api/tasks/changes/', {'cursor': cursor})
+        assert response.status_code == status.HTTP_410_GONE
+    
+    def test_invalid_cursor(self, api_client):
+        """Test malformed cursors return 404"""
+        response = api_client.get('/api/tasks/changes/', {'cursor': 'garbage'})
+        
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.django_db
+class TestSparseFieldsets:
+    """Test fields= and exclude= on the task endpoints"""
+    
+    def setup_method(self):
+        self.task = Task.objects.create(
+            title="Sparse Task", description="A long description " * 50, priority=4
+        )
+    
+    def selected_columns(self, api_client, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = api_client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        task_queries = [query['sql'] for query in queries if 'FROM "tasks_task"' in query['sql']]
+        return response, ' '.join(sql.split(' FROM ')[0] for sql in task_queries)
+    
+    def test_list_fields(self, api_client):
+        """Test fields= trims the list and the columns read"""
+        response, columns = self.selected_columns(api_client, '/api/tasks/?fields=id,title,is_overdue')
+        
+        assert list(response.data['results'][0]) == ['id', 'title', 'is_overdue']
+        assert response.data['results'][0]['title'] == "Sparse Task"
+        assert '"description"' not in columns
+        assert '"priority"' not in columns
+    
+    def test_list_exclude(self, api_client):
+        """Test exclude= drops a field from the list and its column"""
+        response, columns = self.selected_columns(api_client, '/api/tasks/?exclude=description')
+        
+        fields = [field for field in TaskSerializer.Meta.fields if field != 'description']
+        assert list(response.data['results'][0]) == fields
+        assert '"description"' not in columns
+    
+    def test_unknown_field(self, api_client):
+        """Test unknown field names are rejected with 400"""
+        response = api_client.get('/api/tasks/?fields=title,owner')
+        
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert 'fields' in response.data
+    
+    def test_retrieve_fields(self, api_client):
+        """Test fields= trims a task and defers the other columns"""
+        url = f'/api/tasks/{self.task.pk}/'
+        full = api_client.get(url)
+        response, columns = self.selected_columns(api_client, f'{url}?fields=title')
+        
+        assert response.data == {'title': "Sparse Task"}
+        assert '"description"' not in columns
+        assert response['ETag'] != full['ETag']
+        again = api_client.get(f'{url}?fields=title', HTTP_IF_NONE_MATCH=response['ETag'])
+        assert again.status_code == status.HTTP_304_NOT_MODIFIED
+    
+    def test_cursor_pagination(self, api_client):
+        """Test cursor links work when the ordering field is not selected"""
+        Task.objects.create(title="Second Task", priority=2)
+        response = api_client.get(
+            '/api/tasks/',
+            {'fields': 'title', 'pagination': 'cursor', 'page_size': 1, 'ordering': 'priority'},
+        )
+        following = api_client.get(response.data['next'])
+        
+        assert response.data['results'] == [{'title': "Second Task"}]
+        assert following.data['results'] == [{'title': "Sparse Task"}]
+    
+    def test_update_returns_selected_fields(self, api_client):
+        """Test writes validate and save every field but answer with the selected ones"""
+        response = api_client.patch(
+            f'/api/tasks/{self.task.pk}/?fields=id,status', {'status': 'done'}, format='json'
+        )
+        
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data == {'id': str(self.task.pk), 'status': 'done'}
+        self.task.refresh_from_db()
+        assert self.task.status == 'done'
+    
+    def test_table_format(self, api_client):
+        """Test sparse fieldsets combine with the columnar format"""
+        response = api_client.get('/api/tasks/?fields=title,priority&format=table')
+        
+        assert json.loads(response.content)['results'] == {'title': ["Sparse Task"], 'priority': [4]}
+    
+    def test_summary_ignores_fieldsets(self, api_client):
+        """Test fields= does not change the summary"""
+        response = api_client.get('/api/tasks/summary/?fields=title')
+        
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['total_tasks'] == 1
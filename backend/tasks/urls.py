@@ -1,10 +1,17 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import TaskViewSet
+from . import async_views, metrics
+from .views import TaskViewSet, task_events
 
 router = DefaultRouter()
 router.register(r'tasks', TaskViewSet, basename='task')
 
 urlpatterns = [
+    # Before the router, whose detail route would take "events" for a task id.
+    path('tasks/events/', task_events, name='task-events'),
     path('', include(router.urls)),
+    path('async/tasks/', async_views.task_list, name='async-task-list'),
+    path('async/tasks/summary/', async_views.task_summary, name='async-task-summary'),
+    path('async/tasks/<uuid:pk>/', async_views.task_detail, name='async-task-detail'),
+    path('metrics/', metrics.metrics_view, name='metrics'),
 ]
\ No newline at end of file
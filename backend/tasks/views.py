@@ -1,24 +1,202 @@
+from collections import defaultdict
+from functools import wraps
+
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import SAFE_METHODS
 from rest_framework.response import Response
+from django_filters.constants import EMPTY_VALUES
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework.filters import OrderingFilter, SearchFilter
+from rest_framework.filters import OrderingFilter
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import transaction
+from django.http import JsonResponse, StreamingHttpResponse
 from django.utils import timezone
 
+from . import cache, changes, conditional, events, export, metrics, routers
+from .changes import stamped_writes
 from .models import Task
-from .serializers import TaskSerializer, TaskSummarySerializer
-from .filters import TaskFilter
+from .serializers import (
+    TaskRowSerializer, TaskSerializer, TaskSummarySerializer, TaskTransitionSerializer,
+    select_fields,
+)
+from .filters import TaskFilter, TaskSearchFilter
+from .pagination import TaskCursorPagination, TaskPageNumberPagination
+from .renderers import task_renderer_classes
+from .response_cache import get_response_cache
+from .signals import tasks_changed
+
+# Parameters that change how a list is presented but not which tasks it holds.
+SUMMARY_IGNORED_PARAMS = (
+    'ordering', 'page', 'page_size', 'pagination', 'cursor', 'format', 'fields', 'exclude',
+)
+
+
+def locked_for_preconditions(method):
+    """
+    Run a single-task write in a transaction when it carries If-Match or
+    If-Unmodified-Since, so ``get_object`` can lock the row it checks.
+    """
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if not conditional.has_write_preconditions(self.request):
+            return method(self, *args, **kwargs)
+        with transaction.atomic():
+            return method(self, *args, **kwargs)
+    return wrapper
 
 
 class TaskViewSet(viewsets.ModelViewSet):
     queryset = Task.objects.all()
     serializer_class = TaskSerializer
-    filter_backends = [DjangoFilterBackend, OrderingFilter, SearchFilter]
+    filter_backends = [DjangoFilterBackend, OrderingFilter, TaskSearchFilter]
     filterset_class = TaskFilter
-    ordering_fields = ['created_at', 'updated_at', 'due_date', 'priority']
+    ordering_fields = ['created_at', 'updated_at', 'due_date', 'priority', 'overdue']
     ordering = ['-created_at']
     search_fields = ['title', 'description']
+    pagination_class = TaskPageNumberPagination
+    # JSON and the browsable API, plus columnar JSON and MessagePack.
+    renderer_classes = task_renderer_classes()
+    
+    @property
+    def paginator(self):
+        """
+        Page-number pagination by default; keyset pagination when the client
+        opts in with ``?pagination=cursor`` or follows a cursor link.
+        """
+        if not hasattr(self, '_paginator'):
+            params = self.request.query_params if self.request else {}
+            if 'cursor' in params or params.get('pagination') == 'cursor':
+                self._paginator = TaskCursorPagination()
+            else:
+                self._paginator = self.pagination_class()
+        return self._paginator
+    
+    def initial(self, request, *args, **kwargs):
+        # One timestamp per request for overdue annotations, filters and
+        # serialization, so they cannot disagree about a task due right now.
+        request.now = timezone.now()
+        super().initial(request, *args, **kwargs)
+    
+    def get_fieldset(self):
+        """
+        The fields selected with ``?fields=`` and ``?exclude=`` (see
+        ``select_fields``), or None for all of them.
+        """
+        if not hasattr(self, '_fieldset'):
+            params = self.request.query_params if self.request else {}
+            self._fieldset = select_fields(params.get('fields'), params.get('exclude'))
+        return self._fieldset
+    
+    def get_row_columns(self, queryset):
+        """The ``values()`` columns to read for the selected fields."""
+        fields = self.get_fieldset()
+        columns = TaskRowSerializer.columns(fields)
+        if fields is not None and isinstance(self.paginator, TaskCursorPagination):
+            # Cursors are built from each row's pk and ordering value.
+            ordering = [
+                name.lstrip('-') for name in queryset.query.order_by if isinstance(name, str)
+            ]
+            columns += [name for name in ('id', *ordering) if name not in columns]
+        return columns
+    
+    def get_serializer(self, *args, **kwargs):
+        kwargs.setdefault('fields', self.get_fieldset())
+        return super().get_serializer(*args, **kwargs)
     
+    def get_queryset(self):
+        now = getattr(self.request, 'now', None) or timezone.now()
+        queryset = super().get_queryset().with_overdue(now)
+        detail = getattr(self, 'detail', False)
+        if detail and conditional.has_write_preconditions(self.request):
+            # Lock the row so the precondition check cannot race another write.
+            queryset = queryset.select_for_update()
+        fields = self.get_fieldset() if getattr(self, 'action', None) == 'retrieve' else None
+        if fields is not None:
+            # Leave the unselected columns, such as a long description, unread.
+            queryset = queryset.only(*(
+                field for field in fields if field != 'is_overdue'
+            ), *conditional.VALIDATOR_FIELDS)
+        return queryset
+    
+    def get_object(self):
+        instance = super().get_object()
+        if self.request.method not in SAFE_METHODS:
+            self.check_object_preconditions(instance)
+        return instance
+    
+    def check_object_preconditions(self, instance):
+        """Reject writes whose If-Match / If-Unmodified-Since no longer hold."""
+        conditional.evaluate(self.request, *self.get_validators(instance))
+    
+    def get_validators(self, instance):
+        return conditional.task_validators(
+            instance, self.request.now, self.request.accepted_media_type, self.get_fieldset()
+        )
+    
+    def list(self, request, *args, **kwargs):
+        """
+        Serialize the page from ``values()`` rows with ``TaskRowSerializer``;
+        the output is identical to ``TaskSerializer``. With ``?fields=`` or
+        ``?exclude=`` only the selected columns are read.
+        
+        Answers If-None-Match / If-Modified-Since with 304 before querying,
+        and serves repeated requests from the response cache.
+        """
+        fields = self.get_fieldset()
+        validators = conditional.collection_validators(
+            cache.normalize_params(request.query_params), request.now,
+            request.accepted_media_type
+        )
+        not_modified = conditional.evaluate(request, *validators)
+        if not_modified is not None:
+            return not_modified
+        
+        def compute():
+            queryset = self.filter_queryset(self.get_queryset())
+            rows = queryset.values(*self.get_row_columns(queryset))
+            serializer = TaskRowSerializer(request.now, fields)
+            page = self.paginate_queryset(rows)
+            if page is not None:
+                return self.get_paginated_response(serializer.many(page)).data
+            return serializer.many(rows)
+        
+        # The ETag covers the table version, overdue state and query string;
+        # links in the page also depend on the host.
+        data = get_response_cache().get_or_set(
+            ('list', validators[0], request.build_absolute_uri('/')), compute
+        )
+        return conditional.set_validators(Response(data), *validators)
+    
+    def retrieve(self, request, *args, **kwargs):
+        fields = self.get_fieldset()
+        
+        def compute():
+            instance = self.get_object()
+            with metrics.timed('serializer'):
+                data = TaskRowSerializer(request.now, fields).to_representation(instance)
+            return data, self.get_validators(instance)
+        
+        data, validators = get_response_cache().get_or_set((
+            'retrieve', cache.get_version(), conditional.overdue_watermark(request.now),
+            kwargs[self.lookup_field], request.accepted_media_type, fields,
+        ), compute)
+        not_modified = conditional.evaluate(request, *validators)
+        if not_modified is not None:
+            return not_modified
+        return conditional.set_validators(Response(data), *validators)
+    
+    @locked_for_preconditions
+    def update(self, request, *args, **kwargs):
+        response = super().update(request, *args, **kwargs)
+        return conditional.set_validators(response, *self.get_validators(self.updated))
+    
+    def perform_update(self, serializer):
+        self.updated = serializer.save()
+    
+    @locked_for_preconditions
     def destroy(self, request, *args, **kwargs):
         instance = self.get_object()
         task_id = instance.id
@@ -30,38 +208,268 @@ class TaskViewSet(viewsets.ModelViewSet):
     
     @action(detail=False, methods=['get'])
     def summary(self, request):
-        now = timezone.now()
-        total_tasks = Task.objects.count()
-        todo_count = Task.objects.filter(status='todo').count()
-        in_progress_count = Task.objects.filter(status='in_progress').count()
-        done_count = Task.objects.filter(status='done').count()
-        overdue_count = Task.objects.filter(due_date__lt=now).exclude(status='done').count()
-        high_priority_count = Task.objects.filter(priority__gte=4).count()
-        
-        data = {
-            'total_tasks': total_tasks,
-            'todo_count': todo_count,
-            'in_progress_count': in_progress_count,
-            'done_count': done_count,
-            'overdue_count': overdue_count,
-            'high_priority_count': high_priority_count,
-        }
-        
-        serializer = TaskSummarySerializer(data)
-        return Response(serializer.data)
+        now = request.now
+        params = cache.normalize_params(
+            request.query_params, ignore=SUMMARY_IGNORED_PARAMS
+        )
+        validators = conditional.summary_validators(params, now, request.accepted_media_type)
+        not_modified = conditional.evaluate(request, *validators)
+        if not_modified is not None:
+            return not_modified
+        
+        def compute():
+            queryset = self.filter_queryset(self.get_queryset())
+            return TaskSummarySerializer(queryset.summary(now)).data
+        
+        data = cache.get_or_set_summary(params, now, compute)
+        return conditional.set_validators(Response(data), *validators)
     
-    @action(detail=True, methods=['post'])
-    def mark_done(self, request, pk=None):
+    @action(detail=False, methods=['get'])
+    def changes(self, request):
+        """
+        Tasks written and ids deleted since ``cursor``, for incremental sync.
+        
+        Without a cursor every task is returned (page by page while
+        ``has_more``); ``?latest=true`` only returns a cursor for the present.
+        """
+        if request.query_params.get('latest') in ('true', '1'):
+            with routers.read_from_primary():
+                cursor = changes.latest_cursor(request.now)
+            return Response({'changed': [], 'deleted': [], 'cursor': cursor, 'has_more': False})
+        
+        try:
+            limit = int(request.query_params.get('limit', 100))
+        except ValueError:
+            raise ValidationError({'limit': ['A valid integer is required.']})
+        limit = min(max(limit, 1), getattr(settings, 'TASKS_CHANGES_MAX_LIMIT', 1000))
+        # A lagging replica could let the cursor pass rows it has not seen yet.
+        with routers.read_from_primary():
+            return Response(
+                changes.get_changes(request.query_params.get('cursor'), limit, request.now)
+            )
+    
+    @action(detail=False, methods=['get'], url_path='cache-stats')
+    def cache_stats(self, request):
+        """Hit, miss and eviction counts of this process's response cache."""
+        return Response(get_response_cache().stats())
+    
+    @action(
+        detail=False, methods=['get'],
+        renderer_classes=[export.NDJSONRenderer, export.CSVRenderer]
+    )
+    def export(self, request):
+        """
+        Stream every task matching the list's filters, search and ordering
+        as NDJSON (default, ``?format=ndjson``) or CSV (``?format=csv``).
+        """
+        queryset = self.filter_queryset(self.get_queryset())
+        rows = export.iter_rows(queryset, request.now)
+        renderer = request.accepted_renderer
+        response = StreamingHttpResponse(
+            export.STREAMS[renderer.format](rows),
+            content_type=f'{renderer.media_type}; charset={renderer.charset}'
+        )
+        response['Content-Disposition'] = f'attachment; filename="tasks.{renderer.format}"'
+        return response
+    
+    @locked_for_preconditions
+    def set_status(self, new_status):
         task = self.get_object()
-        task.status = 'done'
-        task.save()
+        task.status = new_status
+        task.save(update_fields=['status', 'updated_at'])
         serializer = self.get_serializer(task)
-        return Response(serializer.data)
+        return conditional.set_validators(Response(serializer.data), *self.get_validators(task))
+    
+    @action(detail=True, methods=['post'])
+    def mark_done(self, request, pk=None):
+        return self.set_status('done')
     
     @action(detail=True, methods=['post'])
     def mark_in_progress(self, request, pk=None):
-        task = self.get_object()
-        task.status = 'in_progress'
-        task.save()
-        serializer = self.get_serializer(task)
-        return Response(serializer.data)
\ No newline at end of file
+        return self.set_status('in_progress')
+    
+    @action(detail=False, methods=['post'])
+    def transition(self, request):
+        """
+        Move many tasks to ``status`` with a single ``UPDATE ... WHERE``.
+        
+        The tasks are either listed in ``ids`` or selected by the same
+        filter and search query parameters as the task list.
+        """
+        serializer = TaskTransitionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        new_status = serializer.validated_data['status']
+        ids = serializer.validated_data.get('ids')
+        
+        if ids is None:
+            if not self.has_task_selection(request):
+                raise ValidationError({
+                    'non_field_errors': ['Provide ids or at least one filter parameter.']
+                })
+            # Search joins the full-text index, so the filtered rows are
+            # selected in a subquery that locks only the task table.
+            queryset = Task.objects.filter(
+                pk__in=self.filter_queryset(self.get_queryset()).values('pk')
+            )
+        else:
+            if len(ids) > getattr(settings, 'TASKS_BULK_MAX_ITEMS', 10000):
+                raise ValidationError({'ids': ['Too many ids.']})
+            queryset = Task.objects.filter(pk__in=ids)
+        
+        chunk_size = self.get_bulk_chunk_size()
+        limit = getattr(settings, 'TASKS_BULK_MAX_ITEMS', 10000)
+        with stamped_writes() as (now, pks):
+            # Lock the rows that will change so the signal names exactly those.
+            pks += queryset.exclude(status=new_status).select_for_update().order_by().values_list(
+                'pk', flat=True
+            )[:limit + 1]
+            if len(pks) > limit:
+                raise ValidationError({
+                    'non_field_errors': [f'The filters select more than {limit} tasks to transition.']
+                })
+            for start in range(0, len(pks), chunk_size):
+                Task.objects.filter(pk__in=pks[start:start + chunk_size]).update(
+                    status=new_status, updated_at=now
+                )
+        if pks:
+            tasks_changed.send(sender=Task, action='update', pks=pks, status=new_status)
+        return Response({'status': new_status, 'updated': len(pks)})
+    
+    def has_task_selection(self, request):
+        """Whether the query parameters hold a filter or search term narrowing the tasks."""
+        filterset = self.filterset_class(request.query_params, queryset=Task.objects.none(), request=request)
+        if not filterset.is_valid():
+            raise ValidationError(filterset.errors)
+        if any(value not in EMPTY_VALUES for value in filterset.form.cleaned_data.values()):
+            return True
+        return bool(TaskSearchFilter().get_search_terms(request))
+    
+    def get_bulk_items(self, request):
+        items = request.data
+        if not isinstance(items, list) or not items:
+            raise ValidationError({'non_field_errors': ['Expected a non-empty list of items.']})
+        limit = getattr(settings, 'TASKS_BULK_MAX_ITEMS', 10000)
+        if len(items) > limit:
+            raise ValidationError({
+                'non_field_errors': [f'A bulk request may contain at most {limit} items.']
+            })
+        return items
+    
+    def get_bulk_chunk_size(self):
+        return getattr(settings, 'TASKS_BULK_CHUNK_SIZE', 500)
+    
+    def parse_bulk_pk(self, value):
+        try:
+            return Task._meta.pk.to_python(value)
+        except DjangoValidationError:
+            return None
+    
+    @action(detail=False, methods=['post'], url_path='bulk')
+    def bulk_create(self, request):
+        """Create a list of tasks; invalid items are reported, not fatal."""
+        serializer = self.get_serializer(data=self.get_bulk_items(request), many=True)
+        valid, errors = serializer.validate_items()
+        
+        with stamped_writes() as (now, pks):
+            pks += Task.objects.bulk_insert(
+                [data for _, data in valid], batch_size=self.get_bulk_chunk_size(), now=now
+            )
+        if pks:
+            tasks_changed.send(sender=Task, action='create', pks=pks)
+        
+        return Response(
+            {'created': pks, 'errors': errors},
+            status=status.HTTP_201_CREATED if pks else status.HTTP_400_BAD_REQUEST
+        )
+    
+    @bulk_create.mapping.patch
+    def bulk_update(self, request):
+        """
+        Partially update a list of tasks, each identified by its ``id``.
+        
+        Items carrying identical changes are applied with one ``UPDATE ...
+        WHERE id IN (...)`` per chunk; the remaining items go through
+        ``bulk_update`` grouped by the set of fields they change.
+        """
+        items = self.get_bulk_items(request)
+        serializer = self.get_serializer(data=items, many=True, partial=True)
+        valid, errors = serializer.validate_items()
+        
+        pks = {index: self.parse_bulk_pk(items[index].get('id')) for index, _ in valid}
+        existing = set(
+            Task.objects.filter(pk__in=[pk for pk in pks.values() if pk is not None])
+            .values_list('pk', flat=True)
+        )
+        changes = defaultdict(list)
+        for index, data in valid:
+            if items[index].get('id') in (None, ''):
+                error = 'This field is required.'
+            elif pks[index] is None:
+                error = 'Must be a valid UUID.'
+            elif pks[index] not in existing:
+                error = 'Task not found.'
+            else:
+                changes[tuple(sorted(data.items()))].append(pks[index])
+                continue
+            errors.append({'index': index, 'errors': {'id': [error]}})
+        errors.sort(key=lambda error: error['index'])
+        
+        chunk_size = self.get_bulk_chunk_size()
+        singles = defaultdict(list)
+        updated = [pk for group in changes.values() for pk in group]
+        with stamped_writes() as (now, written):
+            written += updated
+            for change, group in changes.items():
+                data = dict(change, updated_at=now)
+                if len(group) == 1:
+                    singles[tuple(sorted(data))].append(Task(pk=group[0], **data))
+                    continue
+                for start in range(0, len(group), chunk_size):
+                    Task.objects.filter(pk__in=group[start:start + chunk_size]).update(**data)
+            for fields, tasks in singles.items():
+                Task.objects.bulk_update(tasks, fields, batch_size=chunk_size)
+        
+        if updated:
+            tasks_changed.send(sender=Task, action='update', pks=updated)
+        return Response(
+            {'updated': updated, 'errors': errors},
+            status=status.HTTP_200_OK if updated else status.HTTP_400_BAD_REQUEST
+        )
+    
+    @bulk_create.mapping.delete
+    def bulk_delete(self, request):
+        """Delete a list of tasks given by id."""
+        pks, errors = [], []
+        for index, value in enumerate(self.get_bulk_items(request)):
+            pk = self.parse_bulk_pk(value) if isinstance(value, str) else None
+            if pk is None:
+                errors.append({'index': index, 'errors': {'id': ['Must be a valid UUID.']}})
+            else:
+                pks.append(pk)
+        
+        with transaction.atomic():
+            deleted = Task.objects.bulk_delete(pks, batch_size=self.get_bulk_chunk_size())
+            if deleted:
+                tasks_changed.send(sender=Task, action='delete', pks=deleted)
+
+        return Response({'deleted': len(deleted), 'errors': errors}, status=status.HTTP_200_OK)
+
+
+async def task_events(request):
+    """
+    Push task changes and summary deltas as Server-Sent Events.
+    
+    Events are ``create`` and ``update`` (with the tasks), ``delete`` and
+    ``status`` (with the ids), ``summary`` (the counts that changed) and
+    ``resync`` when the client should refetch. Needs the ASGI entry point,
+    which streams it without holding a thread and ends it when the client
+    disconnects.
+    """
+    if request.method != 'GET':
+        return JsonResponse({'detail': f'Method "{request.method}" not allowed.'}, status=405)
+    wait_for_disconnect = getattr(request, 'scope', {}).get(events.DISCONNECT_KEY)
+    if wait_for_disconnect is None:
+        return JsonResponse(
+            {'detail': 'The event stream is only served through task_manager.asgi.'}, status=501
+        )
+    return events.EventStreamResponse(events.stream(wait_for_disconnect))
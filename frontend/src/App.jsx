@@ -14,6 +14,7 @@ function App() {
   const [filters, setFilters] = useState({
     status: 'all',
     priority: 'all',
+    overdue: 'all',
     search: '',
     ordering: '-created_at'
   });
@@ -114,6 +115,19 @@ function App() {
     }
   };
 
+  const handleCompleteVisible = async () => {
+    const ids = tasks.filter(task => task.status !== 'done').map(task => task.id);
+    if (ids.length === 0) return;
+
+    try {
+      await taskAPI.transitionTasks(ids, 'done');
+      fetchTasks(pagination.current_page);
+      fetchSummary();
+    } catch (err) {
+      setError('Failed to complete tasks');
+    }
+  };
+
   const handleEdit = (task) => {
     setEditingTask(task);
     setShowForm(true);
@@ -179,7 +193,7 @@ function App() {
           </div>
         )}
 
-        <FilterBar filters={filters} onFilterChange={setFilters} onClearFilters={() => setFilters({ status: 'all', priority: 'all', search: '', ordering: '-created_at' })} />
+        <FilterBar filters={filters} onFilterChange={setFilters} onClearFilters={() => setFilters({ status: 'all', priority: 'all', overdue: 'all', search: '', ordering: '-created_at' })} />
 
         {loading && (
           <div className="text-center py-12">
@@ -196,6 +210,11 @@ function App() {
 
         {!loading && tasks.length > 0 && (
           <>
+            <div className="flex justify-end mb-4">
+              <button onClick={handleCompleteVisible} disabled={tasks.every(task => task.status === 'done')} className="px-4 py-2 rounded-lg font-semibold bg-green-600 text-white hover:bg-green-700 disabled:bg-gray-300 disabled:text-gray-500 disabled:cursor-not-allowed">
+                Complete All Visible
+              </button>
+            </div>
             <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-4 mb-6">
               {tasks.map(task => (
                 <TaskItem key={task.id} task={task} onEdit={handleEdit} onDelete={handleDeleteTask} onStatusChange={handleStatusChange} />
@@ -11,7 +11,7 @@ const FilterBar = ({ filters, onFilterChange, onClearFilters }) => {
 
   return (
     <div className="bg-white p-4 rounded-lg shadow-md mb-6">
-      <div className="grid grid-cols-1 md:grid-cols-4 gap-4">
+      <div className="grid grid-cols-1 md:grid-cols-5 gap-4">
         <div>
           <label className="block text-sm font-semibold text-gray-700 mb-1">Status</label>
           <select name="status" value={filters.status || 'all'} onChange={handleChange} className="w-full px-3 py-2 border border-gray-300 rounded-lg focus:outline-none focus:ring-2 focus:ring-primary-500">
@@ -32,6 +32,14 @@ const FilterBar = ({ filters, onFilterChange, onClearFilters }) => {
             <option value="5">5 - Highest</option>
           </select>
         </div>
+        <div>
+          <label className="block text-sm font-semibold text-gray-700 mb-1">Due</label>
+          <select name="overdue" value={filters.overdue || 'all'} onChange={handleChange} className="w-full px-3 py-2 border border-gray-300 rounded-lg focus:outline-none focus:ring-2 focus:ring-primary-500">
+            <option value="all">Any Due Date</option>
+            <option value="true">Overdue</option>
+            <option value="false">Not Overdue</option>
+          </select>
+        </div>
         <div>
           <label className="block text-sm font-semibold text-gray-700 mb-1">Search</label>
           <input type="text" name="search" value={filters.search || ''} onChange={handleChange} placeholder="Search tasks..." className="w-full px-3 py-2 border border-gray-300 rounded-lg focus:outline-none focus:ring-2 focus:ring-primary-500" />
@@ -43,6 +51,8 @@ const FilterBar = ({ filters, onFilterChange, onClearFilters }) => {
             <option value="created_at">Oldest First</option>
             <option value="-priority">Highest Priority</option>
             <option value="priority">Lowest Priority</option>
+            <option value="due_date">Due Soonest</option>
+            <option value="-overdue">Overdue First</option>
           </select>
         </div>
       </div>
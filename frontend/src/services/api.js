@@ -1,6 +1,9 @@
 import axios from 'axios';
 
-const API_BASE_URL = 'http://localhost:8000/api';
+// Same origin through the dev server proxy (vite.config.js), so the cookie that
+// keeps reads on the primary database after a write is sent without CORS
+// credentials.
+const API_BASE_URL = '/api';
 
 const api = axios.create({
   baseURL: API_BASE_URL,
@@ -54,6 +57,11 @@ export const taskAPI = {
     const response = await api.post(`/tasks/${id}/mark_in_progress/`);
     return response.data;
   },
+
+  transitionTasks: async (ids, status) => {
+    const response = await api.post('/tasks/transition/', { ids, status });
+    return response.data;
+  },
 };
 
 export default api;
\ No newline at end of file